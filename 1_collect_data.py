@@ -1,111 +1,75 @@
+import os
 import serial
-import struct
 import threading
 import time
-import csv
 from collections import deque
 import feature_extractor  # 导入刚才写好的特征提取器
+import radar_protocol     # 雷达协议解析 (帧解码 + 分发)
+import radar_capture      # 原始帧录制
+import radar_stream       # 最新帧快照 (无锁读取)
+import radar_writer       # 后台批量写 CSV
 
 # --- 配置 ---
 SERIAL_PORT = '/dev/ttyACM0' 
 BAUD_RATE = 115200
 CSV_FILENAME = "radar_training_data.csv"
+RAW_CAPTURE = True             # 同时录制原始帧，改特征后可从录制文件重新生成数据
+RAW_CAPTURE_DIR = "raw_captures"
+COLLECT_MAX_HZ = 0             # 采集频率上限，0 表示每个新雷达帧一行
+COLLECT_DELAY = 0.05           # 旧版定时采样间隔，只用于估算避免的重复行
+ROTATE_SEGMENTS = True         # 每次运行写一个新分段 (radar_writer.segment_paths 可列出全部分段)
+ROTATE_MAX_MB = 20             # 单个分段超过该大小时切换到下一个分段
+COMPRESSION = 'gzip'           # 关闭的分段后台压缩: 'gzip' / 'lzma' / None
 
-# 全局数据容器
-current_target = {'z': 0.0, 'speed': 0.0}
-current_points = [] # 存储一帧内的点云
-data_lock = threading.Lock()
+# 全局数据: 解析线程发布的最新 目标 + 点云 快照 (channel.latest)
+channel = radar_stream.FrameChannel()
+sampler = radar_stream.FrameSampler(channel, COLLECT_MAX_HZ)  # 帧同步采样
 stop_flag = False
 current_label = 0
-
-def calc_checksum(data_bytes):
-    checksum = 0
-    for b in data_bytes: checksum ^= b
-    return (~checksum) & 0xFF
-
-def send_cmd(ser, cmd_val):
-    header = b'\x01\x00\x01\x00\x04\x02\x01'
-    h_cs = calc_checksum(header)
-    payload = struct.pack('<I', cmd_val)
-    d_cs = calc_checksum(payload)
-    return header + bytes([h_cs]) + payload + bytes([d_cs])
+recorder = None  # radar_capture.CaptureWriter (RAW_CAPTURE 开启时)
+parse_thread = None
 
 def parse_data(ser):
-    global current_target, current_points
-    buffer = b""
+    target = {'z': 0.0, 'speed': 0.0}
+    decoder = radar_protocol.FrameDecoder(on_frame=recorder.write if recorder else None)
     while not stop_flag:
-        if ser.in_waiting: buffer += ser.read(ser.in_waiting)
-        while len(buffer) >= 8:
-            if buffer[0] != 0x01:
-                buffer = buffer[1:]
-                continue
-            try:
-                header = buffer[0:7]
-                if calc_checksum(header) != buffer[7]:
-                    buffer = buffer[1:]
-                    continue
-                _, _, data_len, frame_type = struct.unpack('>BHHH', header)
-                total_len = 8 + data_len + 1
-                if len(buffer) < total_len: break
-                
-                payload = buffer[8:8+data_len]
-                if calc_checksum(payload) == buffer[8+data_len]:
-                    
-                    # 1. 目标信息 (0x0A04)
-                    if frame_type == 0x0A04 and len(payload) >= 4:
-                        num = struct.unpack('<i', payload[0:4])[0]
-                        if num > 0:
-                            _, _, z, dop_idx, _ = struct.unpack('<fffii', payload[4:24])
-                            with data_lock:
-                                current_target['z'] = z
-                                current_target['speed'] = float(dop_idx)
+        if ser.in_waiting: decoder.feed(ser.read(ser.in_waiting))
+        for frame in decoder.decoded():
+            # 1. 目标信息 (0x0A04)
+            if isinstance(frame, radar_protocol.TargetFrame):
+                target = radar_protocol.primary_target(frame) or target
 
-                    # 2. 点云信息 (0x0A08)
-                    elif frame_type == 0x0A08 and len(payload) >= 4:
-                        num = struct.unpack('<i', payload[0:4])[0]
-                        temp_points = []
-                        offset = 4
-                        for _ in range(num):
-                            if offset+20 > len(payload): break
-                            _, x, y, z, speed = struct.unpack('<iffff', payload[offset:offset+20])
-                            # 简单清洗
-                            if abs(x) < 4.0 and 0.1 < y < 6.0:
-                                temp_points.append((x, y, speed))
-                            offset += 20
-                        
-                        with data_lock:
-                            current_points = temp_points
-
-                buffer = buffer[total_len:]
-            except:
-                buffer = buffer[1:]
+            # 2. 点云信息 (0x0A08): ROI 清洗后 -> (N, 3) 数组 [x, y, speed]
+            #    与最近的目标一起发布为新快照
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                channel.publish(target, radar_protocol.cloud_points(frame))
 
 if __name__ == "__main__":
     try:
         ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.1)
         print("初始化雷达...")
-        ser.write(send_cmd(ser, 0x14)) # 侧装
+        ser.write(radar_protocol.build_command(radar_protocol.CMD_SIDE_MOUNT)) # 侧装
         time.sleep(0.1)
-        ser.write(send_cmd(ser, 0x08)) # 目标
+        ser.write(radar_protocol.build_command(radar_protocol.CMD_TARGET_ON)) # 目标
         time.sleep(0.1)
-        ser.write(send_cmd(ser, 0x06)) # 点云
+        ser.write(radar_protocol.build_command(radar_protocol.CMD_POINT_CLOUD_ON)) # 点云
         time.sleep(0.1)
         ser.reset_input_buffer()
 
-        t = threading.Thread(target=parse_data, args=(ser,), daemon=True)
-        t.start()
-        
-        # 准备 CSV (追加模式，防止误删)
-        import os
-        file_exists = os.path.isfile(CSV_FILENAME)
+        if RAW_CAPTURE:
+            os.makedirs(RAW_CAPTURE_DIR, exist_ok=True)
+            recorder = radar_capture.CaptureWriter(radar_capture.new_capture_path(RAW_CAPTURE_DIR))
+            print(f"原始帧录制: {recorder.path}")
+
+        parse_thread = threading.Thread(target=parse_data, args=(ser,), daemon=True)
+        parse_thread.start()
         
-        with open(CSV_FILENAME, 'a', newline='') as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                # 写入包含 10 个特征 + label 的表头
-                writer.writerow(feature_extractor.FEATURE_NAMES + ['label'])
-            
-            print(f"\n✅ 已连接! 数据将存入: {CSV_FILENAME}")
+        # 准备 CSV (追加模式，防止误删；文件不存在时写入 10 个特征 + label 的表头)
+        # 后台线程批量写入，录制循环只入队；分段轮转时关闭的分段在后台压缩
+        with radar_writer.BatchedCsvWriter(CSV_FILENAME, feature_extractor.FEATURE_NAMES + ['label'],
+                                           rotate=ROTATE_SEGMENTS, max_bytes=int(ROTATE_MAX_MB * 1e6),
+                                           compress=COMPRESSION) as writer:
+            print(f"\n✅ 已连接! 数据将存入: {writer.path}")
             print("请按标签录制: 0=无人, 1=站立, 2=坐下, 3=跌倒 (按 q 退出)")
             
             while True:
@@ -114,17 +78,31 @@ if __name__ == "__main__":
                 if user_input.isdigit(): current_label = int(user_input)
                 
                 print(f"正在录制标签 {current_label} (20帧)...", end="", flush=True)
-                for _ in range(20):
-                    with data_lock:
-                        # --- 核心修改：调用特征提取器 ---
-                        feats = feature_extractor.extract_features(current_target, current_points)
-                        row = feats + [current_label]
+                if recorder: recorder.label = current_label
+                sampler.reset()
+                while sampler.frames < 20:
+                    snap = sampler.next(timeout=1.0)  # 每个新雷达帧一行，不重复记录同一帧
+                    if snap is None:
+                        print(f"\r⚠️ [无数据] 等待雷达帧... ({sampler.frames}/20)", end="", flush=True)
+                        continue
+                    # --- 核心修改：调用特征提取器 ---
+                    feats = feature_extractor.extract_features(snap.target, snap.points)
+                    row = feats + [current_label]
                     
-                    writer.writerow(row)
-                    time.sleep(0.05)
-                print(" 完成")
+                    writer.write(row)
+                writer.flush()
+                if recorder:
+                    recorder.label = radar_capture.LABEL_NONE
+                    recorder.flush()
+                print(f" 完成 ({sampler.summary(COLLECT_DELAY)})")
 
     except Exception as e:
         print(e)
     finally:
-        stop_flag = True
\ No newline at end of file
+        stop_flag = True
+        # 先停掉解析线程 (它会调用 recorder.write)，再关闭录制文件
+        if parse_thread:
+            parse_thread.join(timeout=1.0)
+        if recorder:
+            recorder.close()
+            print(f"原始帧已保存: {recorder.path} ({recorder.records} 帧)")
\ No newline at end of file
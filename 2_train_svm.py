@@ -1,4 +1,3 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.svm import SVC
 from sklearn.preprocessing import StandardScaler
@@ -6,17 +5,17 @@ from sklearn.metrics import classification_report, accuracy_score
 import joblib
 import os
 import feature_extractor  # 【关键】导入特征定义模块，保证和采集、推理完全一致
+import radar_dataset      # 读取 CSV 及采集时轮转出的分段 (含压缩分段)
 
 # 1. 读取数据
 csv_file = "./data/radar_training_data.csv" # 确保路径和采集时一致
 print(f"正在读取 {csv_file} ...")
 
-if not os.path.exists(csv_file):
+df, _ = radar_dataset.load_segments(csv_file, cache=False)
+if df is None:
     print(f"❌ 错误：找不到文件 {csv_file}，请检查路径或先运行采集脚本。")
     exit()
 
-df = pd.read_csv(csv_file)
-
 # 2. 准备特征 (X) 和 标签 (y)
 # 【核心修改】不再手写列名，而是直接使用 feature_extractor.FEATURE_NAMES
 # 这样不仅包含了所有 10 个新特征，而且以后改特征不用到处改代码
@@ -38,7 +37,7 @@ X_test_scaled = scaler.transform(X_test)
 
 # 5. 训练 SVM 模型
 print(f"正在训练 SVM 模型 (特征维度: {X.shape[1]})...")
-svm_model = SVC(kernel='rbf', C=1.0, gamma='scale', probability=True)
+svm_model = SVC(kernel='rbf', C=1.0, gamma='scale')  # 推理只用 predict，不需要 probability=True 的 5 折内部校准
 svm_model.fit(X_train_scaled, y_train)
 
 # 6. 评估模型
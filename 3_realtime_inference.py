@@ -1,11 +1,13 @@
 import serial
-import struct
 import threading
 import time
 import joblib
-import pandas as pd
+import numpy as np
 from collections import deque, Counter
 import feature_extractor # 导入同一个特征提取器
+import radar_protocol    # 雷达协议解析 (帧解码 + 分发)
+import radar_stream      # 解析线程 -> 推理线程 的帧通道
+import svm_predictor     # 标准化 + 预测 (不经过 pandas)
 
 # --- 配置 ---
 SERIAL_PORT = '/dev/ttyACM0'
@@ -13,6 +15,7 @@ BAUD_RATE = 115200
 MODEL_FILE = './weights/radar_svm_model.pkl'
 SCALER_FILE = './weights/radar_scaler.pkl'
 HISTORY_LEN = 8  # 滤波窗口，设为 8 会更稳
+MAX_INFERENCE_HZ = 0  # 推理频率上限，0 表示每个新的点云帧都推理
 
 # 加载模型
 print("加载模型...")
@@ -25,88 +28,50 @@ except:
 
 LABEL_MAP = {0: "Wait...", 1: "🟢 站立", 2: "🟡 坐下", 3: "🚨 跌倒"}
 
-# 全局数据
-current_target = {'z': 0.0, 'speed': 0.0}
-current_points = []
-data_lock = threading.Lock()
+# 全局数据: 解析线程发布的最新 目标 + 点云 快照
 stop_flag = False
+channel = radar_stream.FrameChannel()
 
-# ... (calc_checksum, send_cmd, parse_data 函数完全复用上面的采集脚本逻辑) ...
-# ... 为了节省篇幅，请直接把 parse_data 复制过来 ...
-def calc_checksum(data_bytes):
-    checksum = 0
-    for b in data_bytes: checksum ^= b
-    return (~checksum) & 0xFF
-
-def send_cmd(ser, cmd_val):
-    header = b'\x01\x00\x01\x00\x04\x02\x01'
-    h_cs = calc_checksum(header)
-    payload = struct.pack('<I', cmd_val)
-    d_cs = calc_checksum(payload)
-    return header + bytes([h_cs]) + payload + bytes([d_cs])
-
+# 帧解析统一由 radar_protocol 完成，与采集脚本完全一致
 def parse_data(ser):
-    global current_target, current_points
-    buffer = b""
+    target = {'z': 0.0, 'speed': 0.0}
+    decoder = radar_protocol.FrameDecoder()
     while not stop_flag:
-        if ser.in_waiting: buffer += ser.read(ser.in_waiting)
-        while len(buffer) >= 8:
-            if buffer[0] != 0x01:
-                buffer = buffer[1:]
-                continue
-            try:
-                header = buffer[0:7]
-                if calc_checksum(header) != buffer[7]:
-                    buffer = buffer[1:]
-                    continue
-                _, _, data_len, frame_type = struct.unpack('>BHHH', header)
-                total_len = 8 + data_len + 1
-                if len(buffer) < total_len: break
-                
-                payload = buffer[8:8+data_len]
-                if calc_checksum(payload) == buffer[8+data_len]:
-                    if frame_type == 0x0A04 and len(payload) >= 4:
-                        num = struct.unpack('<i', payload[0:4])[0]
-                        if num > 0:
-                            _, _, z, dop_idx, _ = struct.unpack('<fffii', payload[4:24])
-                            with data_lock:
-                                current_target['z'] = z
-                                current_target['speed'] = float(dop_idx)
-                    elif frame_type == 0x0A08 and len(payload) >= 4:
-                        num = struct.unpack('<i', payload[0:4])[0]
-                        temp_points = []
-                        offset = 4
-                        for _ in range(num):
-                            if offset+20 > len(payload): break
-                            _, x, y, z, speed = struct.unpack('<iffff', payload[offset:offset+20])
-                            if abs(x) < 4.0 and 0.1 < y < 6.0:
-                                temp_points.append((x, y, speed))
-                            offset += 20
-                        with data_lock:
-                            current_points = temp_points
-                buffer = buffer[total_len:]
-            except:
-                buffer = buffer[1:]
+        if ser.in_waiting: decoder.feed(ser.read(ser.in_waiting))
+        for frame in decoder.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                target = radar_protocol.primary_target(frame) or target
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                # 新帧到达: 发布不可变快照并唤醒推理线程 (无需加锁)
+                channel.publish(target, radar_protocol.cloud_points(frame))
 
 def inference_loop():
     history = deque(maxlen=HISTORY_LEN)
     last_status = -1
+    # 预分配特征行与工作区，循环内不再分配
+    raw_feats = np.zeros(len(feature_extractor.FEATURE_NAMES))
+    workspace = feature_extractor.FeatureWorkspace()
+    limiter = radar_stream.RateLimiter(MAX_INFERENCE_HZ)
+    predictor = svm_predictor.ScaledPredictor(clf, scaler)
+    last_seq = 0
     print("\n🚀 开始 10维 特征融合识别...\n")
     
     while not stop_flag:
-        time.sleep(0.1)
+        # 每个新帧推理一次，而不是固定 sleep(0.1) 轮询
+        snap = channel.wait_next(last_seq, timeout=0.5)
+        if snap is None:
+            continue
+        if limiter.interval:
+            limiter.wait()
+            snap = channel.latest
+        last_seq = snap.seq
         
-        with data_lock:
-            # --- 核心修改：使用统一的特征提取器 ---
-            raw_feats = feature_extractor.extract_features(current_target, current_points)
+        # --- 核心修改：使用统一的特征提取器 ---
+        feature_extractor.extract_features_into(snap.target, snap.points, raw_feats, workspace)
         
         try:
-            # 转为 DataFrame 以匹配训练时的格式
-            input_df = pd.DataFrame([raw_feats], columns=feature_extractor.FEATURE_NAMES)
-            
-            # 预处理 + 推理
-            scaled = scaler.transform(input_df)
-            pred = clf.predict(scaled)[0]
+            # 预处理 + 推理 (在预分配缓冲上标准化，与 scaler.transform 结果一致)
+            pred = predictor.predict(raw_feats)
             
             # 滤波
             history.append(pred)
@@ -125,13 +90,14 @@ def inference_loop():
 if __name__ == "__main__":
     try:
         ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.1)
-        ser.write(send_cmd(ser, 0x14)); time.sleep(0.1)
-        ser.write(send_cmd(ser, 0x08)); time.sleep(0.1)
-        ser.write(send_cmd(ser, 0x06)); time.sleep(0.1)
+        ser.write(radar_protocol.build_command(radar_protocol.CMD_SIDE_MOUNT)); time.sleep(0.1)
+        ser.write(radar_protocol.build_command(radar_protocol.CMD_TARGET_ON)); time.sleep(0.1)
+        ser.write(radar_protocol.build_command(radar_protocol.CMD_POINT_CLOUD_ON)); time.sleep(0.1)
         ser.reset_input_buffer()
         
         t = threading.Thread(target=parse_data, args=(ser,), daemon=True)
         t.start()
         inference_loop()
     except KeyboardInterrupt:
-        stop_flag = True
\ No newline at end of file
+        stop_flag = True
+        channel.close()
\ No newline at end of file
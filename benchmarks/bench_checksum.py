@@ -0,0 +1,36 @@
+"""
+校验算法微基准：radar_protocol.calc_checksum vs 原始逐字节循环
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_checksum.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_protocol
+
+SIZES = [0, 7, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
+
+
+def bench(func, data, number):
+    return timeit.timeit(lambda: func(data), number=number) / number * 1e6
+
+
+def main():
+    print(f"{'字节数':>8} | {'循环(us)':>10} | {'新实现(us)':>10} | {'加速比':>8}")
+    print("-" * 46)
+    for size in SIZES:
+        # 与解码器一致：对 bytearray 的 memoryview 切片求校验
+        data = memoryview(bytearray(os.urandom(size)))
+        assert radar_protocol.calc_checksum(data) == radar_protocol.calc_checksum_loop(data)
+
+        number = 20000 if size <= 256 else 2000
+        t_loop = bench(radar_protocol.calc_checksum_loop, data, number)
+        t_fast = bench(radar_protocol.calc_checksum, data, number)
+        print(f"{size:>8} | {t_loop:>10.2f} | {t_fast:>10.2f} | {t_loop / t_fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+采集输出压缩基准：仓库中的特征 CSV 用 gzip / lzma 压缩后的大小与读写耗时
+
+对每个 CSV 比较 (与 radar_writer.SegmentCompressor 相同的压缩级别):
+  - 压缩后大小 / 压缩比:  边缘设备上的磁盘占用与拷出数据量
+  - 压缩耗时:             后台压缩线程处理一个分段需要的时间
+  - pd.read_csv 耗时:     训练 / 合并时直接读取压缩分段 (流式解压) 与读取原 CSV 的差别
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_compression.py
+    python3 benchmarks/bench_compression.py --csv hardware_collection/data/radar_10dim_dataset.csv
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import radar_writer
+
+DEFAULT_CSVS = [
+    os.path.join(ROOT, 'project_root', 'data', 'radar_training_data.csv'),
+    os.path.join(ROOT, 'hardware_collection', 'data', 'radar_10dim_dataset.csv'),
+    os.path.join(ROOT, 'data', 'radar_training_data.csv'),
+]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采集输出压缩基准 (gzip / lzma)")
+    parser.add_argument('--csv', nargs='+', default=None, help="要测试的 CSV (默认仓库中的数据集)")
+    args = parser.parse_args()
+    csvs = [p for p in (args.csv or DEFAULT_CSVS) if os.path.exists(p)]
+
+    tmp = tempfile.mkdtemp(prefix='bench_compression_')
+    try:
+        print(f"{'文件':<50} | {'方式':<5} | {'大小 MB':>8} | {'压缩比':>6} | {'压缩 s':>7} | {'read_csv s':>10}")
+        print("-" * 102)
+        for src in csvs:
+            name = os.path.relpath(src, ROOT)
+            size = os.path.getsize(src)
+            _, t_read = timed(lambda: pd.read_csv(src))
+            print(f"{name:<50} | {'原始':<5} | {size / 1e6:>8.2f} | {1.0:>6.1f} | {'-':>7} | {t_read:>10.3f}")
+            for method in radar_writer.COMPRESSORS:
+                path = os.path.join(tmp, os.path.basename(src))
+                shutil.copyfile(src, path)
+                dst, t_comp = timed(lambda: radar_writer.compress_file(path, method))
+                out = os.path.getsize(dst)
+                df, t_read = timed(lambda: pd.read_csv(dst))
+                assert len(df) == len(pd.read_csv(src))
+                print(f"{'':<50} | {method:<5} | {out / 1e6:>8.2f} | {size / out:>6.1f} | {t_comp:>7.3f} | {t_read:>10.3f}")
+                os.remove(dst)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+训练数据加载基准：pd.read_csv vs radar_dataset 列式缓存
+
+在临时目录生成 10k / 100k / 1M 行的特征 CSV (列与 feature_extractor.FEATURE_NAMES + label 相同)，比较:
+  - read_csv:     每次全量解析文本 (旧写法)
+  - 建缓存:       第一次加载 (解析一次文本 + 写 .npy)
+  - 缓存 -> DataFrame: 之后每次训练的加载方式 (load_csv)
+  - 缓存 mmap:    只读内存映射打开全部列，并把特征矩阵拼出来 (np.column_stack)
+  - 追加 1%:      CSV 末尾追加一次采集会话后，增量更新缓存的耗时
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_dataset.py
+    python3 benchmarks/bench_dataset.py --rows 10000 100000
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import feature_extractor
+import radar_dataset
+
+
+def make_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.random((rows, len(feature_extractor.FEATURE_NAMES))) * 3,
+                      columns=feature_extractor.FEATURE_NAMES)
+    df['label'] = rng.integers(0, 3, rows)
+    df.to_csv(path, index=False)
+    return df
+
+
+def append_session(path, rows, seed=1):
+    """ 与采集脚本一样用 csv.writer 追加 """
+    rng = np.random.default_rng(seed)
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        for r in rng.random((rows, len(feature_extractor.FEATURE_NAMES))) * 3:
+            writer.writerow(list(r) + [int(rng.integers(0, 3))])
+
+
+def timed(fn, repeat=1):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(rows, tmp):
+    path = os.path.join(tmp, f"data_{rows}.csv")
+    make_csv(path, rows)
+    repeat = 3 if rows <= 100000 else 1
+    t_csv = timed(lambda: pd.read_csv(path), repeat)
+    t_build = timed(lambda: radar_dataset.DatasetCache(path).update())
+    t_load = timed(lambda: radar_dataset.load_csv(path), repeat)
+
+    def mmap_matrix():
+        cols = radar_dataset.load_columns(path, mmap=True)
+        np.column_stack([cols[c] for c in feature_extractor.FEATURE_NAMES])
+    t_mmap = timed(mmap_matrix, repeat)
+
+    append_session(path, max(1, rows // 100))
+    cache = radar_dataset.DatasetCache(path)
+    t_append = timed(cache.update)
+    assert cache.last_action == 'append'
+    assert len(radar_dataset.load_columns(path)['label']) == rows + max(1, rows // 100)
+    return os.path.getsize(path), t_csv, t_build, t_load, t_mmap, t_append
+
+
+def main():
+    parser = argparse.ArgumentParser(description="训练数据加载基准 (CSV vs 列式缓存)")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000], help="行数")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench_dataset_')
+    try:
+        print(f"{'行数':>8} | {'CSV MB':>7} | {'read_csv s':>10} | {'建缓存 s':>8} | {'缓存->DF s':>10} | "
+              f"{'mmap s':>7} | {'追加1% s':>8} | {'加速比':>6}")
+        print("-" * 92)
+        for rows in args.rows:
+            size, t_csv, t_build, t_load, t_mmap, t_append = run(rows, tmp)
+            print(f"{rows:>8} | {size / 1e6:>7.1f} | {t_csv:>10.3f} | {t_build:>8.3f} | {t_load:>10.4f} | "
+                  f"{t_mmap:>7.4f} | {t_append:>8.3f} | {t_csv / t_load:>5.0f}x")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
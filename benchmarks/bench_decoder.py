@@ -0,0 +1,139 @@
+"""
+帧解码基准：旧的 bytes 切片解析 vs radar_protocol.FrameDecoder
+
+模拟带噪声的串口流 (帧之间夹杂随机垃圾字节)，按固定块大小喂给解析器，
+统计吞吐量和重新同步时丢弃的字节数。
+"解码+分发" 一列包含 FRAME_HANDLERS 分发以及推理脚本里的目标/点云处理，
+即采集、推理线程的完整热路径。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_decoder.py
+"""
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_protocol
+
+CHUNK = 512  # 每次 ser.read() 读到的字节数
+
+
+def make_frame(frame_type, payload):
+    return radar_protocol.build_frame(frame_type, payload)
+
+
+def make_stream(num_frames, points, garbage_ratio, seed=0):
+    """ 生成 0x0A04 + 0x0A08 交替的字节流，garbage_ratio 为垃圾字节占比 """
+    rng = random.Random(seed)
+    target = make_frame(0x0A04, struct.pack('<i', 1) + struct.pack('<fffii', 0.1, 2.0, 0.9, 0, 1))
+    cloud_payload = struct.pack('<i', points) + b''.join(
+        struct.pack('<iffff', 0, rng.uniform(-2, 2), rng.uniform(0.5, 5), 0.5, 0.0)
+        for _ in range(points))
+    cloud = make_frame(0x0A08, cloud_payload)
+
+    parts = []
+    frame_bytes = len(target) + len(cloud)
+    garbage_per_frame = int(frame_bytes * garbage_ratio / max(1e-9, 1 - garbage_ratio))
+    for _ in range(num_frames):
+        parts.append(target)
+        parts.append(cloud)
+        if garbage_per_frame:
+            # 避开 0x01，模拟最坏情况: 每个字节都要被检查并丢弃
+            parts.append(bytes(rng.randrange(2, 256) for _ in range(garbage_per_frame)))
+    return b''.join(parts)
+
+
+def legacy_parse(stream):
+    """ 原始实现: buffer += chunk / buffer = buffer[1:]，逐点 struct 解析 """
+    frames = 0
+    buffer = b""
+    for i in range(0, len(stream), CHUNK):
+        buffer += stream[i:i + CHUNK]
+        while len(buffer) >= 8:
+            if buffer[0] != 0x01:
+                buffer = buffer[1:]
+                continue
+            header = buffer[0:7]
+            if radar_protocol.calc_checksum_loop(header) != buffer[7]:
+                buffer = buffer[1:]
+                continue
+            _, _, data_len, frame_type = struct.unpack('>BHHH', header)
+            total_len = 8 + data_len + 1
+            if len(buffer) < total_len:
+                break
+            payload = buffer[8:8 + data_len]
+            if radar_protocol.calc_checksum_loop(payload) == buffer[8 + data_len]:
+                frames += 1
+                if frame_type == 0x0A04 and len(payload) >= 24:
+                    struct.unpack('<fffii', payload[4:24])
+                elif frame_type == 0x0A08 and len(payload) >= 4:
+                    num = struct.unpack('<i', payload[0:4])[0]
+                    temp = []
+                    offset = 4
+                    for _ in range(num):
+                        if offset + 20 > len(payload): break
+                        _, x, y, z, s = struct.unpack('<iffff', payload[offset:offset + 20])
+                        if abs(x) < 4.0 and 0.1 < y < 6.0:
+                            temp.append((x, y, s))
+                        offset += 20
+            buffer = buffer[total_len:]
+    return frames, None
+
+
+def decoder_parse(stream):
+    """ 只做帧同步与校验 """
+    decoder = radar_protocol.FrameDecoder()
+    frames = 0
+    for i in range(0, len(stream), CHUNK):
+        decoder.feed(stream[i:i + CHUNK])
+        for _ in decoder.frames():
+            frames += 1
+    return frames, decoder.stats()
+
+
+def dispatch_parse(stream):
+    """ 帧同步 + 分发表解析 + 目标/点云处理 (与 parse_data 相同) """
+    decoder = radar_protocol.FrameDecoder()
+    frames = 0
+    for i in range(0, len(stream), CHUNK):
+        decoder.feed(stream[i:i + CHUNK])
+        for frame in decoder.decoded():
+            frames += 1
+            if isinstance(frame, radar_protocol.TargetFrame):
+                radar_protocol.primary_target(frame)
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                radar_protocol.cloud_points(frame)
+    return frames, decoder.stats()
+
+
+def main():
+    print(f"{'点数':>5} | {'垃圾占比':>8} | {'旧实现 MB/s':>11} | {'解码器 MB/s':>11} | "
+          f"{'解码+分发 MB/s':>14} | {'丢弃字节':>9} | {'重同步':>6}")
+    print("-" * 88)
+    for points in (50, 300):
+        for garbage in (0.0, 0.2, 0.5):
+            stream = make_stream(200, points, garbage)
+            mb = len(stream) / 1e6
+
+            t0 = time.perf_counter()
+            n_old, _ = legacy_parse(stream)
+            t_old = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            n_new, st = decoder_parse(stream)
+            t_new = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            n_disp, _ = dispatch_parse(stream)
+            t_disp = time.perf_counter() - t0
+
+            assert n_old == n_new == n_disp
+            print(f"{points:>5} | {garbage:>8.0%} | {mb / t_old:>11.2f} | {mb / t_new:>11.2f} | "
+                  f"{mb / t_disp:>14.2f} | {st['bytes_skipped']:>9} | {st['resyncs']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+特征提取基准：逐帧 extract_features vs 批量 extract_features_batch / 单帧 extract_features_into
+
+模拟 1 小时 10Hz 的录制数据 (36000 帧，每帧 0~300 个点)，
+对比逐帧循环与一次批量计算的耗时，并校验结果逐位一致。
+另外测量推理热路径的单帧延迟 (10~500 个点)：
+列表输入 / 数组输入的 extract_features 与预分配的 extract_features_into。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_features.py
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import feature_extractor
+
+
+def make_frames(num_frames, max_points=300, seed=0):
+    rng = np.random.default_rng(seed)
+    targets = np.column_stack([rng.uniform(-0.5, 1.5, num_frames), rng.integers(-3, 4, num_frames)])
+    counts = rng.integers(0, max_points + 1, num_frames)
+    clouds = [np.column_stack([rng.uniform(-2, 2, n), rng.uniform(0.5, 5, n), rng.normal(0, 0.3, n)])
+              for n in counts]
+    return targets, clouds
+
+
+def bench_batch(num_frames):
+    targets, clouds = make_frames(num_frames)
+
+    t0 = time.perf_counter()
+    ref = [feature_extractor.extract_features({'z': z, 'speed': s}, pc)
+           for (z, s), pc in zip(targets, clouds)]
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    points, offsets = feature_extractor.stack_point_clouds(clouds)
+    t_stack = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = feature_extractor.extract_features_batch(targets, points, offsets)
+    t_batch = time.perf_counter() - t0
+
+    assert np.array_equal(np.asarray(ref, dtype=np.float64), batch)
+    print(f"{num_frames:>8} 帧 | 逐帧: {t_loop:7.2f} s | 拼接: {t_stack:6.2f} s | "
+          f"批量: {t_batch:6.2f} s | 加速比 {t_loop / t_batch:5.1f}x")
+
+
+def per_call_us(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def bench_latency(num_points, repeat=2000):
+    rng = np.random.default_rng(num_points)
+    cloud = np.column_stack([rng.uniform(-2, 2, num_points), rng.uniform(0.5, 5, num_points),
+                             rng.normal(0, 0.3, num_points)]).astype(np.float32)
+    as_list = [tuple(float(v) for v in p) for p in cloud]
+    as_f64 = cloud.astype(np.float64)
+    target = {'z': 0.9, 'speed': 0.0}
+    out = np.empty(len(feature_extractor.FEATURE_NAMES))
+    ws = feature_extractor.FeatureWorkspace()
+
+    ref = feature_extractor.extract_features(target, as_list)
+    feature_extractor.extract_features_into(target, cloud, out, ws)
+    assert np.array_equal(np.asarray(ref, dtype=np.float64), out)
+
+    t_list = per_call_us(lambda: feature_extractor.extract_features(target, as_list), repeat)
+    t_arr = per_call_us(lambda: feature_extractor.extract_features(target, as_f64), repeat)
+    t_into = per_call_us(lambda: feature_extractor.extract_features_into(target, cloud, out, ws), repeat)
+    print(f"{num_points:>6} | {t_list:>10.1f} | {t_arr:>10.1f} | {t_into:>10.1f} | {t_arr / t_into:>6.1f}x")
+
+
+def main():
+    print("--- 批量特征提取 (结果逐位一致) ---")
+    for num_frames in (3600, 36000):
+        bench_batch(num_frames)
+
+    print("\n--- 单帧延迟 (us/次，结果逐位一致) ---")
+    print(f"{'点数':>6} | {'列表输入':>10} | {'数组输入':>10} | {'_into':>10} | {'加速比':>6}")
+    for num_points in (10, 50, 100, 200, 500):
+        bench_latency(num_points)
+
+
+if __name__ == "__main__":
+    main()
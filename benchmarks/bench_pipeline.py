@@ -0,0 +1,250 @@
+"""
+端到端基准：解码 -> 特征 -> 标准化 -> SVM 预测 -> 迟滞滤波
+
+按 project_root/3_realtime_inference.py 的热路径逐级计时，每一级单独跑一遍，
+再把整条链串起来跑一遍。输入可以是合成数据 (radar_simulator 的合成姿态) 或
+radar_capture 录制文件 (--capture)。输出每级的 p50 / p99 延迟、帧/秒 和 峰值 RSS，
+并可写成 JSON 作为上线边缘设备前的回归基线。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_pipeline.py
+    python3 benchmarks/bench_pipeline.py --frames 5000 --points 100 --json pipeline.json
+    python3 benchmarks/bench_pipeline.py --capture data/raw/raw_20250128_153000.cap --json -
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import joblib
+import sklearn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'project_root'))
+import feature_extractor
+import radar_capture
+import radar_protocol
+import radar_simulator
+import svm_predictor
+from utils import HysteresisFilter
+
+DEFAULT_MODEL_DIR = os.path.join(ROOT, 'project_root', 'weights')
+
+
+def peak_rss_mb():
+    # Linux 上 ru_maxrss 单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_chunks(num_frames, points, seed=0):
+    """ 合成输入: 每个元素是一组 (目标帧 + 点云帧) 的原始字节，姿态按块轮换 """
+    source = radar_simulator.SyntheticSource('stand', points, seed)
+    block = max(1, num_frames // len(radar_simulator.POSTURES))
+    chunks = []
+    for i in range(num_frames):
+        source.posture = radar_simulator.POSTURES[(i // block) % len(radar_simulator.POSTURES)]
+        chunks.append(b''.join(radar_protocol.build_frame(t, p) for t, p in source.next_frames()))
+    return chunks
+
+
+def capture_chunks(path, num_frames):
+    """ 录制输入: 每个点云帧连同它之前的帧 (通常是目标帧) 作为一个单元 """
+    chunks, pending = [], []
+    with radar_capture.CaptureReader(path) as reader:
+        for rec in reader:
+            pending.append(radar_protocol.build_frame(rec.frame_type, rec.payload))
+            if rec.frame_type == radar_protocol.FRAME_POINT_CLOUD:
+                chunks.append(b''.join(pending))
+                pending = []
+                if num_frames and len(chunks) >= num_frames:
+                    break
+    return chunks
+
+
+def summarize(name, lat_ns):
+    lat_us = np.asarray(lat_ns, dtype=np.float64) / 1e3
+    total_s = lat_us.sum() / 1e6
+    return {
+        'stage': name,
+        'count': int(len(lat_us)),
+        'p50_us': float(np.percentile(lat_us, 50)),
+        'p99_us': float(np.percentile(lat_us, 99)),
+        'mean_us': float(lat_us.mean()),
+        'max_us': float(lat_us.max()),
+        'frames_per_sec': float(len(lat_us) / total_s) if total_s else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run(chunks, clf, scaler, names):
+    clock = time.perf_counter_ns
+    results = []
+
+    # 1. 解码: 喂入一组原始字节，解析出目标与点云 (与 parse_data 相同)
+    decoder = radar_protocol.FrameDecoder()
+    target = {'z': 0.0, 'speed': 0.0}
+    samples, lat = [], []
+    for chunk in chunks:
+        t0 = clock()
+        decoder.feed(chunk)
+        points = None
+        for frame in decoder.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                t = radar_protocol.primary_target(frame)
+                if t:
+                    target.update(t)
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                points = radar_protocol.cloud_points(frame)
+        lat.append(clock() - t0)
+        if points is not None:
+            samples.append((dict(target), points))
+    results.append(summarize('decode', lat))
+
+    # 2. 特征提取 (列表版 与 推理脚本使用的预分配版)
+    feats, lat = [], []
+    for t, pts in samples:
+        t0 = clock()
+        f = feature_extractor.extract_features(t, pts)
+        lat.append(clock() - t0)
+        feats.append(f)
+    results.append(summarize('extract_features', lat))
+
+    row = np.zeros(len(names))
+    workspace = feature_extractor.FeatureWorkspace()
+    lat = []
+    for t, pts in samples:
+        t0 = clock()
+        feature_extractor.extract_features_into(t, pts, row, workspace)
+        lat.append(clock() - t0)
+    results.append(summarize('extract_features_into', lat))
+
+    # 3. 标准化 (含旧推理脚本里构造单行 DataFrame 的开销)
+    scaled, lat = [], []
+    for f in feats:
+        t0 = clock()
+        s = scaler.transform(pd.DataFrame([f], columns=names))
+        lat.append(clock() - t0)
+        scaled.append(s)
+    results.append(summarize('scaler.transform', lat))
+
+    # 4. SVM 预测
+    preds, lat = [], []
+    for s in scaled:
+        t0 = clock()
+        p = clf.predict(s)[0]
+        lat.append(clock() - t0)
+        preds.append(p)
+    results.append(summarize('clf.predict', lat))
+
+    # 3+4. 不经过 pandas: 预分配缓冲上标准化 + 预测 (推理脚本现在的写法)，标签应与上面完全一致
+    predictor = svm_predictor.ScaledPredictor(clf, scaler)
+    mismatches, lat = 0, []
+    for f, p in zip(feats, preds):
+        t0 = clock()
+        q = predictor.predict(f)
+        lat.append(clock() - t0)
+        mismatches += int(q != p)
+    results.append(summarize('ScaledPredictor.predict', lat))
+    results[-1]['label_mismatches'] = mismatches
+
+    # 5. 迟滞滤波
+    hysteresis = HysteresisFilter()
+    lat = []
+    for p in preds:
+        t0 = clock()
+        hysteresis.update(p)
+        lat.append(clock() - t0)
+    results.append(summarize('HysteresisFilter.update', lat))
+
+    # 6. 整条链: 原始字节 -> 稳定状态 (与 inference_loop 一致，每个点云帧推理一次)
+    decoder = radar_protocol.FrameDecoder()
+    hysteresis = HysteresisFilter()
+    target = {'z': 0.0, 'speed': 0.0}
+    points = []
+    lat = []
+    for chunk in chunks:
+        t0 = clock()
+        decoder.feed(chunk)
+        for frame in decoder.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                t = radar_protocol.primary_target(frame)
+                if t:
+                    target.update(t)
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                points = radar_protocol.cloud_points(frame)
+        feature_extractor.extract_features_into(target, points, row, workspace)
+        hysteresis.update(predictor.predict(row))
+        lat.append(clock() - t0)
+    results.append(summarize('full_chain', lat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端推理链路基准")
+    parser.add_argument('--frames', type=int, default=2000, help="帧组数 (录制输入时为上限，0 表示全部)")
+    parser.add_argument('--points', type=int, default=None, help="合成输入每帧固定点数 (默认按姿态随机)")
+    parser.add_argument('--capture', default=None, help="使用 radar_capture 录制文件作为输入")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="含 radar_svm_model.pkl / radar_scaler.pkl 的目录")
+    parser.add_argument('--json', default=None, help="结果写入 JSON 文件，'-' 表示输出到标准输出 (表格改输出到标准错误)")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # 模型由其他 sklearn 版本保存时的提示
+        clf = joblib.load(os.path.join(args.model_dir, 'radar_svm_model.pkl'))
+        scaler = joblib.load(os.path.join(args.model_dir, 'radar_scaler.pkl'))
+    names = feature_extractor.FEATURE_NAMES
+
+    if args.capture:
+        chunks = capture_chunks(args.capture, args.frames)
+        source = args.capture
+    else:
+        chunks = synthetic_chunks(args.frames, args.points)
+        source = 'synthetic'
+    rss_before = peak_rss_mb()
+    results = run(chunks, clf, scaler, names)
+
+    report = {
+        'meta': {
+            'input': source,
+            'frames': len(chunks),
+            'points': args.points,
+            'bytes': sum(len(c) for c in chunks),
+            'model_dir': os.path.relpath(args.model_dir, ROOT),
+            'support_vectors': int(getattr(clf, 'n_support_', np.zeros(0)).sum()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+            'peak_rss_mb_before': rss_before,
+        },
+        'stages': results,
+    }
+
+    out = sys.stderr if args.json == '-' else sys.stdout  # '-' 时终端只输出 JSON，可直接接 jq
+    print(f"输入: {source} | 帧组: {len(chunks)} | 支持向量: {report['meta']['support_vectors']}", file=out)
+    print(f"{'阶段':<24} | {'p50 us':>9} | {'p99 us':>9} | {'帧/秒':>10} | {'峰值 RSS MB':>11}", file=out)
+    print("-" * 76, file=out)
+    for r in results:
+        print(f"{r['stage']:<24} | {r['p50_us']:>9.1f} | {r['p99_us']:>9.1f} | "
+              f"{r['frames_per_sec']:>10.0f} | {r['peak_rss_mb']:>11.1f}", file=out)
+    for r in results:
+        if 'label_mismatches' in r:
+            print(f"{r['stage']} 与 DataFrame 路径标签不一致: {r['label_mismatches']} 帧", file=out)
+
+    if args.json == '-':
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n结果已写入 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+多雷达推理服务基准：推理进程数 vs 总吞吐
+
+D 个虚拟设备 (radar_simulator 合成姿态，已解码成快照) 以尽可能快的速度向
+project_root/inference_server.InferenceServer 提交帧，每种进程数跑固定时长，
+统计所有设备合计的推理 帧/秒、单帧计算耗时和端到端延迟 (提交 -> 结果回到事件循环)。
+workers=0 为主进程内推理的基线；设备数 >= 进程数时吞吐应随核数近似线性增长。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_server.py
+    python3 benchmarks/bench_server.py --devices 16 --workers 1 2 4 8 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'project_root'))
+import inference_server
+import radar_protocol
+import radar_simulator
+import radar_stream
+
+MODEL_DIR = os.path.join(ROOT, 'project_root', 'weights')
+
+
+def make_snapshots(num_frames, seed):
+    """ 合成一个设备的帧序列 (姿态按块轮换) """
+    source = radar_simulator.SyntheticSource('stand', None, seed)
+    decoder = radar_protocol.FrameDecoder()
+    target = {'z': 0.0, 'speed': 0.0}
+    block = max(1, num_frames // len(radar_simulator.POSTURES))
+    snaps = []
+    for i in range(num_frames):
+        source.posture = radar_simulator.POSTURES[(i // block) % len(radar_simulator.POSTURES)]
+        decoder.feed(b''.join(radar_protocol.build_frame(t, p) for t, p in source.next_frames()))
+        for frame in decoder.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                target = radar_protocol.primary_target(frame) or target
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                snaps.append(radar_stream.FrameSnapshot(0, 0.0, target, radar_protocol.cloud_points(frame)))
+    return snaps
+
+
+async def drive(server, streams, seconds):
+    """ 每轮给每个设备提交一帧 (推理没回来的设备只保留最新帧)，跑满 seconds 秒 """
+    seq = 0
+    server.stats()  # 重置帧率计时起点
+    t_end = time.monotonic() + seconds
+    while time.monotonic() < t_end:
+        seq += 1
+        for name, snaps in streams.items():
+            snap = snaps[seq % len(snaps)]
+            server.submit(name, snap._replace(seq=seq, timestamp=time.monotonic()))
+        await asyncio.sleep(0.001)
+    return server.stats()
+
+
+def run(workers, streams, seconds):
+    server = inference_server.InferenceServer(
+        workers, model_path=os.path.join(MODEL_DIR, 'radar_svm_model.pkl'),
+        scaler_path=os.path.join(MODEL_DIR, 'radar_scaler.pkl'))
+    try:
+        stats = asyncio.run(drive(server, streams, seconds))
+    finally:
+        server.close()
+    done = sum(s['fps'] for s in stats.values())
+    n = len(stats)
+    return (done,
+            sum(s['compute_avg_ms'] for s in stats.values()) / n,
+            sum(s['latency_avg_ms'] for s in stats.values()) / n,
+            max(s['latency_max_ms'] for s in stats.values()))
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = [0] + sorted({1, 2, cores} | {w for w in (4, 8) if w <= cores})
+    parser = argparse.ArgumentParser(description="多雷达推理服务吞吐基准")
+    parser.add_argument('--devices', type=int, default=8, help="虚拟设备数")
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers, help="要测试的推理进程数")
+    parser.add_argument('--seconds', type=float, default=5.0, help="每种配置运行时长")
+    args = parser.parse_args()
+
+    streams = {f'dev{i}': make_snapshots(300, i) for i in range(args.devices)}
+    print(f"设备 {args.devices} 个, CPU 核数 {cores}, 每种配置 {args.seconds:.0f} 秒")
+    print(f"{'进程数':<6} | {'总 帧/秒':>9} | {'加速比':>6} | {'计算 ms':>8} | {'平均延迟 ms':>11} | {'最大延迟 ms':>11}")
+    print("-" * 68)
+    base = None
+    for w in args.workers:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # 模型由其他 sklearn 版本保存时的提示
+            fps, compute, lat, lat_max = run(w, streams, args.seconds)
+        if base is None:
+            base = fps
+        label = str(w) if w else "主进程"
+        print(f"{label:<6} | {fps:>9.1f} | {fps / base:>6.2f} | {compute:>8.2f} | {lat:>11.1f} | {lat_max:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+共享状态基准：data_lock 全局变量 vs radar_stream 不可变快照
+
+解析线程以最快速度解码一段 300 点的帧流，同时消费线程不停地提取特征：
+  - 加锁: 消费者持有 data_lock 计算特征 (旧写法)，解析线程更新全局变量时要等锁
+  - 快照: 解析线程 channel.publish()，消费者无锁读 channel.latest
+统计解析线程的吞吐量，以及解析线程发布一帧 (加锁写全局变量 / publish) 的耗时:
+加锁方式下这一步要等消费者算完特征，停顿过长时真实串口的接收缓冲会溢出丢帧。
+两种方式都还要竞争 GIL，所以整体吞吐差别不大，差别集中在发布耗时的尾部。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_snapshot.py
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import feature_extractor
+import radar_protocol
+import radar_stream
+from bench_decoder import CHUNK, make_stream
+
+
+def run_locked(stream):
+    state = {'target': {'z': 0.0, 'speed': 0.0}, 'points': []}
+    lock = threading.Lock()
+    done = threading.Event()
+    consumed = [0]
+
+    def consumer():
+        while not done.is_set():
+            with lock:
+                feature_extractor.extract_features(state['target'], state['points'])
+            consumed[0] += 1
+
+    def publish(target, points):
+        with lock:
+            state['target'].update(target)
+            state['points'] = points
+
+    return run_parser(stream, publish, consumer, done, consumed)
+
+
+def run_snapshot(stream):
+    channel = radar_stream.FrameChannel()
+    done = threading.Event()
+    consumed = [0]
+
+    def consumer():
+        while not done.is_set():
+            snap = channel.latest
+            feature_extractor.extract_features(snap.target, snap.points)
+            consumed[0] += 1
+
+    return run_parser(stream, channel.publish, consumer, done, consumed)
+
+
+def run_parser(stream, publish, consumer, done, consumed):
+    t = threading.Thread(target=consumer, daemon=True)
+    t.start()
+    decoder = radar_protocol.FrameDecoder()
+    target = {'z': 0.0, 'speed': 0.0}
+    publish_lat = []
+    t_start = time.perf_counter()
+    for i in range(0, len(stream), CHUNK):
+        decoder.feed(stream[i:i + CHUNK])
+        for frame in decoder.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                target = radar_protocol.primary_target(frame) or target
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                points = radar_protocol.cloud_points(frame)
+                t0 = time.perf_counter()
+                publish(target, points)
+                publish_lat.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t_start
+    done.set()
+    t.join()
+    lat_us = np.asarray(publish_lat) * 1e6
+    return (len(lat_us) / elapsed, np.percentile(lat_us, 50), np.percentile(lat_us, 99),
+            consumed[0] / elapsed)
+
+
+def main(repeat=3):
+    stream = make_stream(3000, 300, 0.0)
+    print(f"{'方式':<6} | {'解析 帧/秒':>10} | {'发布 p50 us':>11} | {'发布 p99 us':>11} | {'消费 次/秒':>10}")
+    print("-" * 62)
+    for name, fn in (("加锁", run_locked), ("快照", run_snapshot)):
+        # 线程调度抖动较大，取多次运行的中位数
+        fps, p50, p99, cps = np.median([fn(stream) for _ in range(repeat)], axis=0)
+        print(f"{name:<6} | {fps:>10.0f} | {p50:>11.1f} | {p99:>11.1f} | {cps:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
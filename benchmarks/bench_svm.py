@@ -0,0 +1,107 @@
+"""
+SVM 求值基准：sklearn SVC.predict vs svm_predictor.RbfSvm (纯 NumPy)
+
+  - 单样本: 推理脚本每帧一次的调用方式 (SVC.predict(1 行) vs RbfSvm.predict_one)
+  - 批量:   多帧 / 多雷达一起算 (SVC.predict(B 行) vs RbfSvm.predict)
+同时逐样本核对两边标签，并给出决策值的最大差异。
+输入为训练数据 (project_root/data/radar_training_data.csv，若存在) 标准化后的特征，
+否则用标准正态随机样本。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_svm.py
+    python3 benchmarks/bench_svm.py --samples 2000 --batch 1 16 128 1024
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import joblib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import feature_extractor
+import svm_predictor
+
+PROJECT = os.path.join(ROOT, 'project_root')
+
+
+def load_samples(scaler, num):
+    csv = os.path.join(PROJECT, 'data', 'radar_training_data.csv')
+    if os.path.exists(csv):
+        X = scaler.transform(pd.read_csv(csv)[feature_extractor.FEATURE_NAMES])
+        source = os.path.relpath(csv, ROOT)
+    else:
+        X = np.random.default_rng(0).normal(size=(num, scaler.n_features_in_))
+        source = 'random'
+    idx = np.random.default_rng(1).permutation(len(X))[:num]
+    return np.ascontiguousarray(X[idx]), source
+
+
+def time_single(fn, X):
+    lat = []
+    for x in X:
+        t0 = time.perf_counter_ns()
+        fn(x)
+        lat.append(time.perf_counter_ns() - t0)
+    return np.asarray(lat) / 1e3
+
+
+def time_batch(fn, X, batch, repeat=3):
+    """ 每个批次的平均耗时 (us)，取 repeat 次中最快的一次 """
+    best = float('inf')
+    n = len(X) // batch * batch
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for s in range(0, n, batch):
+            fn(X[s:s + batch])
+        best = min(best, (time.perf_counter() - t0) / (n // batch))
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SVM 求值基准 (sklearn vs 纯 NumPy)")
+    parser.add_argument('--samples', type=int, default=3000, help="样本数")
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 8, 64, 512], help="批量大小")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # 模型由其他 sklearn 版本保存时的提示
+        clf = joblib.load(os.path.join(PROJECT, 'weights', 'radar_svm_model.pkl'))
+        scaler = joblib.load(os.path.join(PROJECT, 'weights', 'radar_scaler.pkl'))
+    t0 = time.perf_counter()
+    svm = svm_predictor.RbfSvm.from_sklearn(clf)
+    export_ms = (time.perf_counter() - t0) * 1000
+    X, source = load_samples(scaler, args.samples)
+
+    # 正确性: 标签逐一核对 + 决策值差异 (libsvm 一对一原始决策值)
+    ref = clf.predict(X)
+    batch_diff = int((svm.predict(X) != ref).sum())
+    single_diff = int(sum(svm.predict_one(x) != r for x, r in zip(X, ref)))
+    dec_err = np.abs(svm.decision(X) - clf._decision_function(X)).max()
+    print(f"输入: {source} | 样本: {len(X)} | 支持向量: {len(svm.support_vectors)} | 导出耗时 {export_ms:.1f} ms")
+    print(f"标签不一致: 批量 {batch_diff} / 单样本 {single_diff} | 决策值最大差异 {dec_err:.2e}\n")
+
+    sk = time_single(lambda x: clf.predict(x[None, :]), X)
+    np_ = time_single(svm.predict_one, X)
+    print(f"{'单样本':<10} | {'p50 us':>9} | {'p99 us':>9} | {'帧/秒':>8}")
+    print("-" * 46)
+    for name, lat in (("sklearn", sk), ("RbfSvm", np_)):
+        print(f"{name:<10} | {np.percentile(lat, 50):>9.1f} | {np.percentile(lat, 99):>9.1f} | {1e6 / lat.mean():>8.0f}")
+    print(f"加速比 (p50): {np.percentile(sk, 50) / np.percentile(np_, 50):.1f}x\n")
+
+    print(f"{'批量':>6} | {'sklearn us/批':>13} | {'RbfSvm us/批':>12} | {'RbfSvm 样本/秒':>14} | {'加速比':>6}")
+    print("-" * 64)
+    for b in args.batch:
+        if b > len(X):
+            continue
+        t_sk = time_batch(clf.predict, X, b)
+        t_np = time_batch(svm.predict, X, b)
+        print(f"{b:>6} | {t_sk:>13.1f} | {t_np:>12.1f} | {b / t_np * 1e6:>14.0f} | {t_sk / t_np:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+训练耗时基准：SVC(probability=True) vs 不校准 / 留出集单独校准
+
+在 project_root/data/radar_training_data.csv 上 (与 2_train_svm.py 相同的 8:2 划分、标准化) 比较:
+  - 旧写法:   SVC(probability=True)，libsvm 内部再做 5 折交叉验证拟合 Platt 系数
+  - 不校准:   SVC()，推理脚本只调用 predict，这就够了 (2_train_svm.py 默认)
+  - 留出校准: 训练集再留出 20% 拟合 SVC()，之后单独在留出集上拟合 sigmoid 校准
+              (2_train_svm.py 中 CALIBRATE_PROBABILITY = True)
+输出各自的训练 / 校准耗时、测试集准确率，以及有概率输出时的 log loss。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_train.py
+    python3 benchmarks/bench_train.py --rows 5000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+try:
+    from sklearn.frozen import FrozenEstimator
+except ImportError:  # sklearn < 1.6
+    FrozenEstimator = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import feature_extractor
+
+DEFAULT_CSV = os.path.join(ROOT, 'project_root', 'data', 'radar_training_data.csv')
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def calibrate(model, X_cal, y_cal):
+    if FrozenEstimator is not None:
+        cal = CalibratedClassifierCV(FrozenEstimator(model), method='sigmoid')
+    else:
+        cal = CalibratedClassifierCV(model, method='sigmoid', cv='prefit')
+    return cal.fit(X_cal, y_cal)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SVM 训练 / 概率校准耗时基准")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="训练数据 CSV")
+    parser.add_argument('--rows', type=int, default=0, help="只用前 N 行 (0 表示全部)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    if args.rows:
+        df = df.sample(n=min(args.rows, len(df)), random_state=0)
+    X, y = df[feature_extractor.FEATURE_NAMES], df['label']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler = StandardScaler().fit(X_train)
+    X_train_s, X_test_s = scaler.transform(X_train), scaler.transform(X_test)
+    X_fit, X_cal, y_fit, y_cal = train_test_split(X_train_s, y_train, test_size=0.2,
+                                                  random_state=42, stratify=y_train)
+    print(f"数据: {os.path.relpath(args.csv, ROOT)} | {len(df)} 行 (训练 {len(y_train)}, 测试 {len(y_test)})\n")
+
+    rows = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)  # sklearn 1.9 起 probability 参数已弃用
+        model, t = timed(lambda: SVC(kernel='rbf', C=1.0, gamma='scale', probability=True).fit(X_train_s, y_train))
+    rows.append(("probability=True", t, 0.0, model, model))
+
+    model, t = timed(lambda: SVC(kernel='rbf', C=1.0, gamma='scale').fit(X_train_s, y_train))
+    rows.append(("不校准", t, 0.0, model, None))
+
+    model, t = timed(lambda: SVC(kernel='rbf', C=1.0, gamma='scale').fit(X_fit, y_fit))
+    cal, t_cal = timed(lambda: calibrate(model, X_cal, y_cal))
+    rows.append(("留出集校准", t, t_cal, model, cal))
+
+    base = rows[0][1] + rows[0][2]
+    print(f"{'方式':<16} | {'训练 s':>7} | {'校准 s':>7} | {'合计 s':>7} | {'提速':>5} | {'准确率':>6} | {'log loss':>8}")
+    print("-" * 76)
+    for name, t_fit, t_cal, model, prob in rows:
+        acc = accuracy_score(y_test, model.predict(X_test_s))
+        ll = f"{log_loss(y_test, prob.predict_proba(X_test_s), labels=prob.classes_):>8.3f}" if prob is not None else f"{'-':>8}"
+        total = t_fit + t_cal
+        print(f"{name:<16} | {t_fit:>7.1f} | {t_cal:>7.2f} | {total:>7.1f} | {base / total:>4.1f}x | {acc:>6.3f} | {ll}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+采集写入基准：逐行 writerow + flush vs radar_writer.BatchedCsvWriter
+
+模拟采集循环每帧写一行 (10 维特征 + label)，统计采集线程上每次写入调用的耗时分布:
+  - writerow+flush:        旧写法，每帧一次 write 系统调用
+  - writerow+flush+fsync:  每帧都强制落盘 (SD 卡上最慢的情况)
+  - BatchedCsvWriter:      只入队，由后台线程批量写入 (同时给出 fsync=True 时的结果)
+采集线程上的耗时越稳定，实际采样间隔越接近雷达出帧节奏。
+
+运行 (仓库根目录):
+    python3 benchmarks/bench_writer.py
+    python3 benchmarks/bench_writer.py --rows 5000 --dir /media/sdcard
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import feature_extractor
+import radar_writer
+
+
+def make_rows(num, seed=0):
+    rng = np.random.default_rng(seed)
+    feats = rng.random((num, len(feature_extractor.FEATURE_NAMES))) * 3
+    return [list(f) + [int(rng.integers(0, 3))] for f in feats]
+
+
+def per_row_writer(path, rows, fsync):
+    lat = []
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(feature_extractor.FEATURE_NAMES + ['label'])
+        for row in rows:
+            t0 = time.perf_counter()
+            writer.writerow(row)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            lat.append(time.perf_counter() - t0)
+    return np.asarray(lat) * 1e6, ""
+
+
+def batched_writer(path, rows, fsync):
+    lat = []
+    with radar_writer.BatchedCsvWriter(path, feature_extractor.FEATURE_NAMES + ['label'], fsync=fsync) as writer:
+        for row in rows:
+            t0 = time.perf_counter()
+            writer.write(row)
+            lat.append(time.perf_counter() - t0)
+        writer.flush()
+        summary = writer.summary()
+    return np.asarray(lat) * 1e6, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采集 CSV 写入基准 (逐行 flush vs 后台批量写)")
+    parser.add_argument('--rows', type=int, default=20000, help="写入行数")
+    parser.add_argument('--dir', default=None, help="写入目录 (默认临时目录；在 SD 卡上测更接近边缘设备)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench_writer_', dir=args.dir)
+    rows = make_rows(args.rows)
+    cases = [
+        ("writerow+flush", per_row_writer, False),
+        ("writerow+flush+fsync", per_row_writer, True),
+        ("BatchedCsvWriter", batched_writer, False),
+        ("Batched fsync=True", batched_writer, True),
+    ]
+    try:
+        print(f"写入 {args.rows} 行 -> {tmp}\n")
+        print(f"{'方式':<22} | {'p50 us':>8} | {'p99 us':>8} | {'最大 us':>9} | {'合计 s':>7}")
+        print("-" * 68)
+        outputs = []
+        for name, fn, fsync in cases:
+            path = os.path.join(tmp, f"{len(outputs)}.csv")
+            lat, summary = fn(path, rows, fsync)
+            outputs.append(path)
+            print(f"{name:<22} | {np.percentile(lat, 50):>8.1f} | {np.percentile(lat, 99):>8.1f} | "
+                  f"{lat.max():>9.1f} | {lat.sum() / 1e6:>7.3f}")
+            if summary:
+                print(f"{'':<22}   {summary}")
+        contents = {open(p, 'rb').read() for p in outputs}
+        print(f"\n输出文件一致: {len(contents) == 1}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
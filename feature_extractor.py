@@ -60,4 +60,155 @@ def extract_features(target_info, point_cloud_list):
         # 点太少，几何特征无效，给默认值
         cloud_feats = [0.0] * 8
         
-    return base_feats + cloud_feats
\ No newline at end of file
+    return base_feats + cloud_feats
+
+def stack_point_clouds(point_cloud_lists):
+    """
+    把多帧点云首尾相接，供 extract_features_batch 使用
+    输入:
+      point_cloud_lists: 每帧一个 [(x, y, speed), ...] 列表或 (N, 3) 数组
+    输出:
+      points: (P, 3) float64 数组
+      offsets: (F+1,) 数组，第 i 帧的点为 points[offsets[i]:offsets[i+1]]
+    """
+    counts = [len(pc) for pc in point_cloud_lists]
+    offsets = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    frames = [np.asarray(pc, dtype=np.float64).reshape(-1, 3) for pc in point_cloud_lists if len(pc)]
+    points = np.concatenate(frames) if frames else np.empty((0, 3))
+    return points, offsets
+
+def extract_features_batch(targets, points, offsets):
+    """
+    批量特征提取：一次计算多帧，逐行结果与 extract_features 完全一致
+    输入:
+      targets: (F, 2) 数组 [[z, speed], ...]，每帧一行
+      points: (P, >=2) 数组，所有帧的点云首尾相接，前两列为 x, y
+      offsets: (F+1,) 数组，第 i 帧的点为 points[offsets[i]:offsets[i+1]]
+    输出:
+      (F, 10) float64 数组，列顺序同 FEATURE_NAMES
+    """
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    counts = np.diff(offsets)
+
+    feats = np.zeros((len(counts), len(FEATURE_NAMES)))
+    feats[:, 0:2] = targets
+
+    # 点太少 (< 3) 的帧几何特征无效，保持默认值 0
+    valid = counts >= 3
+    if not valid.any():
+        return feats
+
+    pts = np.asarray(points, dtype=np.float64)
+    x = np.ascontiguousarray(pts[:, 0])
+    y = np.ascontiguousarray(pts[:, 1])
+
+    # 1. 包围盒：分段归约 (跳过空帧，保证每一段正好是一帧的点)
+    nonempty = counts > 0
+    starts = offsets[:-1][nonempty]
+    seg_valid = valid[nonempty]
+    x_min = np.minimum.reduceat(x, starts)[seg_valid]
+    x_max = np.maximum.reduceat(x, starts)[seg_valid]
+    y_min = np.minimum.reduceat(y, starts)[seg_valid]
+    y_max = np.maximum.reduceat(y, starts)[seg_valid]
+
+    width = x_max - x_min
+    depth = y_max - y_min
+    area = width * depth
+    ratio = width / (depth + 0.001)
+
+    # 2. 离散度 (标准差)：按点数分组，每组整理成 (帧数, 点数) 矩阵逐行求 std
+    # (与逐帧 np.std 的求和顺序相同，结果逐位一致；reduceat 的顺序累加做不到)
+    n = counts[valid]
+    frame_starts = offsets[:-1][valid]
+    std_x = np.empty(len(n))
+    std_y = np.empty(len(n))
+    for size in np.unique(n):
+        group = np.flatnonzero(n == size)
+        idx = frame_starts[group][:, None] + np.arange(size)
+        std_x[group] = np.std(x[idx], axis=1)
+        std_y[group] = np.std(y[idx], axis=1)
+
+    # 3. 密度
+    density = n / (area + 0.01)
+
+    feats[valid, 2:] = np.column_stack([
+        width, depth, area, ratio,
+        std_x, std_y,
+        n, density
+    ])
+    return feats
+
+
+class FeatureWorkspace:
+    """
+    extract_features_into 的预分配工作区，每个线程持有一个，循环复用
+    """
+    def __init__(self, max_points=512):
+        self.max_points = max_points
+        self.xy = np.empty((2, max_points))   # 第 0 行 x，第 1 行 y (行内连续)
+        self.dev = np.empty((2, max_points))  # 偏差 / 偏差平方
+        self.lo = np.empty(2)                 # [x_min, y_min]
+        self.hi = np.empty(2)                 # [x_max, y_max]
+        self.mean = np.empty((2, 1))
+        self.var = np.empty(2)
+
+    def reserve(self, n):
+        # 点数超过容量时才扩容 (只发生在少数大帧上)
+        if n > self.max_points:
+            self.__init__(max(n, 2 * self.max_points))
+
+def extract_features_into(target_info, points, out, workspace):
+    """
+    extract_features 的数组版快速路径：不做列表转换，不分配新数组
+    输入:
+      target_info: 字典 {'z': float, 'speed': float}
+      points: (N, >=2) 数组 (float32 / float64)，前两列为 x, y
+      out: 长度为 10 的预分配数组，结果按 FEATURE_NAMES 顺序写入
+      workspace: FeatureWorkspace
+    输出:
+      out (与 extract_features 的结果逐位一致)
+    """
+    out[0] = target_info.get('z', 0.0)
+    out[1] = target_info.get('speed', 0.0)
+
+    n = len(points)
+    if n < 3:
+        # 点太少，几何特征无效，给默认值
+        out[2:] = 0.0
+        return out
+
+    workspace.reserve(n)
+    xy = workspace.xy[:, :n]
+    dev = workspace.dev[:, :n]
+    lo, hi, mean, var = workspace.lo, workspace.hi, workspace.mean, workspace.var
+
+    # 转置拷贝到 float64 工作区 (float32 -> float64 无损)，之后所有归约都按行连续进行
+    np.copyto(xy, points[:, :2].T)
+
+    # 包围盒
+    np.minimum.reduce(xy, axis=1, out=lo)
+    np.maximum.reduce(xy, axis=1, out=hi)
+    width = hi[0] - lo[0]
+    depth = hi[1] - lo[1]
+    area = width * depth
+
+    # 离散度 (标准差)：与 np.std 相同的两遍算法，求和顺序一致
+    np.add.reduce(xy, axis=1, keepdims=True, out=mean)
+    mean /= n
+    np.subtract(xy, mean, out=dev)
+    np.multiply(dev, dev, out=dev)
+    np.add.reduce(dev, axis=1, out=var)
+    var /= n
+    np.sqrt(var, out=var)
+
+    out[2] = width
+    out[3] = depth
+    out[4] = area
+    out[5] = width / (depth + 0.001)  # 防止除以0
+    out[6] = var[0]
+    out[7] = var[1]
+    out[8] = n
+    out[9] = n / (area + 0.01)
+    return out
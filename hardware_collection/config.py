@@ -20,11 +20,28 @@ TARGET_REMOTE_ID = [0xE7, 0x6B, 0x42, 0x43]
 # --- 数据存储 ---
 DATA_DIR = "./data"
 CSV_PATH = os.path.join(DATA_DIR, "radar_10dim_dataset.csv")
-COLLECT_NUM_FRAMES = 500  # 每次按键录制的帧数
-# 0.1 = 10Hz (500帧需50秒) -> 太慢
-# 0.05 = 20Hz (500帧需25秒) -> 推荐
-# 0.02 = 50Hz (500帧需10秒) -> 极速 (需确保雷达串口不拥堵)
+COLLECT_NUM_FRAMES = 500  # 每次按键录制的帧数 (每个新的雷达帧一行，录制时长取决于雷达出帧速率)
+# 采集频率上限 (Hz)：0 = 雷达每出一帧记录一行；限速时跳过中间的帧，不会重复记录同一帧
+# 10 = 10Hz (500帧需50秒)
+# 20 = 20Hz (500帧需25秒)
+COLLECT_MAX_HZ = 0
+# 旧版的定时采样间隔 (秒)：现在只用于每次录制结束时估算帧同步采样避免了多少重复行
 COLLECT_DELAY = 0.05
+# CSV 由后台线程批量写入 (见仓库根目录 radar_writer.py)：攒够 WRITER_BATCH_ROWS 行
+# 或最早一行等待超过 WRITER_FLUSH_INTERVAL 秒时写一次，进程崩溃最多丢失这么多数据
+WRITER_BATCH_ROWS = 256
+WRITER_FLUSH_INTERVAL = 1.0
+# 输出轮转与压缩 (见仓库根目录 radar_writer.py)：每次运行写到 CSV_PATH 的新分段
+# (<名称>.<会话时间>.<序号>.csv)，单个分段超过 ROTATE_MAX_MB 时切换到下一个分段；
+# 关闭的分段在后台压缩 (COMPRESSION = 'gzip' / 'lzma' / None)。训练 / 合并时自动读取原文件和全部分段
+ROTATE_SEGMENTS = True
+ROTATE_MAX_MB = 20
+COMPRESSION = 'gzip'
+
+# 原始帧录制 (见仓库根目录 radar_capture.py)：每次运行在 RAW_CAPTURE_DIR 下生成一个 .cap 文件，
+# 之后改了特征定义也可以直接从录制文件重新生成数据集，不用重新采集
+RAW_CAPTURE = True
+RAW_CAPTURE_DIR = os.path.join(DATA_DIR, "raw")
 
 # --- 标签定义 ---
 # 遥控器按键值 (Hex) -> 标签 ID 的映射
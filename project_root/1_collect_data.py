@@ -1,130 +1,58 @@
 import serial
-import struct
 import threading
 import time
-import csv
 import os
+import sys
 import config            # 导入配置
 import feature_extractor # 导入特征提取
 
-# 全局变量
-current_target = {'z': 0.0, 'speed': 0.0}
-current_points = []
-data_lock = threading.Lock()
+# 共享的协议解析模块位于仓库根目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_protocol
+import radar_capture
+import radar_stream
+import radar_writer
+
+# 全局变量 (目标 + 点云 由 channel 以不可变快照发布，读写都不加锁)
 stop_flag = False
+channel = radar_stream.FrameChannel()
+sampler = radar_stream.FrameSampler(channel, config.COLLECT_MAX_HZ)  # 采集: 每个新帧一行
+decoder = radar_protocol.FrameDecoder()  # 零拷贝帧解码器 (带吞吐统计)
+recorder = None  # 原始帧录制 (config.RAW_CAPTURE)
+writer = None    # radar_writer.BatchedCsvWriter (后台批量写 CSV，可分段轮转 + 压缩)
 
-# --- 核心修正：通信校验函数 (XOR 算法) ---
-def calc_checksum(data):
-    """
-    修正后的校验算法：使用异或 (XOR)
-    """
-    checksum = 0
-    for b in data:
-        checksum ^= b
-    return (~checksum) & 0xFF
-
-def send_cmd(ser, cmd_val):
-    """
-    封装发送指令：自动计算头部和载荷的校验和
-    """
-    # 协议头: SOF(1) + ID(2) + LEN(2) + TYPE(2)
-    # ID=1, LEN=4, TYPE=0x0201 (控制指令)
-    header = b'\x01\x00\x01\x00\x04\x02\x01'
-    
-    # 计算头校验
-    h_cs = calc_checksum(header)
-    
-    # 负载: int32 小端序
-    payload = struct.pack('<I', cmd_val)
-    
-    # 计算数据校验
-    d_cs = calc_checksum(payload)
-    
-    # 拼接完整帧
-    frame = header + bytes([h_cs]) + payload + bytes([d_cs])
-    return frame
+# 通信校验 (XOR)、指令封装、帧解析均由 radar_protocol 统一实现
 
 def parse_data(ser):
     """
     完整的数据解析线程：不再省略任何逻辑
     """
-    global current_target, current_points
-    buffer = b""
     print("DEBUG: 数据接收线程已启动，正在监听数据流...")
+    target = {'z': 0.0, 'speed': 0.0}  # 最近一次的主要目标 (只在本线程内替换，不原地修改)
     
     while not stop_flag:
         try:
             if ser.in_waiting: 
-                buffer += ser.read(ser.in_waiting)
+                decoder.feed(ser.read(ser.in_waiting))
             
-            # 寻找帧头 SOF (0x01)
-            # 至少需要 8 字节 (7字节头 + 1字节头校验) 才能开始判断
-            while len(buffer) >= 8:
-                if buffer[0] != 0x01:
-                    buffer = buffer[1:] # 不是头，丢弃
-                    continue
-                
-                # 1. 校验头部
-                header = buffer[0:7]
-                h_cksum_recv = buffer[7]
+            # 解码器负责寻找帧头 SOF (0x01)、校验头部和数据体，
+            # 并按帧类型分发给对应的解析函数 (见 radar_protocol.FRAME_HANDLERS)
+            for frame in decoder.decoded():
                 
-                if calc_checksum(header) != h_cksum_recv:
-                    buffer = buffer[1:] # 校验失败，滑动窗口
-                    continue
-                
-                # 解析头部信息
-                _, _, data_len, frame_type = struct.unpack('>BHHH', header)
-                total_len = 8 + data_len + 1 # 头(7+1) + 数据(N) + 数据校验(1)
-                
-                if len(buffer) < total_len: 
-                    break # 数据没收全，等待下一波串口数据
-                
-                # 2. 校验数据体
-                payload = buffer[8 : 8+data_len]
-                d_cksum_recv = buffer[8+data_len]
-                
-                if calc_checksum(payload) == d_cksum_recv:
-                    
-                    # --- 解析 0x0A04 (目标信息) ---
-                    # 格式: Num(4) + [x, y, z, dop_idx, cluster_id]...
-                    if frame_type == 0x0A04 and len(payload) >= 4:
-                        num = struct.unpack('<i', payload[0:4])[0]
-                        if num > 0:
-                            # 我们只取第一个主要目标 (Offset=4)
-                            # 20字节结构: x(4), y(4), z(4), dop_idx(4), cluster_id(4)
-                            if len(payload) >= 24:
-                                _, _, z, dop_idx, _ = struct.unpack('<fffii', payload[4:24])
-                                with data_lock:
-                                    current_target['z'] = z
-                                    current_target['speed'] = float(dop_idx)
-                                
-                    # --- 解析 0x0A08 (点云信息) ---
-                    # 格式: Num(4) + [cluster_id, x, y, z, speed]...
-                    elif frame_type == 0x0A08 and len(payload) >= 4:
-                        num = struct.unpack('<i', payload[0:4])[0]
-                        temp_points = []
-                        offset = 4
-                        for _ in range(num):
-                            if offset + 20 > len(payload): break
-                            # 解析单个点: cluster(4), x(4), y(4), z(4), speed(4)
-                            _, x, y, z, s = struct.unpack('<iffff', payload[offset:offset+20])
+                # --- 0x0A04 (目标信息) ---
+                # 我们只取第一个主要目标
+                if isinstance(frame, radar_protocol.TargetFrame):
+                    target = radar_protocol.primary_target(frame) or target
                             
-                            # 简单清洗: 过滤掉太远或异常的噪点
-                            if abs(x) < 4.0 and 0.1 < y < 6.0:
-                                temp_points.append((x, y, s))
-                            
-                            offset += 20
-                        
-                        with data_lock:
-                            current_points = temp_points
-                            
-                # 处理完一帧，从缓冲区移除该帧数据
-                buffer = buffer[total_len:] 
+                # --- 0x0A08 (点云信息) ---
+                # 简单清洗 (ROI) 后得到 (N, 3) 数组: [x, y, speed]，与最近的目标一起发布
+                elif isinstance(frame, radar_protocol.PointCloudFrame):
+                    channel.publish(target, radar_protocol.cloud_points(frame))
                 
         except Exception as e:
             # 捕获解析过程中的意外错误，防止线程退出
+            # (出错的帧已被解码器消费，不会卡在同一位置)
             print(f"解析出错: {e}")
-            buffer = buffer[1:]
 
 if __name__ == "__main__":
     try:
@@ -145,36 +73,43 @@ if __name__ == "__main__":
         
         # 2. 循环发送关键指令
         cmds = [
-            (0x14, "侧装模式"), 
-            (0x08, "开启目标信息(0x0A04)"), 
-            (0x06, "开启点云信息(0x0A08)"),
-            (0x0C, "设置高灵敏度"), 
-            (0x0F, "设置快速触发")
+            (radar_protocol.CMD_SIDE_MOUNT, "侧装模式"), 
+            (radar_protocol.CMD_TARGET_ON, "开启目标信息(0x0A04)"), 
+            (radar_protocol.CMD_POINT_CLOUD_ON, "开启点云信息(0x0A08)"),
+            (radar_protocol.CMD_HIGH_SENSITIVITY, "设置高灵敏度"), 
+            (radar_protocol.CMD_FAST_TRIGGER, "设置快速触发")
         ]
         
         for _ in range(2): # 发送两轮，确保雷达收到
             for cmd, name in cmds:
                 # print(f"  -> 发送: {name}") 
-                ser.write(send_cmd(ser, cmd))
+                ser.write(radar_protocol.build_command(cmd))
                 time.sleep(0.1) # 稍微延时，防止指令粘包
         
         ser.reset_input_buffer()
         print("✅ 初始化指令已发送，等待数据回传...")
 
+        # 原始帧录制：每个校验通过的帧都会追加到 .cap 文件 (带当前标签)
+        if config.RAW_CAPTURE:
+            os.makedirs(config.RAW_CAPTURE_DIR, exist_ok=True)
+            recorder = radar_capture.CaptureWriter(radar_capture.new_capture_path(config.RAW_CAPTURE_DIR))
+            decoder.on_frame = recorder.write
+            print(f"📼 原始帧录制: {recorder.path}")
+
         # 启动接收线程
         t = threading.Thread(target=parse_data, args=(ser,), daemon=True)
         t.start()
         
-        # 准备 CSV 文件
-        file_exists = os.path.isfile(config.CSV_PATH)
-        with open(config.CSV_PATH, 'a', newline='') as f:
-            writer = csv.writer(f)
-            # 如果文件不存在，写入表头
-            if not file_exists:
-                writer.writerow(feature_extractor.FEATURE_NAMES + ['label'])
-            
-            print(f"\n✅ 数据将追加到: {config.CSV_PATH}")
-            print(f"⚙️ 每次采集: {config.COLLECT_NUM_FRAMES} 帧 (约 {config.COLLECT_NUM_FRAMES * config.COLLECT_DELAY} 秒)")
+        # 准备 CSV 文件 (不存在时写入表头)，由后台线程批量写入，采集循环只入队
+        with radar_writer.BatchedCsvWriter(config.CSV_PATH, feature_extractor.FEATURE_NAMES + ['label'],
+                                           batch_rows=config.WRITER_BATCH_ROWS,
+                                           flush_interval=config.WRITER_FLUSH_INTERVAL,
+                                           rotate=config.ROTATE_SEGMENTS,
+                                           max_bytes=int(config.ROTATE_MAX_MB * 1e6),
+                                           compress=config.COMPRESSION) as writer:
+            print(f"\n✅ 数据将追加到: {writer.path}")
+            rate = f"最高 {config.COLLECT_MAX_HZ} Hz" if config.COLLECT_MAX_HZ else "每个雷达帧一行"
+            print(f"⚙️ 每次采集: {config.COLLECT_NUM_FRAMES} 帧 ({rate})")
             print("❗ 提示: 采集时请确保雷达前方有人活动，否则 Z轴 可能为 0")
             
             while True:
@@ -184,27 +119,44 @@ if __name__ == "__main__":
                 
                 label = int(u_in)
                 print(f"🎥 开始录制标签 [{label}] ... 请变换姿态!")
+                if recorder: recorder.label = label
                 
-                for i in range(config.COLLECT_NUM_FRAMES):
-                    with data_lock:
-                        # 提取特征 (这里 current_target 和 current_points 应该已经被线程更新了)
-                        feats = feature_extractor.extract_features(current_target, current_points)
-                        
-                        # --- 实时反馈区 ---
-                        # 如果 Z轴(feats[0]) 为0 且 点云数(feats[8]) 为0，说明没读到有效数据
-                        if i % 20 == 0: # 每20帧打印一次状态，避免刷屏太快
-                            if feats[0] == 0 and feats[8] == 0:
-                                print(f"\r⚠️ [无数据] 请在雷达前晃动... ({i}/{config.COLLECT_NUM_FRAMES})", end="")
-                            else:
-                                print(f"\r✅ 录制中: Z={feats[0]:.2f}m | 点云数={feats[8]} ({i}/{config.COLLECT_NUM_FRAMES})", end="")
+                # 帧同步：每个新解析出的雷达帧记录一行 (不再定时读取，避免同一帧被写入多次)
+                sampler.reset()
+                i = 0
+                while i < config.COLLECT_NUM_FRAMES:
+                    snap = sampler.next(timeout=1.0)
+                    if snap is None:
+                        print(f"\r⚠️ [无数据] 等待雷达帧... ({i}/{config.COLLECT_NUM_FRAMES})", end="")
+                        continue
+                    # 提取特征 (解析线程发布的快照不可变，无需加锁)
+                    feats = feature_extractor.extract_features(snap.target, snap.points)
+                    
+                    # --- 实时反馈区 ---
+                    # 如果 Z轴(feats[0]) 为0 且 点云数(feats[8]) 为0，说明没读到有效数据
+                    if i % 20 == 0: # 每20帧打印一次状态，避免刷屏太快
+                        if feats[0] == 0 and feats[8] == 0:
+                            print(f"\r⚠️ [无数据] 请在雷达前晃动... ({i}/{config.COLLECT_NUM_FRAMES})", end="")
+                        else:
+                            print(f"\r✅ 录制中: Z={feats[0]:.2f}m | 点云数={feats[8]} ({i}/{config.COLLECT_NUM_FRAMES})", end="")
                     
-                    writer.writerow(feats + [label])
-                    time.sleep(config.COLLECT_DELAY)
+                    writer.write(feats + [label])
+                    i += 1
                 
-                print("\n完成!")
+                writer.flush()
+                if recorder: recorder.label = radar_capture.LABEL_NONE
+                print(f"\n完成! {sampler.summary(config.COLLECT_DELAY)}")
+                print(f"💾 {writer.summary()}")
 
     except Exception as e:
         print(f"\n❌ 发生严重错误: {e}")
     finally:
         stop_flag = True
+        st = decoder.stats()
+        print(f"解码统计: 有效帧 {st['frames_ok']} | 坏帧 {st['frames_bad']} | 丢弃字节 {st['bytes_skipped']}")
+        if writer and writer.compressor:
+            print(writer.compressor.summary())
+        if recorder:
+            recorder.close()
+            print(f"原始帧已保存: {recorder.path} ({recorder.records} 帧, {recorder.bytes_written / 1e6:.1f} MB)")
         print("程序已退出")
\ No newline at end of file
@@ -1,21 +1,164 @@
+import time
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.svm import SVC
+from sklearn.model_selection import train_test_split, GridSearchCV, ParameterGrid, StratifiedGroupKFold
+from sklearn.svm import SVC, LinearSVC
+from sklearn.kernel_approximation import RBFSampler, Nystroem
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.metrics import classification_report, accuracy_score, log_loss
+from sklearn.calibration import CalibratedClassifierCV
+try:
+    from sklearn.frozen import FrozenEstimator
+except ImportError:  # sklearn < 1.6 用 cv='prefit'
+    FrozenEstimator = None
 import joblib
 import os
+import sys
+import config
 import feature_extractor  # 【关键】导入特征定义模块，保证和采集、推理完全一致
 
+# 时序特征 / 预测 / 数据集缓存模块位于仓库根目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_dataset
+import svm_predictor
+import temporal_features
+
+
+def build_approx_model(kind, n_components, gamma):
+    """ 核近似 + 线性 SVM: 特征映射到固定 n_components 维，再做线性分类 """
+    if kind == 'rff':
+        fmap = RBFSampler(gamma=gamma, n_components=n_components, random_state=42)
+    elif kind == 'nystroem':
+        fmap = Nystroem(kernel='rbf', gamma=gamma, n_components=n_components, random_state=42)
+    else:
+        raise ValueError(f"未知的 KERNEL_APPROX: {kind!r} (可选 None / 'rff' / 'nystroem')")
+    return Pipeline([('feature_map', fmap), ('linear', LinearSVC(C=1.0))])
+
+
+def model_size(model):
+    if hasattr(model, 'support_vectors_'):
+        return f"{len(model.support_vectors_)} 个支持向量"
+    return f"{model.steps[0][1].n_components} 维特征映射"
+
+
+def recording_groups(y, size):
+    """ 录制分组编号: 连续同标签的一段按 size 帧 (一次采集的帧数) 切开，每块一个编号 """
+    y = np.asarray(y)
+    change = np.flatnonzero(y[1:] != y[:-1]) + 1
+    block = np.zeros(len(y), dtype=int)
+    block[change] = 1
+    block = np.cumsum(block)
+    pos = np.arange(len(y)) - np.r_[0, change][block]
+    return block * (len(y) // size + 1) + pos // size
+
+
+def group_split(y, groups, test_size):
+    """ 按组划分 (各类别比例尽量保持)，返回 (训练下标, 测试下标) """
+    cv = StratifiedGroupKFold(n_splits=max(2, round(1 / test_size)), shuffle=True, random_state=42)
+    return next(cv.split(np.zeros(len(y)), y, groups))
+
+
+def calibration_split(y, groups, size):
+    """
+    从训练集留出校准集，每个类别必须同时出现在两边 (否则校准器拟合时下标越界)
+    优先按录制分组划分；某类别的组太少分不开时退回按帧分层划分，仍无法划分时返回 None
+    """
+    y = np.asarray(y)
+    if groups is not None:
+        fit_idx, cal_idx = group_split(y, groups, size)
+        missing = np.union1d(np.setdiff1d(y, y[fit_idx]), np.setdiff1d(y, y[cal_idx])).tolist()
+        if not missing:
+            return fit_idx, cal_idx
+        print(f"⚠️ 类别 {missing} 的录制组太少，无法按组留出校准集，改为按帧分层划分")
+    try:
+        return train_test_split(np.arange(len(y)), test_size=size, random_state=42, stratify=y)
+    except ValueError:
+        return None
+
+
+def search_hyperparams(X, y, groups):
+    """
+    网格搜索 config.SEARCH_GRID: 按录制分组的分层 K 折，SEARCH_JOBS 个进程并行
+    X 为已标准化的数组，所有候选共用同一份 (joblib 把大数组内存映射给各工作进程，不会逐个复制)
+    返回最优参数，并打印 / 保存按准确率排名的报告
+    """
+    folds = min(config.SEARCH_FOLDS, len(np.unique(groups)))
+    cv = StratifiedGroupKFold(n_splits=folds, shuffle=True, random_state=42)
+    search = GridSearchCV(SVC(kernel='rbf'), config.SEARCH_GRID, scoring='accuracy',
+                          cv=cv, n_jobs=config.SEARCH_JOBS, refit=False)
+    print(f"超参数搜索: {len(ParameterGrid(config.SEARCH_GRID))} 组参数 x {folds} 折 (按录制分组, {len(np.unique(groups))} 组)，"
+          f"并行进程 {config.SEARCH_JOBS} ...")
+    t0 = time.perf_counter()
+    search.fit(X, y, groups=groups)
+    wall = time.perf_counter() - t0
+
+    res = pd.DataFrame(search.cv_results_).sort_values('rank_test_score')
+    cpu = ((res['mean_fit_time'] + res['mean_score_time']) * folds).sum()
+    print(f"\n--- 搜索报告 (墙钟 {wall:.1f} 秒, 累计计算 {cpu:.1f} 秒, 并行加速 {cpu / wall:.1f}x) ---")
+    print(f"{'排名':>4} | {'C':>6} | {'gamma':>7} | {'class_weight':>12} | {'准确率':>14} | {'单折训练 s':>9}")
+    print("-" * 70)
+    for _, r in res.iterrows():
+        p = r['params']
+        print(f"{r['rank_test_score']:>4} | {p.get('C', 1.0):>6g} | {str(p.get('gamma', 'scale')):>7} | "
+              f"{str(p.get('class_weight')):>12} | "
+              f"{r['mean_test_score']:.3f} ± {r['std_test_score']:.3f} | {r['mean_fit_time']:>9.1f}")
+    os.makedirs(os.path.dirname(config.SEARCH_REPORT_PATH) or '.', exist_ok=True)
+    res.drop(columns='params').assign(search_wall_s=wall).to_csv(config.SEARCH_REPORT_PATH, index=False)
+    print(f"最优参数: {search.best_params_} (报告已保存至 {config.SEARCH_REPORT_PATH})\n")
+    return search.best_params_
+
+
+def fit_calibrator(model, X_cal, y_cal, path):
+    """
+    在留出集上为已训练好的模型拟合 sigmoid 概率校准 (模型本身不再重新训练)
+    结果连同 (模型, 留出数据) 的哈希一起缓存到 path，哈希一致时直接加载，返回 (校准器, 是否命中缓存)
+    """
+    key = joblib.hash((model, X_cal, np.asarray(y_cal)))
+    if os.path.exists(path):
+        cached = joblib.load(path)
+        if cached.get('key') == key:
+            return cached['calibrator'], True
+    if FrozenEstimator is not None:
+        calibrator = CalibratedClassifierCV(FrozenEstimator(model), method='sigmoid')
+    else:
+        calibrator = CalibratedClassifierCV(model, method='sigmoid', cv='prefit')
+    calibrator.fit(X_cal, y_cal)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    joblib.dump({'key': key, 'calibrator': calibrator}, path)
+    return calibrator, False
+
+
+def per_sample_latency_us(model, scaler, X_raw, n=500):
+    """ 按推理脚本的方式 (svm_predictor.ScaledPredictor) 逐帧预测，返回单帧耗时中位数 (us) """
+    predictor = svm_predictor.ScaledPredictor(model, scaler)
+    lat = []
+    for row in X_raw[:n]:
+        t0 = time.perf_counter()
+        predictor.predict(row)
+        lat.append(time.perf_counter() - t0)
+    return np.median(lat) * 1e6
+
 # 1. 读取数据
-csv_file = "./data/radar_training_data.csv" # 确保路径和采集时一致
+csv_file = config.CSV_PATH # 确保路径和采集时一致
+if len(config.TRAINING_SOURCES) > 1:
+    # 多个数据源：合并去重为一个 CSV (分块流式处理，数据源没有更新时直接复用)
+    csv_file = config.MERGED_CSV_PATH
+    if radar_dataset.merge_is_stale(config.TRAINING_SOURCES, csv_file):
+        print(f"正在合并 {len(config.TRAINING_SOURCES)} 个数据源 ...")
+        report = radar_dataset.merge_sources(config.TRAINING_SOURCES, csv_file)
+        radar_dataset.print_merge_report(report, csv_file)
 print(f"正在读取 {csv_file} ...")
 
-if not os.path.exists(csv_file):
+t0 = time.perf_counter()
+# 原文件 + 采集脚本轮转出的全部分段 (含 .gz / .xz 压缩分段)，按时间顺序拼接
+# DATASET_CACHE 时每个文件从列式二进制缓存加载 (首次 / CSV 有新追加时自动更新缓存)
+df, actions = radar_dataset.load_segments(csv_file, cache=config.DATASET_CACHE)
+if df is None:
     print(f"❌ 错误：找不到文件 {csv_file}，请检查路径或先运行采集脚本。")
     exit()
-
-df = pd.read_csv(csv_file)
+print(f"已加载 {len(df)} 行 ({len(actions)} 个文件: {'/'.join(sorted(set(actions)))})，"
+      f"耗时 {time.perf_counter() - t0:.2f} 秒")
 
 # 2. 准备特征 (X) 和 标签 (y)
 # 【核心修改】不再手写列名，而是直接使用 feature_extractor.FEATURE_NAMES
@@ -28,25 +171,100 @@ except KeyError as e:
     print("请删除旧的 CSV 文件并重新运行 1_collect_data.py 采集数据。")
     exit()
 
+# 可选：追加时序特征 (CSV 只存单帧特征，时序部分在这里离线计算)
+if config.USE_TEMPORAL_FEATURES:
+    # 每个标签段是一次连续录制，窗口在段边界重新开始，避免跨段混合
+    segments = (y != y.shift()).cumsum().to_numpy()
+    temporal = temporal_features.extract_temporal_batch(
+        X.to_numpy(dtype=float), config.TEMPORAL_WINDOW, segments)
+    X = pd.concat([X, pd.DataFrame(temporal, columns=temporal_features.TEMPORAL_FEATURE_NAMES,
+                                   index=X.index)], axis=1)
+    print(f"已追加 {temporal.shape[1]} 维时序特征 (窗口 {config.TEMPORAL_WINDOW})")
+
 # 3. 数据划分
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+if config.HYPERPARAM_SEARCH:
+    # 按录制分组划分，同一次录制的相邻帧不会同时出现在训练集和测试集
+    groups = recording_groups(y, config.COLLECT_NUM_FRAMES)
+    train_idx, test_idx = group_split(y, groups, 0.2)
+    X_train, X_test, y_train, y_test = X.iloc[train_idx], X.iloc[test_idx], y.iloc[train_idx], y.iloc[test_idx]
+    groups_train = groups[train_idx]
+else:
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+# 概率校准要用模型没见过的数据：从训练集里再留出一份
+calibrate = config.CALIBRATE_PROBABILITY
+if calibrate:
+    split = calibration_split(y_train, groups_train if config.HYPERPARAM_SEARCH else None,
+                              config.CALIBRATION_SIZE)
+    if split is None:
+        counts = y_train.value_counts()
+        print(f"❌ 训练集中有类别样本太少，无法留出校准集 (各类别行数: {counts.to_dict()})，跳过概率校准。"
+              f"请为这些类别补采数据或关闭 CALIBRATE_PROBABILITY。")
+        calibrate = False
+    else:
+        fit_idx, cal_idx = split
+        X_train, X_cal, y_train, y_cal = (X_train.iloc[fit_idx], X_train.iloc[cal_idx],
+                                          y_train.iloc[fit_idx], y_train.iloc[cal_idx])
+        if config.HYPERPARAM_SEARCH:
+            groups_train = groups_train[fit_idx]
 
 # 4. 数据标准化
 scaler = StandardScaler()
 X_train_scaled = scaler.fit_transform(X_train)
 X_test_scaled = scaler.transform(X_test)
 
-# 5. 训练 SVM 模型
-print(f"正在训练 SVM 模型 (特征维度: {X.shape[1]})...")
-svm_model = SVC(kernel='rbf', C=1.0, gamma='scale', probability=True)
+# 4b. 可选: 超参数搜索 (复用上面标准化好的训练数据)
+svm_params = {'C': 1.0, 'gamma': 'scale'}
+if config.HYPERPARAM_SEARCH:
+    svm_params = search_hyperparams(X_train_scaled, y_train.to_numpy(), groups_train)
+
+# 5. 训练 SVM 模型 (推理只用 predict，不在这里做 probability=True 的内部校准)
+print(f"正在训练 SVM 模型 (特征维度: {X.shape[1]}, 参数: {svm_params})...")
+t0 = time.perf_counter()
+svm_model = SVC(kernel='rbf', **svm_params)
 svm_model.fit(X_train_scaled, y_train)
+print(f"SVC 训练耗时: {time.perf_counter() - t0:.1f} 秒 ({len(y_train)} 行)")
+models = {"SVC (精确 RBF)": svm_model}
+final_model = svm_model
+
+# 5b. 可选: 核近似模型 (gamma 与 SVC 相同)
+if config.KERNEL_APPROX:
+    gamma = svm_params['gamma']
+    if gamma == 'scale':
+        gamma = 1.0 / (X_train_scaled.shape[1] * X_train_scaled.var())
+    elif gamma == 'auto':
+        gamma = 1.0 / X_train_scaled.shape[1]
+    name = f"{config.KERNEL_APPROX}-{config.APPROX_COMPONENTS} + LinearSVC"
+    print(f"正在训练核近似模型 ({name}, gamma={gamma:.4f})...")
+    t0 = time.perf_counter()
+    final_model = build_approx_model(config.KERNEL_APPROX, config.APPROX_COMPONENTS, gamma)
+    final_model.fit(X_train_scaled, y_train)
+    print(f"核近似模型训练耗时: {time.perf_counter() - t0:.1f} 秒")
+    models[name] = final_model
 
 # 6. 评估模型
-y_pred = svm_model.predict(X_test_scaled)
+y_pred = final_model.predict(X_test_scaled)
 print("\n--- 模型评估报告 ---")
 print(f"准确率: {accuracy_score(y_test, y_pred):.2f}")
 print(classification_report(y_test, y_pred))
 
+if len(models) > 1:
+    X_test_raw = X_test.to_numpy(dtype=float)
+    print(f"{'模型':<28} | {'准确率':>6} | {'模型规模':<16} | {'单帧推理 us':>10}")
+    print("-" * 72)
+    for name, model in models.items():
+        acc = accuracy_score(y_test, model.predict(X_test_scaled))
+        lat = per_sample_latency_us(model, scaler, X_test_raw)
+        print(f"{name:<28} | {acc:>6.3f} | {model_size(model):<16} | {lat:>10.1f}")
+
+# 6b. 可选: 概率校准 (单独一步，在留出集上拟合，结果缓存)
+if calibrate:
+    t0 = time.perf_counter()
+    calibrator, hit = fit_calibrator(final_model, scaler.transform(X_cal), y_cal, config.CALIBRATOR_PATH)
+    print(f"\n概率校准: {'复用缓存' if hit else '已拟合'} ({len(y_cal)} 行留出数据)，"
+          f"耗时 {time.perf_counter() - t0:.2f} 秒，测试集 log loss: "
+          f"{log_loss(y_test, calibrator.predict_proba(X_test_scaled), labels=calibrator.classes_):.3f}")
+    print(f"校准器已保存至: {config.CALIBRATOR_PATH} (joblib.load(...)['calibrator'].predict_proba)")
+
 # 7. 保存模型
 # 确保权重目录存在
 weights_dir = "./weights"
@@ -56,7 +274,7 @@ if not os.path.exists(weights_dir):
 model_path = os.path.join(weights_dir, 'radar_svm_model.pkl')
 scaler_path = os.path.join(weights_dir, 'radar_scaler.pkl')
 
-joblib.dump(svm_model, model_path)
+joblib.dump(final_model, model_path)
 joblib.dump(scaler, scaler_path)
 print(f"\n✅ 模型已保存至: {weights_dir}")
 print("你可以运行 3_realtime_inference.py 来加载模型并进行实时推理了！")
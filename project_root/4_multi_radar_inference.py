@@ -0,0 +1,90 @@
+import asyncio
+import time
+import os
+import sys
+import config            # 导入配置 (RADAR_DEVICES / REMOTE_DEVICES / INFERENCE_WORKERS)
+import inference_server  # 推理服务 (可分片到多个工作进程)
+
+# 共享的协议解析 / 接入模块位于仓库根目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_async
+
+# ====================================================================
+# 多雷达实时推理：asyncio 单线程同时接入 config.RADAR_DEVICES 中的所有雷达，
+# 推理交给 inference_server (INFERENCE_WORKERS 个工作进程)
+# 每个雷达各自的解码器、特征缓冲和迟滞滤波状态，互不影响
+# ====================================================================
+
+def make_result_handler():
+    last_status = {}
+
+    def on_result(name, result, z):
+        _, stable_pred = result
+        if stable_pred != last_status.get(name):
+            status_str = config.LABEL_MAP.get(stable_pred, f"Unknown({stable_pred})")
+            print(f"[{time.strftime('%H:%M:%S')}] [{name}] 状态切换 -> {status_str}")
+            last_status[name] = stable_pred
+        # 跌倒报警: 每帧都提示，直到状态解除
+        if stable_pred == 3:
+            print(f"🚨 [{name}] 跌倒! Z={z:.2f}m")
+
+    return on_result
+
+
+def on_key(device, remote_id, key_val):
+    id_str = ' '.join(f'{b:02X}' for b in remote_id)
+    print(f"🎮 [{device.name}] ID:{id_str} 键值:{key_val:02X}")
+
+
+async def report_stats(hub, server):
+    while True:
+        await asyncio.sleep(config.STATS_INTERVAL)
+        print_stats(hub, server)
+
+
+def print_stats(hub, server):
+    print(f"\n--- 设备统计 ({time.strftime('%H:%M:%S')}) ---")
+    stats = server.stats()
+    total = 0.0
+    for dev in hub.radars():
+        st = dev.decoder.stats()
+        line = (f"[{dev.name}] {'在线' if dev.connected else '离线'} | "
+                f"接收 {st['frames_per_sec']:.1f} 帧/秒 | 坏帧 {st['frames_bad']} | 丢弃字节 {st['bytes_skipped']}")
+        ps = stats.get(dev.name)
+        if ps:
+            total += ps['fps']
+            line += (f" | 进程 {ps['shard']} 推理 {ps['fps']:.1f} 帧/秒 (有效 {ps['inferences']}, 丢帧 {ps['dropped']}) | "
+                     f"计算 {ps['compute_avg_ms']:.1f} ms, 延迟 平均 {ps['latency_avg_ms']:.1f} / 最大 {ps['latency_max_ms']:.1f} ms")
+        print(line)
+    print(f"合计推理 {total:.1f} 帧/秒 ({server.workers or '主'} 进程)")
+
+
+async def main(hub, server):
+    try:
+        await hub.run()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    print(f"正在加载模型: {config.MODEL_PATH} (推理进程数: {config.INFERENCE_WORKERS or '主进程'}) ...")
+    try:
+        server = inference_server.InferenceServer(config.INFERENCE_WORKERS, on_result=make_result_handler())
+    except Exception as e:
+        print(f"❌ 模型加载失败: {e}")
+        sys.exit(1)
+
+    hub = radar_async.IngestHub()
+    for d in config.RADAR_DEVICES:
+        hub.add(radar_async.RadarDevice(d['name'], d['port'], d.get('baud', 115200),
+                                        on_frame=lambda dev, snap: server.submit(dev.name, snap)))
+    for d in config.REMOTE_DEVICES:
+        hub.add(radar_async.RemoteDevice(d['name'], d['port'], d.get('baud', 9600), on_key=on_key))
+    hub.spawn(report_stats(hub, server))
+
+    print(f"\n🚀 多雷达推理: {len(config.RADAR_DEVICES)} 个雷达, {len(config.REMOTE_DEVICES)} 个遥控接收器 (Ctrl+C 停止)")
+    try:
+        asyncio.run(main(hub, server))
+    except KeyboardInterrupt:
+        print_stats(hub, server)
+        print("程序已停止")
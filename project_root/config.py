@@ -5,17 +5,58 @@ import os
 SERIAL_PORT = '/dev/ttyACM0'  # 串口号
 BAUD_RATE = 115200
 
+# 多雷达 (4_multi_radar_inference.py)：一个进程、一个事件循环服务所有设备
+# name 用于日志和统计区分房间
+RADAR_DEVICES = [
+    {'name': 'room1', 'port': SERIAL_PORT, 'baud': BAUD_RATE},
+    # {'name': 'room2', 'port': '/dev/ttyACM1', 'baud': 115200},
+]
+# 可选的蓝牙遥控接收器 (按键只做记录)，例如 {'name': 'remote', 'port': '/dev/ttyACM2', 'baud': 9600}
+REMOTE_DEVICES = []
+STATS_INTERVAL = 10  # 每隔多少秒打印一次各设备统计
+# 推理工作进程数 (见 inference_server.py)：设备按轮询分配到各进程，一般设为 CPU 核数
+# 0 表示在主进程 (事件循环线程) 内推理，适合单雷达
+INFERENCE_WORKERS = 0
+
 # --- 文件路径配置 ---
 DATA_DIR = "./data"
 WEIGHTS_DIR = "./weights"
 CSV_PATH = os.path.join(DATA_DIR, "radar_training_data.csv")
 MODEL_PATH = os.path.join(WEIGHTS_DIR, "radar_svm_model.pkl")
 SCALER_PATH = os.path.join(WEIGHTS_DIR, "radar_scaler.pkl")
+# 训练时从列式二进制缓存 (DATA_DIR/.cache/，见仓库根目录 radar_dataset.py) 加载 CSV，不再每次解析文本
+# CSV 被追加时只解析新增的行，被改写时自动重建
+DATASET_CACHE = True
+# 训练数据源：多个 CSV 时先合并去重 (见 radar_dataset.merge_sources)，写到 MERGED_CSV_PATH 再训练
+# 表头与 FEATURE_NAMES + label 不一致的文件 (旧版特征) 会被跳过并提示；数据源有更新时自动重新合并
+TRAINING_SOURCES = [
+    CSV_PATH,
+    # "../data/radar_training_data.csv",
+    # "../hardware_collection/data/radar_10dim_dataset.csv",
+]
+MERGED_CSV_PATH = os.path.join(DATA_DIR, "merged_training_data.csv")
 
 # --- 采集配置 ---
 # 【关键】这里改采集帧数，500帧约等于50秒数据，足够丰富
 COLLECT_NUM_FRAMES = 500  
-COLLECT_DELAY = 0.05      # 采样间隔 (秒)
+# 每个新的雷达帧记录一行 (见仓库根目录 radar_stream.FrameSampler)，不再定时重复读取同一帧
+COLLECT_MAX_HZ = 0        # 采集频率上限 (Hz)，0 表示不限；限速时跳过中间的帧
+COLLECT_DELAY = 0.05      # 旧版定时采样间隔 (秒)：只用于估算并报告避免了多少重复行
+# CSV 由后台线程批量写入 (见仓库根目录 radar_writer.py)：攒够 WRITER_BATCH_ROWS 行
+# 或最早一行等待超过 WRITER_FLUSH_INTERVAL 秒时写一次，进程崩溃最多丢失这么多数据
+WRITER_BATCH_ROWS = 256
+WRITER_FLUSH_INTERVAL = 1.0
+# 输出轮转与压缩 (见仓库根目录 radar_writer.py)：每次运行写到 CSV_PATH 的新分段
+# (<名称>.<会话时间>.<序号>.csv)，单个分段超过 ROTATE_MAX_MB 时切换到下一个分段；
+# 关闭的分段在后台压缩 (COMPRESSION = 'gzip' / 'lzma' / None)。训练 / 合并时自动读取原文件和全部分段
+ROTATE_SEGMENTS = True
+ROTATE_MAX_MB = 20
+COMPRESSION = 'gzip'
+
+# 原始帧录制 (见仓库根目录 radar_capture.py)：每次运行在 RAW_CAPTURE_DIR 下生成一个 .cap 文件，
+# 之后改了特征定义也可以直接从录制文件重新生成数据集，不用重新采集
+RAW_CAPTURE = True
+RAW_CAPTURE_DIR = os.path.join(DATA_DIR, "raw")
 
 # --- 算法/推理配置 ---
 # 迟滞滤波阈值：连续多少帧一致才切换状态？
@@ -25,6 +66,44 @@ FILTER_THRESHOLD = 8
 # 跌倒检测阈值 (紧急事件不需要等待那么久)
 FALL_CONFIRM_FRAMES = 3   
 
+# 推理频率上限 (Hz)：0 表示每个新的点云帧都推理一次
+# 注意滤波阈值按"帧"计，限速后确认时间会相应变长
+INFERENCE_MAX_HZ = 0
+
+# 时序特征 (滑动均值 / 标准差 / 差分 / 斜率)，见仓库根目录 temporal_features.py
+# 训练时开启后模型输入变为 10 + 16 维，推理脚本会根据模型自动匹配
+# 窗口按样本数计：采集间隔与推理间隔不同时，需要相应调整
+USE_TEMPORAL_FEATURES = False
+TEMPORAL_WINDOW = 10
+
+# 核近似训练 (2_train_svm.py)：None 训练精确 RBF-SVC (推理耗时随支持向量数、也就是随数据量增长)
+# 'rff' (随机傅里叶特征) 或 'nystroem' + 线性 SVM：模型大小固定为 APPROX_COMPONENTS 维，
+# 推理耗时与训练数据量无关；训练时会同时训练精确 SVC 并并排报告准确率与单帧耗时，保存的是近似模型
+KERNEL_APPROX = None
+APPROX_COMPONENTS = 500
+
+# 概率输出 (2_train_svm.py)：推理脚本只调用 predict，默认不做概率校准
+# (SVC(probability=True) 会在内部多跑一遍 5 折交叉验证做 Platt 校准，训练慢数倍)
+# 需要概率时开启：从训练集留出 CALIBRATION_SIZE 比例的数据单独拟合 sigmoid 校准器，
+# 保存到 CALIBRATOR_PATH；模型和留出数据都没变时直接复用上次的结果
+CALIBRATE_PROBABILITY = False
+CALIBRATION_SIZE = 0.2
+CALIBRATOR_PATH = os.path.join(WEIGHTS_DIR, "radar_calibrator.pkl")
+
+# 超参数搜索 (2_train_svm.py)：开启后在所有 CPU 核上网格搜索 C / gamma / class_weight，最优参数用于最终训练
+# 相邻帧几乎相同，随机划分会让验证 / 测试集"见过"训练帧，准确率虚高。搜索模式下交叉验证和测试集都按录制分组：
+# 连续同标签的一段按 COLLECT_NUM_FRAMES 帧 (一次采集) 切成若干组，同一组的帧只会出现在一边
+# 按准确率排名的搜索报告保存到 SEARCH_REPORT_PATH
+HYPERPARAM_SEARCH = False
+SEARCH_GRID = {
+    'C': [0.3, 1.0, 3.0, 10.0],
+    'gamma': ['scale', 0.03, 0.3],
+    'class_weight': [None, 'balanced'],
+}
+SEARCH_FOLDS = 5
+SEARCH_JOBS = -1  # 并行进程数，-1 表示所有核
+SEARCH_REPORT_PATH = os.path.join(WEIGHTS_DIR, "search_report.csv")
+
 # 标签定义
 LABEL_MAP = {
     0: "Wait...",
@@ -0,0 +1,172 @@
+# inference_server.py
+"""
+多雷达推理服务: 把特征提取 + SVM 推理分散到多个工作进程
+
+SVM 预测是 CPU 密集的，事件循环所在进程只负责收帧 (radar_async)，
+推理交给 workers 个单进程的 ProcessPoolExecutor ("分片")：
+  - 每个设备固定分配到一个分片 (轮询分配)，InferencePipeline (HysteresisFilter 状态、
+    时序窗口) 常驻在该分片进程里，所以同一设备的帧严格按顺序处理
+  - 每个设备最多一帧在途: 推理没回来时新帧只保留最新一帧，其余计为丢弃，
+    推理跟不上时丢旧帧而不是让延迟无限增长
+  - 每个工作进程启动时自己加载一次模型，之后只传快照 (目标 + 点云) 和结果
+workers=0 时在当前进程内直接推理 (单雷达或调试时省掉进程间开销)。
+
+设备数 >= 分片数时，吞吐随 CPU 核数近似线性增长 (分片之间没有共享状态)。
+
+用法 (在事件循环中):
+    server = InferenceServer(workers=4, on_result=handle_result)
+    server.submit('room1', snapshot)   # RadarDevice.on_frame 里调用
+    server.stats()                     # {设备名: {...}}
+    server.close()
+"""
+import asyncio
+import functools
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+import pipeline
+
+# 工作进程内的状态: 模型 + 每个设备的推理流水线
+_model = None
+_pipes = {}
+
+
+def _init_worker(model_path, scaler_path, worker=True):
+    global _model
+    if worker:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C 由主进程处理，再统一关闭工作进程
+    _model = pipeline.load_model(model_path, scaler_path)
+    _pipes.clear()
+
+
+def _ready():
+    return _model is not None
+
+
+def _process(name, snap):
+    """ 在工作进程中处理一帧，返回 (结果, 目标 Z, 推理耗时) """
+    pipe = _pipes.get(name)
+    if pipe is None:
+        pipe = _pipes[name] = pipeline.InferencePipeline(*_model)
+    t0 = time.perf_counter()
+    result = pipe.process(snap)
+    return result, float(pipe.feats[0]), time.perf_counter() - t0
+
+
+class DeviceStats:
+    """ 单个设备在服务端的统计 (延迟从 publish 算到结果回到事件循环) """
+    def __init__(self):
+        self.shard = 0
+        self.frames = 0       # 收到的帧
+        self.dropped = 0      # 推理跟不上被新帧覆盖的帧
+        self.done = 0         # 完成推理的帧 (含无数据帧)
+        self.inferences = 0   # 有效推理次数
+        self.errors = 0
+        self.compute_sum = 0.0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self._mark = (time.monotonic(), 0)
+
+    def as_dict(self):
+        now = time.monotonic()
+        t0, done0 = self._mark
+        self._mark = (now, self.done)
+        n = self.done
+        return {
+            'shard': self.shard,
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'inferences': self.inferences,
+            'errors': self.errors,
+            'fps': (self.done - done0) / (now - t0) if now > t0 else 0.0,
+            'compute_avg_ms': self.compute_sum / n * 1000 if n else 0.0,
+            'latency_avg_ms': self.latency_sum / n * 1000 if n else 0.0,
+            'latency_max_ms': self.latency_max * 1000,
+        }
+
+
+class InferenceServer:
+    """
+    on_result(name, (raw_pred, stable_pred), z) 在事件循环线程中调用 (无数据帧不回调)
+    """
+    def __init__(self, workers=0, on_result=None,
+                 model_path=config.MODEL_PATH, scaler_path=config.SCALER_PATH):
+        self.workers = workers
+        self.on_result = on_result
+        self.shards = [
+            ProcessPoolExecutor(1, initializer=_init_worker, initargs=(model_path, scaler_path))
+            for _ in range(workers)
+        ]
+        if workers:
+            # 等所有工作进程加载完模型: 模型文件有问题时在这里直接报错，而不是第一帧才发现
+            for ex in self.shards:
+                ex.submit(_ready).result()
+        else:
+            _init_worker(model_path, scaler_path, worker=False)
+        self._stats = {}
+        self._busy = set()
+        self._pending = {}  # 设备名 -> 在途期间到达的最新快照
+
+    def submit(self, name, snap):
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = DeviceStats()
+            st.shard = (len(self._stats) - 1) % max(1, self.workers)
+        st.frames += 1
+        if name in self._busy:
+            if name in self._pending:
+                st.dropped += 1
+            self._pending[name] = snap
+            return
+        self._dispatch(name, snap)
+
+    def _dispatch(self, name, snap):
+        if not self.workers:
+            try:
+                out = _process(name, snap)
+            except Exception as e:
+                self._finish(name, snap, None, e)
+            else:
+                self._finish(name, snap, out, None)
+            return
+        self._busy.add(name)
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(self.shards[self._stats[name].shard], _process, name, snap)
+        fut.add_done_callback(functools.partial(self._on_done, name, snap))
+
+    def _on_done(self, name, snap, fut):
+        self._busy.discard(name)
+        if fut.cancelled():
+            return
+        e = fut.exception()
+        self._finish(name, snap, None if e else fut.result(), e)
+        snap = self._pending.pop(name, None)
+        if snap is not None:
+            self._dispatch(name, snap)
+
+    def _finish(self, name, snap, out, error):
+        st = self._stats[name]
+        if error is not None:
+            st.errors += 1
+            print(f"[{name}] 推理错误: {error}")
+            return
+        result, z, compute = out
+        latency = time.monotonic() - snap.timestamp
+        st.done += 1
+        st.compute_sum += compute
+        st.latency_sum += latency
+        st.latency_max = max(st.latency_max, latency)
+        if result is not None:
+            st.inferences += 1
+            if self.on_result is not None:
+                self.on_result(name, result, z)
+
+    def stats(self):
+        """ 各设备统计；fps 为距上一次调用以来的推理帧率 """
+        return {name: st.as_dict() for name, st in self._stats.items()}
+
+    def close(self):
+        for ex in self.shards:
+            ex.shutdown(wait=False, cancel_futures=True)
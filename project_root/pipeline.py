@@ -0,0 +1,99 @@
+# pipeline.py
+"""
+单个雷达的推理流水线: 特征 -> (时序特征) -> 标准化 -> SVM 预测 -> 迟滞滤波
+
+把 3_realtime_inference.py 里的推理步骤收拢成一个对象，每个雷达持有一个实例
+(各自的特征缓冲、时序窗口、HysteresisFilter 状态和统计)，
+单雷达脚本、多雷达脚本 (4_multi_radar_inference.py) 共用同一套逻辑。
+"""
+import os
+import sys
+import time
+import joblib
+import numpy as np
+import config
+import feature_extractor
+from utils import HysteresisFilter
+
+# 时序特征 / 预测模块位于仓库根目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import svm_predictor
+import temporal_features
+
+
+def load_model(model_path=config.MODEL_PATH, scaler_path=config.SCALER_PATH):
+    """ 加载 SVM 模型和标准化器 """
+    return joblib.load(model_path), joblib.load(scaler_path)
+
+
+class InferencePipeline:
+    """
+    输入: radar_stream.FrameSnapshot (target + points)
+    输出: (raw_pred, stable_pred)；没有有效数据 (Z=0 且 点云数=0) 时返回 None
+    """
+    def __init__(self, clf, scaler):
+        self.clf = clf
+        self.scaler = scaler
+        self.predictor = svm_predictor.ScaledPredictor(clf, scaler)
+        self.hysteresis = HysteresisFilter(
+            threshold=config.FILTER_THRESHOLD,
+            fall_threshold=config.FALL_CONFIRM_FRAMES
+        )
+
+        # 模型若用时序特征训练，则在 10 维单帧特征后追加时序特征
+        if temporal_features.uses_temporal(scaler):
+            self.feature_names = temporal_features.ALL_FEATURE_NAMES
+            self.temporal = temporal_features.TemporalFeatureExtractor(config.TEMPORAL_WINDOW)
+        else:
+            self.feature_names = feature_extractor.FEATURE_NAMES
+            self.temporal = None
+
+        # 预分配特征行与工作区，循环内不再分配
+        self.feats = np.zeros(len(self.feature_names))
+        self.base = self.feats[:len(feature_extractor.FEATURE_NAMES)]
+        self.workspace = feature_extractor.FeatureWorkspace()
+
+        # 统计
+        self.last_seq = 0
+        self.frames = 0
+        self.skipped = 0
+        self.inferences = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def process(self, snap):
+        """ 处理一帧快照，返回 (raw_pred, stable_pred) 或 None """
+        if self.last_seq:  # 启动期间积压的帧不计入
+            self.skipped += max(0, snap.seq - self.last_seq - 1)
+        self.last_seq = snap.seq
+        self.frames += 1
+
+        # 1. 提取特征
+        feature_extractor.extract_features_into(snap.target, snap.points, self.base, self.workspace)
+        # 时序窗口每个新帧推进一次 (包括无数据的帧)
+        if self.temporal is not None:
+            self.temporal.update(self.base, out=self.feats[len(self.base):])
+
+        # 如果 Z=0 且 点云数=0，说明数据没进来，跳过推理节省资源
+        if self.feats[0] == 0 and self.feats[8] == 0:
+            return None
+
+        # 2. 标准化 + 3. 预测 (直接在数组上做，不构造 DataFrame) + 4. 滤波
+        raw_pred = self.predictor.predict(self.feats)
+        stable_pred = self.hysteresis.update(raw_pred)
+
+        latency = time.monotonic() - snap.timestamp
+        self.inferences += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        return raw_pred, stable_pred
+
+    def stats(self):
+        n = self.inferences
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'inferences': n,
+            'latency_avg_ms': self.latency_sum / n * 1000 if n else 0.0,
+            'latency_max_ms': self.latency_max * 1000,
+        }
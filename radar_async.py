@@ -0,0 +1,219 @@
+"""
+asyncio 串口接入层：一个事件循环同时服务 N 个雷达和遥控接收器
+
+每个脚本原来是"一个串口一个守护线程 + 忙轮询 ser.in_waiting"，
+设备一多，线程就在 GIL 上互相争抢。这里改为把每个 tty 的文件描述符注册到事件循环
+(loop.add_reader)，有数据才回调，每个设备各自持有解码器状态：
+
+  - RadarDevice:  FrameDecoder + 最新帧快照 (radar_stream.FrameChannel)，
+                  每收齐一组 目标 + 点云 就调用 on_frame(device, snapshot)
+  - RemoteDevice: RemoteDecoder + 校验和，每个有效按键调用 on_key(device, remote_id, key)
+
+串口打开 / 波特率设置仍用 pyserial，读写直接走非阻塞 fd；设备断开后定时重连。
+
+用法:
+    hub = IngestHub()
+    hub.add(RadarDevice('room1', '/dev/ttyACM0', 115200, on_frame=handle_frame))
+    hub.add(RemoteDevice('remote', '/dev/ttyACM1', 9600, on_key=handle_key))
+    asyncio.run(hub.run())
+"""
+import asyncio
+import os
+
+import serial
+
+import radar_protocol
+import radar_stream
+
+# 默认初始化指令: 侧装 + 开启目标 + 开启点云 (与采集 / 推理脚本一致)
+DEFAULT_INIT_CMDS = (
+    radar_protocol.CMD_SIDE_MOUNT,
+    radar_protocol.CMD_TARGET_ON,
+    radar_protocol.CMD_POINT_CLOUD_ON,
+)
+READ_SIZE = 1 << 16
+RECONNECT_DELAY = 2.0
+
+
+class SerialDevice:
+    """ 事件循环中的一个串口设备 (基类)：负责打开、注册读回调、断线重连 """
+    def __init__(self, name, port, baud):
+        self.name = name
+        self.port = port
+        self.baud = baud
+        self.ser = None
+        self.connected = False
+        self.reconnects = 0
+        self._loop = None
+        self._tasks = set()  # 事件循环只弱引用任务，这里持有 (连接 / 重连)，结束时取消
+
+    # --- 子类实现 ---
+    def feed(self, data):
+        raise NotImplementedError
+
+    async def on_open(self):
+        """ 打开串口后执行 (例如发送初始化指令) """
+
+    # --- 连接管理 ---
+    def start_task(self, loop):
+        """ 在 loop 中后台运行 start()，返回任务 """
+        self._loop = loop
+        return self._spawn(self.start(loop))
+
+    def _spawn(self, coro):
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ [{self.name}] 后台任务异常退出: {task.exception()!r}")
+            self._close()
+
+    async def start(self, loop):
+        self._loop = loop
+        while True:
+            try:
+                self.ser = serial.Serial(self.port, self.baud, timeout=0)
+                await self.on_open()
+                loop.add_reader(self.ser.fileno(), self._on_readable)
+                self.connected = True
+                print(f"✅ [{self.name}] 已连接 {self.port}")
+                return
+            except (OSError, serial.SerialException) as e:
+                print(f"❌ [{self.name}] 连接 {self.port} 失败: {e}，{RECONNECT_DELAY:.0f} 秒后重试")
+                self._close()
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    def write(self, data):
+        self.ser.write(data)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.ser.fileno(), READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._lost(e)
+            return
+        if not data:
+            self._lost("EOF")  # tty 挂断 (设备拔出)
+            return
+        self.feed(data)
+
+    def _lost(self, reason):
+        print(f"⚠️ [{self.name}] 连接断开: {reason}")
+        self.connected = False
+        self.reconnects += 1
+        self._close()
+        self._spawn(self.start(self._loop))
+
+    def _close(self):
+        if self.ser is None:
+            return
+        try:
+            if self._loop is not None:
+                self._loop.remove_reader(self.ser.fileno())
+        except (OSError, ValueError):
+            pass
+        try:
+            self.ser.close()
+        except (OSError, serial.SerialException):
+            pass
+        self.ser = None
+
+    def close(self):
+        self.connected = False
+        for task in self._tasks:
+            task.cancel()
+        self._close()
+
+    async def aclose(self):
+        """ close() 并等待被取消的后台任务结束 """
+        tasks = list(self._tasks)
+        self.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class RadarDevice(SerialDevice):
+    """
+    LD6002 雷达: 每个设备独立的 FrameDecoder 和帧快照通道
+    on_frame(device, snapshot) 在事件循环线程中调用，应尽快返回 (重活交给进程池等)
+    """
+    def __init__(self, name, port, baud=115200, on_frame=None,
+                 init_cmds=DEFAULT_INIT_CMDS, init_rounds=2):
+        super().__init__(name, port, baud)
+        self.on_frame = on_frame
+        self.init_cmds = init_cmds
+        self.init_rounds = init_rounds
+        self.decoder = radar_protocol.FrameDecoder()
+        self.channel = radar_stream.FrameChannel()
+        self._target = {'z': 0.0, 'speed': 0.0}
+
+    async def on_open(self):
+        # 多发几轮初始化指令，确保唤醒 (指令之间留间隔，防止粘包)
+        for _ in range(self.init_rounds):
+            for cmd in self.init_cmds:
+                self.write(radar_protocol.build_command(cmd))
+                await asyncio.sleep(0.1)
+        self.ser.reset_input_buffer()
+
+    def feed(self, data):
+        self.decoder.feed(data)
+        for frame in self.decoder.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                self._target = radar_protocol.primary_target(frame) or self._target
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                self.channel.publish(self._target, radar_protocol.cloud_points(frame))
+                if self.on_frame is not None:
+                    self.on_frame(self, self.channel.latest)
+
+
+class RemoteDevice(SerialDevice):
+    """
+    蓝牙遥控接收器: 包头 / 包尾由 RemoteDecoder 检查，这里再校验和
+    on_key(device, remote_id, key_val): remote_id 为 4 字节 ID 列表 (索引 7~10)，key_val 为按键码 (索引 13)
+    """
+    def __init__(self, name, port, baud=9600, on_key=None):
+        super().__init__(name, port, baud)
+        self.on_key = on_key
+        self.decoder = radar_protocol.RemoteDecoder()
+        self.bad_checksum = 0
+
+    def feed(self, data):
+        self.decoder.feed(data)
+        for frame in self.decoder.frames():
+            if not radar_protocol.remote_checksum_ok(frame):
+                self.bad_checksum += 1
+                continue
+            if self.on_key is not None:
+                self.on_key(self, list(frame[7:11]), frame[13])
+
+
+class IngestHub:
+    """ 管理所有设备的事件循环入口 """
+    def __init__(self):
+        self.devices = []
+        self._tasks = []
+
+    def add(self, device):
+        self.devices.append(device)
+        return device
+
+    def radars(self):
+        return [d for d in self.devices if isinstance(d, RadarDevice)]
+
+    def spawn(self, coro):
+        """ 在 run() 的事件循环中附带运行一个协程 (例如周期打印统计) """
+        self._tasks.append(coro)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for dev in self.devices:
+            dev.start_task(loop)
+        try:
+            await asyncio.gather(*self._tasks, asyncio.Event().wait())
+        finally:
+            await asyncio.gather(*(dev.aclose() for dev in self.devices))
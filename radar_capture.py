@@ -0,0 +1,198 @@
+"""
+原始帧录制 / 回放
+
+采集脚本只把 10 维特征写进 CSV，特征一改就得重新找人采集。
+这里把每个校验通过的原始帧 (帧类型 + 时间戳 + 负载 + 当前标签) 追加到紧凑的二进制文件，
+之后可以用 CaptureReader 通过 mmap 零拷贝回放，按任意新的特征定义重新生成数据集。
+
+文件格式 (小端序):
+  文件头: MAGIC(8) + 版本 uint16 + 保留 uint16 + 时钟偏移 float64
+          (时钟偏移 = time.time() - time.monotonic()，记录时间戳加上它即为墙上时间)
+  记录:   负载长度 uint32 + 帧类型 uint16 + 标签 int16 + 单调时钟 float64 + 负载(N)
+
+用法:
+    recorder = CaptureWriter(new_capture_path(DATA_DIR))
+    decoder = radar_protocol.FrameDecoder(on_frame=recorder.write)
+    recorder.label = 2   # 开始录制某个标签时设置，结束后改回 LABEL_NONE
+
+    with CaptureReader(path) as reader:
+        for ts, label, target, points in reader.samples():
+            feats = feature_extractor.extract_features(target, points)
+
+命令行 (仓库根目录): 用当前 feature_extractor 从录制文件重新生成训练 CSV
+    python3 radar_capture.py data/raw/raw_20250128_153000.cap [输出.csv]
+"""
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import radar_protocol
+
+MAGIC = b'RADARCAP'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sHHd')
+RECORD_HEADER = struct.Struct('<IHhd')
+CAPTURE_SUFFIX = '.cap'
+
+LABEL_NONE = -1  # 未在录制标签时收到的帧
+
+CaptureRecord = namedtuple('CaptureRecord', ['timestamp', 'frame_type', 'label', 'payload'])
+
+
+def new_capture_path(directory, prefix='raw'):
+    """ 按当前时间生成一个会话文件名，例如 ./data/raw_20250128_153000.cap """
+    name = f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}{CAPTURE_SUFFIX}"
+    return os.path.join(directory, name)
+
+
+class CaptureWriter:
+    """
+    原始帧录制器 (一个会话一个文件)
+    write() 可直接作为 FrameDecoder 的 on_frame 回调；
+    写入经过用户态缓冲，进程崩溃最多丢失最后一个缓冲区，读取端会忽略被截断的尾部记录
+    """
+    def __init__(self, path, label=LABEL_NONE, buffering=1 << 16):
+        self.path = path
+        self.label = label
+        self.records = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._f = open(path, 'wb', buffering=buffering)
+        self._f.write(FILE_HEADER.pack(MAGIC, VERSION, 0, time.time() - time.monotonic()))
+        self.bytes_written += FILE_HEADER.size
+
+    def write(self, frame_type, payload, label=None, timestamp=None):
+        """ 追加一条记录，payload 可以是 memoryview (解码器缓冲区视图，不做额外拷贝) """
+        if label is None:
+            label = self.label
+        if timestamp is None:
+            timestamp = time.monotonic()
+        n = len(payload)
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(RECORD_HEADER.pack(n, frame_type, label, timestamp))
+            self._f.write(payload)
+            self.records += 1
+            self.bytes_written += RECORD_HEADER.size + n
+
+    def flush(self):
+        with self._lock:
+            if not self._f.closed:
+                self._f.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """
+    mmap 零拷贝回放
+    产出的 payload 是指向映射区的 memoryview，只在 reader 关闭前有效；
+    decoded() / samples() 产出的帧对象与数组不引用映射区，可以保留
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < FILE_HEADER.size:
+            self._file.close()
+            raise ValueError(f"不是有效的录制文件 (长度 {size}): {path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, _, self.clock_offset = FILE_HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的录制文件 (文件头 {magic!r}): {path}")
+        self._view = memoryview(self._mm)
+        self.truncated = False  # 末尾是否有被截断的记录 (录制中途断电 / 崩溃)
+
+    def __iter__(self):
+        mm, view = self._mm, self._view
+        end = len(mm)
+        pos = FILE_HEADER.size
+        while pos + RECORD_HEADER.size <= end:
+            n, frame_type, label, ts = RECORD_HEADER.unpack_from(mm, pos)
+            start = pos + RECORD_HEADER.size
+            if start + n > end:
+                break
+            yield CaptureRecord(ts, frame_type, label, view[start:start + n])
+            pos = start + n
+        self.truncated = pos != end
+
+    def decoded(self):
+        """ 逐条产出 (record, 帧对象)，解析规则与实时解码器相同 (radar_protocol.FRAME_HANDLERS) """
+        for rec in self:
+            frame = radar_protocol.decode_frame(rec.frame_type, rec.payload)
+            if frame is not None:
+                yield rec, frame
+
+    def samples(self):
+        """
+        按采集脚本的方式重建状态: 目标帧更新当前目标，每个点云帧产出一个样本
+        产出 (timestamp, label, target, points)，target 为 {'z', 'speed'}，points 为 (N, 3) [x, y, speed]
+        """
+        target = {'z': 0.0, 'speed': 0.0}
+        for rec, frame in self.decoded():
+            if isinstance(frame, radar_protocol.TargetFrame):
+                t = radar_protocol.primary_target(frame)
+                if t:
+                    target.update(t)
+            elif isinstance(frame, radar_protocol.PointCloudFrame):
+                yield rec.timestamp, rec.label, dict(target), radar_protocol.cloud_points(frame)
+
+    def close(self):
+        view = getattr(self, '_view', None)
+        if view is not None:
+            view.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # 调用方仍持有 payload 视图，映射区在视图被回收后自动释放
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_features(capture_path, csv_path):
+    """ 回放录制文件，每个带标签的点云帧生成一行特征 (FEATURE_NAMES + label) """
+    import feature_extractor
+    rows = 0
+    with CaptureReader(capture_path) as reader, open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(feature_extractor.FEATURE_NAMES + ['label'])
+        for _, label, target, points in reader.samples():
+            if label == LABEL_NONE:
+                continue
+            writer.writerow(feature_extractor.extract_features(target, points) + [label])
+            rows += 1
+        truncated = reader.truncated
+    return rows, truncated
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python3 radar_capture.py <录制文件.cap> [输出.csv]")
+        sys.exit(1)
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + '.csv'
+    rows, truncated = export_features(src, dst)
+    print(f"✅ {src} -> {dst} ({rows} 行)")
+    if truncated:
+        print("⚠️ 录制文件末尾有不完整的记录 (已忽略)")
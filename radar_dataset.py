@@ -0,0 +1,561 @@
+"""
+训练数据集缓存: 特征 CSV -> 按列存储的 .npy (可内存映射)
+
+采集脚本一直往同一个 CSV 追加，训练时每次都 pd.read_csv 全量解析文本，数据越多越慢。
+这里第一次加载时把 CSV 转成每列一个 .npy 文件，之后直接读二进制 (或 mmap)，不再解析文本：
+
+    data/radar_training_data.csv
+    data/.cache/radar_training_data/
+        meta.json            # 源文件 大小 / mtime / 已缓存字节数 / 内容哈希 / 列名与类型
+        target_z.npy ...     # 每列一个，label 为 int64，其余为 float64
+
+缓存失效规则:
+  - 源文件 大小 + mtime 与 meta 一致: 直接用缓存 (不读 CSV)
+  - 源文件变长且 已缓存部分的内容哈希 不变: 只解析新追加的行，追加到各列 .npy 末尾 (新采集的一次会话)
+  - 其他情况 (被改写 / 截断 / 列变了): 全量重建
+末尾没写完的半行 (采集脚本正在写) 不缓存，下次再处理；已写完的文件 (压缩分段 / 已轮转关闭的分段)
+没有换行的最后一行照常缓存，与 pd.read_csv 行数一致。CSV 按块读取解析，不会一次把整个文件读进内存。
+采集脚本开启分段轮转后 (见 radar_writer.py)，load_segments() 按时间顺序读取原文件和全部分段，
+每个分段单独缓存；.csv.gz / .csv.xz 压缩分段流式解压后解析，文件不变时同样直接命中缓存。
+
+多个数据源合并 (merge_sources): 数据分散在多个 CSV (仓库根目录 data/、project_root/data/、
+hardware_collection/data/ ...)，按块流式读取，内存占用与总数据量无关:
+  1. 逐块读入，检查表头含有 FEATURE_NAMES + label (旧版特征的文件整份跳过并报告)，
+     每行算两个独立的 64 位哈希 (pandas 行哈希 + 对行内各列原始 64 位数据的 splitmix64 链式混合)，
+     把 (哈希, 行号, 整行数据) 按哈希分桶写到临时目录 (桶数 = 输入大小 / MERGE_BUCKET_BYTES)
+  2. 逐桶按 哈希 + 整行数据 排序，只有整行内容完全相同才算重复 (保留最先出现的一行)，
+     哈希碰撞不会误删不同的行；超过 MERGE_BUCKET_BYTES 的桶先再拆分；每桶要丢弃的行号排序后写到文件
+  3. 再按块流式读一遍，从各桶的行号文件中归并出本块的重复行并跳过，
+     写出合并后的 CSV (先写临时文件，完成后原子替换)
+输出保持各数据源的先后顺序和源内的行序 (标签段 / 时序特征依赖行序)。
+
+用法:
+    df = load_csv('data/radar_training_data.csv')            # pandas.DataFrame
+    cols = load_columns('data/radar_training_data.csv')      # {列名: np.memmap}
+    df = load_segments('data/radar_training_data.csv')       # 原文件 + 全部分段 (含压缩分段)
+    report = merge_sources(['a.csv', 'b.csv'], 'merged.csv')
+    python3 radar_dataset.py data/radar_training_data.csv    # 手动建立 / 更新缓存
+    python3 radar_dataset.py merge merged.csv a.csv b.csv ... # 合并去重
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import feature_extractor
+import radar_writer
+
+CACHE_DIRNAME = '.cache'
+META_FILE = 'meta.json'
+MERGE_META_FILE = 'merge.json'   # 合并输出对应的数据源列表 (放在输出文件的缓存目录下)
+LABEL_COLUMN = 'label'
+HASH_CHUNK = 1 << 20
+READ_CHUNK = 8 << 20        # 建缓存时每次读取 / 解析的字节数 (压缩分段也按块流式解压)
+MERGE_CHUNK_ROWS = 100000   # 合并时每块读取的行数
+MERGE_BUCKET_BYTES = 64 << 20   # 去重时每个哈希桶的大小上限 (每行 24 字节 + 每列 8 字节)，超过就再拆分
+DATASET_COLUMNS = feature_extractor.FEATURE_NAMES + [LABEL_COLUMN]
+_MIX_SEED = np.uint64(0x9E3779B97F4A7C15)
+_MIX_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def cache_dir_for(csv_path):
+    """ 按逻辑文件名取缓存目录：分段压缩前后 (a.000.csv / a.000.csv.gz) 共用同一份缓存 """
+    base = os.path.splitext(os.path.basename(radar_writer.strip_compression(csv_path)))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIRNAME, base)
+
+
+def _hash_prefix(path, length):
+    """ 源文件前 length 字节的内容哈希 (返回 hashlib 对象，可以继续 update 追加的内容) """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(HASH_CHUNK, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h
+
+
+def _iter_lines(path, start, final=False):
+    """
+    从 start 起按块读取完整行，逐块返回 (字节, 结束偏移)
+    final=False (文件可能还在追加) 时末尾没有换行的半行留到下次；final=True (已写完) 时最后一行也返回
+    """
+    with radar_writer.open_binary(path) as f:
+        f.seek(start)
+        end, tail = start, b''
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            buf = tail + chunk
+            cut = buf.rfind(b'\n') + 1
+            tail = buf[cut:]
+            if cut:
+                end += cut
+                yield buf[:cut], end
+        if final and tail:
+            yield tail, end + len(tail)
+
+
+def _column_dtype(name):
+    return np.int64 if name == LABEL_COLUMN else np.float64
+
+
+def _parse(data, names=None):
+    """ 解析 CSV 字节: names 为 None 时第一行是表头 """
+    if names is None:
+        df = pd.read_csv(io.BytesIO(data))
+    else:
+        df = pd.read_csv(io.BytesIO(data), header=None, names=names)
+    return {c: df[c].to_numpy(dtype=_column_dtype(c)) for c in df.columns}
+
+
+def _append_npy(path, values):
+    """ 把 values 追加到一维 .npy 末尾: 数据写在文件尾，再原地改写表头里的 shape """
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        header_len = f.tell()
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran,
+                  'shape': (shape[0] + len(values),)}
+        buf = io.BytesIO()
+        # numpy 写表头时预留了 shape 增长的空格，新表头长度不变才能原地覆盖
+        if version == (1, 0):
+            np.lib.format.write_array_header_1_0(buf, header)
+        else:
+            np.lib.format.write_array_header_2_0(buf, header)
+        if buf.tell() != header_len:
+            return False
+        f.seek(0)
+        f.write(buf.getvalue())
+    return True
+
+
+class DatasetCache:
+    """
+    单个 CSV 的列式缓存
+    final=True 表示文件已写完 (已轮转关闭的分段；压缩分段总是如此)，末尾没有换行的最后一行也缓存，
+    否则当作正在追加的半行跳过，与 pd.read_csv 的行数只在正被写入的文件上有差别
+    """
+    def __init__(self, csv_path, cache_dir=None, final=False):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir or cache_dir_for(csv_path)
+        self.meta_path = os.path.join(self.cache_dir, META_FILE)
+        self.compressed = radar_writer.is_compressed(csv_path)  # .csv.gz / .csv.xz 分段
+        self.final = final or self.compressed
+        self.last_action = None  # 'hit' / 'verify' / 'append' / 'rebuild'
+
+    def _load_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self, meta):
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self.meta_path)  # 原子替换: 中途中断时旧缓存视为失效而不是损坏
+
+    def _column_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.npy")
+
+    def update(self):
+        """ 按失效规则检查 / 更新缓存，返回 meta """
+        st = os.stat(self.csv_path)
+        meta = self._load_meta()
+        if meta and meta['source_size'] == st.st_size and meta['source_mtime_ns'] == st.st_mtime_ns \
+                and (self.compressed or not self.final or meta['cached_bytes'] == st.st_size):
+            self.last_action = 'hit'
+            return meta
+        if meta and self.compressed:
+            # 压缩分段写完即不再变化：通常是同一分段刚被压缩，解压后内容与缓存一致时只更新文件信息
+            h, end = hashlib.blake2b(digest_size=16), 0
+            for data, end in _iter_lines(self.csv_path, 0, final=True):
+                h.update(data)
+            if end == meta['cached_bytes'] and h.hexdigest() == meta['content_hash']:
+                meta['source_size'] = st.st_size
+                meta['source_mtime_ns'] = st.st_mtime_ns
+                self._save_meta(meta)
+                self.last_action = 'verify'
+                return meta
+            self.last_action = 'rebuild'
+            return self._rebuild(st)
+        if meta and st.st_size >= meta['cached_bytes']:
+            h = _hash_prefix(self.csv_path, meta['cached_bytes'])
+            if h.hexdigest() == meta['content_hash'] and self._append(meta, st, h):
+                self.last_action = 'append'
+                return meta
+        self.last_action = 'rebuild'
+        return self._rebuild(st)
+
+    def _read_columns(self, start, hasher, names=None):
+        """ 按块解析 start 之后的行 (names 为 None 时第一块以表头开始)，返回 ({列名: 数组}, 结束偏移) """
+        parts, end = [], start
+        for data, end in _iter_lines(self.csv_path, start, self.final):
+            block = _parse(data, names)
+            names = names or list(block)
+            parts.append(block)
+            hasher.update(data)
+        if not parts:
+            return {}, end
+        return {c: np.concatenate([b[c] for b in parts]) for c in parts[0]}, end
+
+    def _rebuild(self, st):
+        hasher = hashlib.blake2b(digest_size=16)
+        columns, end = self._read_columns(0, hasher)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+        for name, values in columns.items():
+            np.save(self._column_path(name), values)
+        meta = {
+            'columns': list(columns),
+            'rows': len(next(iter(columns.values()))) if columns else 0,
+            'cached_bytes': end,
+            'content_hash': hasher.hexdigest(),
+            'source_size': st.st_size,
+            'source_mtime_ns': st.st_mtime_ns,
+            'sessions': 1,
+        }
+        self._save_meta(meta)
+        return meta
+
+    def _append(self, meta, st, hasher):
+        """
+        只解析 cached_bytes 之后新追加的完整行；表头不兼容时返回 False (改为重建)
+        hasher 为已缓存前缀的哈希对象，继续 update 新增内容即得新前缀的哈希，不用再读一遍文件
+        """
+        try:
+            columns, end = self._read_columns(meta['cached_bytes'], hasher, names=meta['columns'])
+        except (ValueError, pd.errors.ParserError):
+            return False
+        if columns:
+            n = len(columns[meta['columns'][0]])
+            # 先删 meta: 追加到一半被中断时下次会全量重建，而不是重复追加
+            os.remove(self.meta_path)
+            for name in meta['columns']:
+                if not _append_npy(self._column_path(name), columns[name]):
+                    return False
+            meta['rows'] += n
+            meta['sessions'] += 1
+            meta['content_hash'] = hasher.hexdigest()
+            meta['cached_bytes'] = end
+        meta['source_size'] = st.st_size
+        meta['source_mtime_ns'] = st.st_mtime_ns
+        self._save_meta(meta)
+        return True
+
+    def columns(self, mmap=True):
+        """ 更新缓存后返回 {列名: 数组}，mmap=True 时为只读内存映射 """
+        meta = self.update()
+        mode = 'r' if mmap else None
+        return {name: np.load(self._column_path(name), mmap_mode=mode) for name in meta['columns']}
+
+
+def load_columns(csv_path, mmap=True, cache_dir=None):
+    return DatasetCache(csv_path, cache_dir).columns(mmap)
+
+
+def load_csv(csv_path, cache_dir=None):
+    """ 代替 pd.read_csv(csv_path): 列与 CSV 相同 (label 为整数)，数据来自二进制缓存 """
+    return pd.DataFrame(load_columns(csv_path, mmap=False, cache_dir=cache_dir))
+
+
+def load_segments(csv_path, cache=True):
+    """
+    读取 csv_path 及其全部轮转分段 (radar_writer.segment_paths)，按时间顺序拼成一个 DataFrame
+    cache=True 时每个文件走列式缓存，否则直接 pd.read_csv (压缩分段由 pandas 按后缀解压)
+    返回 (df, 每个文件的加载方式 'hit' / 'verify' / 'append' / 'rebuild' / 'read')；没有任何文件时 df 为 None
+    列出分段之后、读取之前，分段可能刚被后台压缩 (原 .csv 已删除)，此时改读压缩后的文件
+    除最后一个文件外都已轮转关闭 (final)，只有最后一个可能正被追加
+    """
+    frames, actions = [], []
+    listed_paths = radar_writer.segment_paths(csv_path)
+    for i, listed in enumerate(listed_paths):
+        for attempt in range(2):
+            path = radar_writer.resolve_segment(listed)
+            if path is None:
+                break  # 读取前被删除
+            try:
+                if cache:
+                    c = DatasetCache(path, final=i < len(listed_paths) - 1)
+                    frames.append(pd.DataFrame(c.columns(mmap=False)))
+                    actions.append(c.last_action)
+                else:
+                    frames.append(pd.read_csv(path))
+                    actions.append('read')
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+    if cache:
+        prune_segment_caches(csv_path)
+    if not frames:
+        return None, actions
+    return pd.concat(frames, ignore_index=True), actions
+
+
+def prune_segment_caches(csv_path):
+    """ 删除 csv_path 的分段中源文件已不存在的缓存目录 (分段被删除 / 旧版按压缩文件名建的缓存)，返回删除数 """
+    stem, ext = os.path.splitext(csv_path)
+    cache_root = os.path.dirname(cache_dir_for(csv_path))
+    if not os.path.isdir(cache_root):
+        return 0
+    pattern = re.compile(re.escape(os.path.basename(stem)) + r'\.\d{8}_\d{6}\.\d{3,}(' + re.escape(ext) + ')?$')
+    live = {os.path.basename(cache_dir_for(p)) for p in radar_writer.segment_paths(csv_path)}
+    removed = 0
+    for name in os.listdir(cache_root):
+        if pattern.match(name) and name not in live:
+            shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+# ---------------- 多数据源合并 ----------------
+
+def check_schema(path, columns=DATASET_COLUMNS):
+    """ 返回 CSV 表头缺少的列 (空列表表示可用) """
+    header = pd.read_csv(radar_writer.resolve_segment(path) or path, nrows=0).columns.tolist()
+    return [c for c in columns if c not in header]
+
+
+def _iter_chunks(path, columns, chunk_rows):
+    dtypes = {c: _column_dtype(c) for c in columns}
+    path = radar_writer.resolve_segment(path) or path  # 两遍读取之间分段可能已被压缩
+    for chunk in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_rows,
+                             float_precision='round_trip'):
+        yield chunk[columns]
+
+
+def _bucket_dtype(ncols):
+    return np.dtype([('h1', '<u8'), ('h2', '<u8'), ('row', '<i8'), ('vals', '<u8', (ncols,))])
+
+
+def _row_words(chunk):
+    """ 每行各列的原始 64 位数据 (float64 / int64 按位看作 uint64)，形状 (行数, 列数) """
+    return np.column_stack([chunk[c].to_numpy().astype(_column_dtype(c), copy=False).view(np.uint64)
+                            for c in chunk.columns])
+
+
+def _mix64(x):
+    """ splitmix64 终结函数 (uint64 乘法按 2^64 回绕) """
+    x = (x ^ (x >> np.uint64(30))) * _MIX_M1
+    x = (x ^ (x >> np.uint64(27))) * _MIX_M2
+    return x ^ (x >> np.uint64(31))
+
+
+def _row_hashes(chunk, words):
+    """
+    两个独立的 64 位行哈希: h1 为 pandas 行哈希，h2 为各列原始数据的 splitmix64 链式混合
+    (hash_pandas_object 对数值列忽略 hash_key，换 key 得到的仍是同一个哈希)
+    """
+    h1 = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    h2 = np.full(len(words), _MIX_SEED, dtype=np.uint64)
+    for j in range(words.shape[1]):
+        h2 = _mix64(h2 ^ words[:, j])
+    return h1, h2
+
+
+def _bucket_key(h1, depth, n):
+    """ 第 depth 层的桶号: 相同的行 (h1 相同) 总在同一桶；每层换一种混合，拆分时不会原样挤在一起 """
+    return (_mix64(h1 + np.uint64(depth)) % np.uint64(n)).astype(np.int64)
+
+
+def _scatter(rec, keys, paths):
+    """ 按桶号把记录追加到各桶文件 """
+    order = np.argsort(keys, kind='stable')
+    bounds = np.searchsorted(keys[order], np.arange(len(paths) + 1))
+    for k in np.flatnonzero(bounds[1:] > bounds[:-1]):
+        with open(paths[k], 'ab') as f:
+            rec[order[bounds[k]:bounds[k + 1]]].tofile(f)
+
+
+def _dedup_bucket(path, bucket_dtype, depth, chunk_rows, bucket_bytes, drop_paths):
+    """
+    找出一个桶内的重复行，行号排好序写到 path + '.drop' (追加到 drop_paths)
+    桶文件超过 bucket_bytes 时先分块读出、按下一层桶号拆开，再逐个子桶递归处理
+    """
+    size = os.path.getsize(path)
+    if size > bucket_bytes:
+        n = size // bucket_bytes + 1
+        subs = [f"{path}.{k}" for k in range(n)]
+        mm = np.memmap(path, dtype=bucket_dtype, mode='r')
+        for start in range(0, len(mm), chunk_rows):
+            rec = np.array(mm[start:start + chunk_rows])
+            _scatter(rec, _bucket_key(rec['h1'], depth + 1, n), subs)
+        del mm
+        os.remove(path)
+        subs = [p for p in subs if os.path.exists(p)]
+        if len(subs) > 1:
+            for sub in subs:
+                _dedup_bucket(sub, bucket_dtype, depth + 1, chunk_rows, bucket_bytes, drop_paths)
+            return
+        path = subs[0]  # 整桶哈希相同 (同一行大量重复)，拆不开，只能整桶载入
+
+    # 按 (h1, h2, 整行数据, 行号) 排序，内容完全相同的行相邻，只保留行号最小的一行
+    # (逐位比较整行，哈希碰撞的不同行不会被当成重复)
+    rec = np.fromfile(path, dtype=bucket_dtype)
+    vals = rec['vals']
+    keys = [rec['row']] + [vals[:, j] for j in range(vals.shape[1])] + [rec['h2'], rec['h1']]
+    rec = rec[np.lexsort(keys)]
+    vals = rec['vals']
+    dup = np.zeros(len(rec), dtype=bool)
+    dup[1:] = ((rec['h1'][1:] == rec['h1'][:-1]) & (rec['h2'][1:] == rec['h2'][:-1])
+               & (vals[1:] == vals[:-1]).all(axis=1))
+    os.remove(path)
+    if dup.any():
+        np.sort(rec['row'][dup]).tofile(path + '.drop')
+        drop_paths.append(path + '.drop')
+
+
+def merge_sources(sources, out_path, columns=DATASET_COLUMNS,
+                  chunk_rows=MERGE_CHUNK_ROWS, bucket_bytes=MERGE_BUCKET_BYTES):
+    """
+    合并多个 CSV 并去除完全相同的行，写出 out_path
+    桶数按输入大小 / bucket_bytes 决定，过大的桶再拆分，去重时内存约为 bucket_bytes 的几倍，与数据总量无关
+    返回报告: {'sources': [{'path', 'rows', 'duplicates', 'skipped'}], 'rows_in', 'rows_out'}
+    """
+    out_abs = os.path.abspath(out_path)
+    report = {'sources': [], 'rows_in': 0, 'rows_out': 0}
+    usable = []
+    expanded = _expand_segments(sources)
+    for path in expanded:
+        entry = {'path': path, 'rows': 0, 'duplicates': 0, 'skipped': None}
+        report['sources'].append(entry)
+        if os.path.abspath(path) == out_abs:
+            entry['skipped'] = "与输出文件相同"
+        elif radar_writer.resolve_segment(path) is None:
+            entry['skipped'] = "文件不存在"
+        else:
+            missing = check_schema(path, columns)
+            if missing:
+                entry['skipped'] = f"缺少列 {missing}"
+            else:
+                usable.append(entry)
+
+    tmp = tempfile.mkdtemp(prefix='merge_', dir=os.path.dirname(out_abs) or '.')
+    try:
+        # 1. 逐块哈希，按桶写出 (h1, h2, 全局行号, 整行数据)
+        #    CSV 文本每行比桶记录长，按文件大小估算桶数足够；压缩分段估少了由第 2 步拆分兜底
+        bucket_dtype = _bucket_dtype(len(columns))
+        in_bytes = sum(os.path.getsize(radar_writer.resolve_segment(e['path'])) for e in usable)
+        buckets = int(in_bytes // bucket_bytes) + 1
+        bucket_paths = [os.path.join(tmp, f"bucket_{b:05d}.bin") for b in range(buckets)]
+        row = 0
+        for entry in usable:
+            for chunk in _iter_chunks(entry['path'], columns, chunk_rows):
+                words = _row_words(chunk)
+                h1, h2 = _row_hashes(chunk, words)
+                rec = np.empty(len(chunk), dtype=bucket_dtype)
+                rec['h1'], rec['h2'] = h1, h2
+                rec['row'] = np.arange(row, row + len(chunk))
+                rec['vals'] = words
+                _scatter(rec, _bucket_key(h1, 0, buckets), bucket_paths)
+                entry['rows'] += len(chunk)
+                row += len(chunk)
+        report['rows_in'] = row
+
+        # 2. 逐桶去重，每个桶的重复行号 (已排序) 各写一个文件
+        drop_paths = []
+        for path in bucket_paths:
+            if os.path.exists(path):
+                _dedup_bucket(path, bucket_dtype, 0, chunk_rows, bucket_bytes, drop_paths)
+
+        # 3. 再读一遍，每块只从各桶的行号文件里取出落在本块内的部分 (多路归并)，跳过重复行，写入临时文件后替换
+        drops = [np.memmap(p, dtype=np.int64, mode='r') for p in drop_paths]
+        cursors = [0] * len(drops)
+        part = os.path.join(tmp, 'merged.csv')
+        row = 0
+        with open(part, 'w', newline='') as f:
+            f.write(','.join(columns) + '\n')
+            for entry in usable:
+                for chunk in _iter_chunks(entry['path'], columns, chunk_rows):
+                    keep = np.ones(len(chunk), dtype=bool)
+                    for i, drop in enumerate(drops):
+                        lo = cursors[i]
+                        hi = lo + int(np.searchsorted(drop[lo:], row + len(chunk)))
+                        keep[drop[lo:hi] - row] = False
+                        cursors[i] = hi
+                    entry['duplicates'] += int(len(chunk) - keep.sum())
+                    chunk[keep].to_csv(f, header=False, index=False)
+                    report['rows_out'] += int(keep.sum())
+                    row += len(chunk)
+        del drops
+        os.replace(part, out_abs)
+        meta_dir = cache_dir_for(out_abs)
+        os.makedirs(meta_dir, exist_ok=True)
+        with open(os.path.join(meta_dir, MERGE_META_FILE), 'w') as f:
+            json.dump({'sources': [os.path.abspath(p) for p in expanded], 'columns': list(columns)}, f)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return report
+
+
+def _expand_segments(sources):
+    """ 每个数据源展开为 原文件 + 轮转分段 (都不存在时保留原路径，报告为不存在) """
+    paths = []
+    for src in sources:
+        paths.extend(radar_writer.segment_paths(src) or [src])
+    return paths
+
+
+def merge_is_stale(sources, out_path, columns=DATASET_COLUMNS):
+    """ 输出不存在、数据源 (含分段) 列表变了，或任一数据源比输出新时需要重新合并 """
+    if not os.path.exists(out_path):
+        return True
+    try:
+        with open(os.path.join(cache_dir_for(out_path), MERGE_META_FILE)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return True
+    if meta != {'sources': [os.path.abspath(p) for p in _expand_segments(sources)], 'columns': list(columns)}:
+        return True
+    out_mtime = os.stat(out_path).st_mtime_ns
+    return any(os.path.exists(p) and os.stat(p).st_mtime_ns > out_mtime for p in _expand_segments(sources))
+
+
+def print_merge_report(report, out_path):
+    for e in report['sources']:
+        if e['skipped']:
+            print(f"❌ 跳过 {e['path']}: {e['skipped']}")
+        else:
+            print(f"✅ {e['path']}: {e['rows']} 行, 重复 {e['duplicates']} 行")
+    print(f"合并完成: {report['rows_in']} 行 -> {report['rows_out']} 行 "
+          f"(去除重复 {report['rows_in'] - report['rows_out']} 行) -> {out_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python3 radar_dataset.py data.csv [...]")
+        print("      python3 radar_dataset.py merge out.csv a.csv b.csv [...]")
+        sys.exit(1)
+    if sys.argv[1] == 'merge':
+        if len(sys.argv) < 4:
+            print("用法: python3 radar_dataset.py merge out.csv a.csv b.csv [...]")
+            sys.exit(1)
+        print_merge_report(merge_sources(sys.argv[3:], sys.argv[2]), sys.argv[2])
+        sys.exit(0)
+    for arg in sys.argv[1:]:
+        segments = radar_writer.segment_paths(arg)
+        for i, path in enumerate(segments):
+            cache = DatasetCache(path, final=i < len(segments) - 1)
+            meta = cache.update()
+            print(f"✅ {path}: {meta['rows']} 行, {len(meta['columns'])} 列 ({cache.last_action}) -> {cache.cache_dir}")
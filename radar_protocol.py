@@ -0,0 +1,509 @@
+import struct
+import time
+from collections import namedtuple
+import numpy as np
+
+# --- 0x01-SOF 协议常量 ---
+# 帧结构: SOF(1) + ID(2) + LEN(2) + TYPE(2) + 头校验(1) + 数据(N) + 数据校验(1)
+SOF = 0x01
+HEADER_LEN = 7
+HEADER_STRUCT = struct.Struct('>BHHH')
+MIN_FRAME_LEN = HEADER_LEN + 1  # 至少 8 字节才能开始判断帧头
+
+# --- 控制指令 (TYPE=0x0201，负载为 int32 小端序) ---
+CMD_TYPE = 0x0201
+CMD_POINT_CLOUD_ON = 0x06   # 开启点云信息 (0x0A08)
+CMD_TARGET_ON = 0x08        # 开启目标信息 (0x0A04)
+CMD_HIGH_SENSITIVITY = 0x0C # 设置高灵敏度
+CMD_FAST_TRIGGER = 0x0F     # 设置快速触发
+CMD_TOP_MOUNT = 0x13        # 顶装
+CMD_SIDE_MOUNT = 0x14       # 侧装
+
+# --- 上报帧类型 ---
+FRAME_TARGET = 0x0A04       # 人员位置 (目标信息)
+FRAME_POINT_CLOUD = 0x0A08  # 点云信息
+FRAME_PRESENCE = 0x0F09     # 有无人检测结果
+FRAME_PHASE = 0x0A13        # 相位测试结果
+FRAME_BREATH_RATE = 0x0A14  # 呼吸速率
+FRAME_HEART_RATE = 0x0A15   # 心跳速率
+FRAME_DISTANCE = 0x0A16     # 检测目标距离
+FRAME_TRACK = 0x0A17        # 跟踪目标位置
+
+# --- 蓝牙遥控器协议 ---
+# 帧结构: AA 55 + 数据(17) + 校验和(1) + FE，共 21 字节
+REMOTE_HEADER = b'\xaa\x55'
+REMOTE_TAIL = 0xFE
+REMOTE_FRAME_LEN = 21
+
+# --- 0x0A04 目标信息 ---
+# 格式: Num(4) + [x(4), y(4), z(4), dop_idx(4), cluster_id(4)]...
+TARGET_DTYPE = np.dtype([
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('z', '<f4'),
+    ('dop_idx', '<i4'),
+    ('cluster_id', '<i4'),
+])
+
+# --- 0x0A08 点云 ---
+# 格式: Num(4) + [cluster_id(4), x(4), y(4), z(4), speed(4)]...
+POINT_DTYPE = np.dtype([
+    ('cluster_id', '<i4'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('z', '<f4'),
+    ('speed', '<f4'),
+])
+
+# 简单清洗: 过滤掉太远或异常的噪点 (ROI 区域)
+ROI_MAX_ABS_X = 4.0
+ROI_MIN_Y = 0.1
+ROI_MAX_Y = 6.0
+
+
+# 校验算法分档阈值 (见 benchmarks/bench_checksum.py)
+_CHECKSUM_FOLD_MIN = 96    # 小于该长度: 逐字节循环最快 (7 字节帧头不走分档，见 calc_checksum_loop)
+_CHECKSUM_NUMPY_MIN = 512  # 大于该长度: NumPy uint64 归约最快 (大点云帧)
+
+
+def calc_checksum_loop(data):
+    """
+    原始实现：逐字节异或 (XOR) 后取反
+    固定 7 字节的帧头直接用它 (解码器里内联)，省掉 calc_checksum 按长度分档的开销
+    """
+    checksum = 0
+    for b in data:
+        checksum ^= b
+    return (~checksum) & 0xFF
+
+
+def calc_checksum(data):
+    """
+    校验算法：异或 (XOR) 后取反，结果与 calc_checksum_loop 完全一致
+    按数据长度选择实现:
+      - 短数据: 逐字节循环
+      - 中等长度: 转成大整数后对半折叠 (每次折叠都是 C 层面的整段运算)
+      - 长数据: 按 8 字节字宽做 NumPy 异或归约，再把 64 位结果折叠到 1 字节
+    """
+    n = len(data)
+    if n < _CHECKSUM_FOLD_MIN:
+        checksum = 0
+        for b in data:
+            checksum ^= b
+        return (~checksum) & 0xFF
+
+    if n < _CHECKSUM_NUMPY_MIN:
+        acc = int.from_bytes(data, 'little')
+        bits = 8 << (n - 1).bit_length()
+        while bits > 8:
+            bits >>= 1
+            acc = (acc ^ (acc >> bits)) & ((1 << bits) - 1)
+        return (~acc) & 0xFF
+
+    words = n // 8
+    acc = int(np.bitwise_xor.reduce(np.frombuffer(data, dtype=np.uint64, count=words)))
+    acc ^= acc >> 32
+    acc ^= acc >> 16
+    acc ^= acc >> 8
+    acc &= 0xFF
+    for b in memoryview(data)[words * 8:]:
+        acc ^= b
+    return (~acc) & 0xFF
+
+
+# --- 解码后的帧对象 ---
+TargetFrame = namedtuple('TargetFrame', ['targets'])              # 0x0A04, TARGET_DTYPE 数组
+PointCloudFrame = namedtuple('PointCloudFrame', ['points'])       # 0x0A08, POINT_DTYPE 数组 (未清洗)
+PresenceFrame = namedtuple('PresenceFrame', ['is_human'])         # 0x0F09
+PhaseFrame = namedtuple('PhaseFrame', ['total', 'breath', 'heart'])  # 0x0A13
+BreathRateFrame = namedtuple('BreathRateFrame', ['rate'])         # 0x0A14, RPM
+HeartRateFrame = namedtuple('HeartRateFrame', ['rate'])           # 0x0A15, BPM
+DistanceFrame = namedtuple('DistanceFrame', ['flag', 'range'])    # 0x0A16, flag=1 时 range 有效
+TrackFrame = namedtuple('TrackFrame', ['x', 'y', 'z'])            # 0x0A17
+UnknownFrame = namedtuple('UnknownFrame', ['frame_type', 'data'])  # 未注册的类型
+
+
+def build_frame(frame_type, payload, frame_id=1):
+    """
+    封装任意类型的帧：自动计算头部和数据的校验和
+    协议头: SOF(1) + ID(2) + LEN(2) + TYPE(2)
+    """
+    header = HEADER_STRUCT.pack(SOF, frame_id, len(payload), frame_type)
+    return header + bytes([calc_checksum_loop(header)]) + bytes(payload) + bytes([calc_checksum(payload)])
+
+
+def build_command(cmd_val):
+    """
+    封装控制指令: TYPE=0x0201, 数据为 int32 小端序指令码
+    """
+    return build_frame(CMD_TYPE, struct.pack('<I', cmd_val))
+
+
+def encode_array(records, dtype):
+    """ _decode_array 的逆操作: 结构化数组 -> Num(int32) + 定长结构体 (模拟器 / 测试用) """
+    records = np.asarray(records, dtype=dtype)
+    return struct.pack('<i', len(records)) + records.tobytes()
+
+
+def _decode_array(payload, dtype):
+    """ Num(int32) + Num 个定长结构体 -> 结构化数组 (按实际字节数截断，复制出来) """
+    num = struct.unpack_from('<i', payload, 0)[0]
+    count = max(0, min(num, (len(payload) - 4) // dtype.itemsize))
+    return np.frombuffer(payload, dtype=dtype, count=count, offset=4)
+
+
+def filter_roi(points):
+    """
+    ROI 区域清洗: |x| < 4.0 且 0.1 < y < 6.0
+    用 float64 比较，与逐点 Python 判断的结果完全一致
+    """
+    x = points['x'].astype(np.float64)
+    y = points['y'].astype(np.float64)
+    mask = (np.abs(x) < ROI_MAX_ABS_X) & (y > ROI_MIN_Y) & (y < ROI_MAX_Y)
+    return points[mask]
+
+
+def decode_point_cloud(payload, roi=True):
+    """
+    向量化解析 0x0A08 点云帧
+    输入:
+      payload: 数据体 (bytes / memoryview)
+      roi: 是否按 ROI 区域过滤噪点
+    输出:
+      POINT_DTYPE 结构化数组 (连续内存，不引用 payload)
+    """
+    if len(payload) < 4:
+        return np.empty(0, dtype=POINT_DTYPE)
+    points = _decode_array(payload, POINT_DTYPE)
+    return filter_roi(points) if roi else points.copy()
+
+
+def to_xys(points):
+    """
+    结构化点云 -> (N, 3) float64 数组 [x, y, speed]
+    逐元素等价于旧代码的 [(x, y, speed), ...] 列表，可直接交给 extract_features
+    """
+    out = np.empty((len(points), 3), dtype=np.float64)
+    out[:, 0] = points['x']
+    out[:, 1] = points['y']
+    out[:, 2] = points['speed']
+    return out
+
+
+def to_xyzv(points):
+    """ 结构化点云 -> (N, 4) float64 数组 [x, y, z, speed]，用于 3D 可视化 """
+    out = np.empty((len(points), 4), dtype=np.float64)
+    out[:, 0] = points['x']
+    out[:, 1] = points['y']
+    out[:, 2] = points['z']
+    out[:, 3] = points['speed']
+    return out
+
+
+def primary_target(frame):
+    """
+    0x0A04 帧中的第一个主要目标 -> {'z': float, 'speed': float}
+    (与 feature_extractor 的 target_info 格式一致)，没有目标时返回 None
+    """
+    if len(frame.targets) == 0:
+        return None
+    t = frame.targets[0]
+    return {'z': float(t['z']), 'speed': float(t['dop_idx'])}
+
+
+def cloud_points(frame):
+    """ 0x0A08 帧 -> ROI 清洗后的 (N, 3) 数组 [x, y, speed] """
+    return to_xys(filter_roi(frame.points))
+
+
+# --- 各帧类型的解析函数 (payload 不完整时返回 None) ---
+def decode_target(payload):
+    if len(payload) < 4:
+        return None
+    return TargetFrame(_decode_array(payload, TARGET_DTYPE).copy())
+
+
+def decode_points(payload):
+    if len(payload) < 4:
+        return None
+    return PointCloudFrame(decode_point_cloud(payload, roi=False))
+
+
+def decode_presence(payload):
+    # 文档写 uint8，但长度是 2 字节 (示例 01 00)，只看第一个字节
+    if len(payload) < 1:
+        return None
+    return PresenceFrame(payload[0])
+
+
+def decode_phase(payload):
+    if len(payload) < 12:
+        return None
+    return PhaseFrame(*struct.unpack_from('<fff', payload, 0))
+
+
+def decode_breath_rate(payload):
+    if len(payload) < 4:
+        return None
+    return BreathRateFrame(struct.unpack_from('<f', payload, 0)[0])
+
+
+def decode_heart_rate(payload):
+    if len(payload) < 4:
+        return None
+    return HeartRateFrame(struct.unpack_from('<f', payload, 0)[0])
+
+
+def decode_distance(payload):
+    if len(payload) < 8:
+        return None
+    return DistanceFrame(*struct.unpack_from('<If', payload, 0))
+
+
+def decode_track(payload):
+    if len(payload) < 12:
+        return None
+    return TrackFrame(*struct.unpack_from('<fff', payload, 0))
+
+
+# 帧类型 -> 解析函数 的分发表
+FRAME_HANDLERS = {
+    FRAME_TARGET: decode_target,
+    FRAME_POINT_CLOUD: decode_points,
+    FRAME_PRESENCE: decode_presence,
+    FRAME_PHASE: decode_phase,
+    FRAME_BREATH_RATE: decode_breath_rate,
+    FRAME_HEART_RATE: decode_heart_rate,
+    FRAME_DISTANCE: decode_distance,
+    FRAME_TRACK: decode_track,
+}
+
+
+def register_handler(frame_type, handler):
+    """ 注册 (或覆盖) 某个帧类型的解析函数: handler(payload) -> 帧对象 / None """
+    FRAME_HANDLERS[frame_type] = handler
+
+
+def decode_frame(frame_type, payload):
+    """ 按分发表解析一帧，未注册的类型返回 UnknownFrame """
+    handler = FRAME_HANDLERS.get(frame_type)
+    if handler is None:
+        return UnknownFrame(frame_type, bytes(payload))
+    return handler(payload)
+
+
+class _StreamBuffer:
+    """
+    串口字节流缓冲区 (零拷贝)
+
+    串口数据写入预分配的 bytearray，通过 read_pos / write_pos 两个偏移量原地消费，
+    丢弃字节只移动 read_pos，不再像 buffer = buffer[1:] 那样复制整个积压数据。
+    写指针到达末尾时把未消费的尾部搬回开头 (均摊 O(1))，放不下时才扩容。
+    """
+    def __init__(self, capacity):
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self.read_pos = 0
+        self.write_pos = 0
+
+        # 统计计数
+        self.bytes_in = 0       # 累计收到的字节
+        self.frames_ok = 0      # 校验通过的帧
+        self.frames_bad = 0     # 校验失败的帧
+        self.bytes_skipped = 0  # 同步过程中丢弃的字节
+        self.resyncs = 0        # 重新同步 (搜索帧头) 的次数
+
+        self._stats_time = time.monotonic()
+        self._stats_bytes = 0
+        self._stats_frames = 0
+
+    def __len__(self):
+        """ 缓冲区中尚未消费的字节数 """
+        return self.write_pos - self.read_pos
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def feed(self, data):
+        """ 追加串口读到的数据 """
+        n = len(data)
+        if n == 0:
+            return
+        if self.write_pos + n > len(self._buf):
+            self._compact(n)
+        self._buf[self.write_pos:self.write_pos + n] = data
+        self.write_pos += n
+        self.bytes_in += n
+
+    def _compact(self, incoming):
+        """ 把未消费的数据搬回缓冲区开头，空间仍不够则按 2 倍扩容 """
+        pending = self.write_pos - self.read_pos
+        need = pending + incoming
+        tail = self._view[self.read_pos:self.write_pos].tobytes()
+        if need > len(self._buf):
+            size = len(self._buf)
+            while size < need:
+                size *= 2
+            # 旧缓冲区可能仍被 payload 视图引用，直接换新的即可
+            self._buf = bytearray(size)
+            self._view = memoryview(self._buf)
+        self._buf[:pending] = tail
+        self.read_pos = 0
+        self.write_pos = pending
+
+    def _skip(self, n):
+        self.read_pos += n
+        self.bytes_skipped += n
+
+    def _resync(self, start, marker, keep=0):
+        """
+        从 start 开始批量搜索下一个帧头 marker，一次跳过中间所有字节
+        找不到时丢弃到末尾，只保留最后 keep 个字节 (可能是被截断的帧头)
+        """
+        nxt = self._buf.find(marker, start, self.write_pos)
+        if nxt < 0:
+            nxt = max(self.write_pos - keep, self.read_pos)
+        self.resyncs += 1
+        self._skip(nxt - self.read_pos)
+
+    def _reset_if_empty(self):
+        # 缓冲区清空时指针归零，避免无谓的搬移
+        if self.read_pos == self.write_pos:
+            self.read_pos = self.write_pos = 0
+
+    def stats(self):
+        """
+        返回统计信息，速率为距上一次调用 stats() 的平均值
+        """
+        now = time.monotonic()
+        dt = max(now - self._stats_time, 1e-9)
+        bytes_per_sec = (self.bytes_in - self._stats_bytes) / dt
+        frames_per_sec = (self.frames_ok - self._stats_frames) / dt
+        self._stats_time = now
+        self._stats_bytes = self.bytes_in
+        self._stats_frames = self.frames_ok
+        return {
+            'bytes_in': self.bytes_in,
+            'frames_ok': self.frames_ok,
+            'frames_bad': self.frames_bad,
+            'bytes_skipped': self.bytes_skipped,
+            'resyncs': self.resyncs,
+            'buffered': len(self),
+            'bytes_per_sec': bytes_per_sec,
+            'frames_per_sec': frames_per_sec,
+        }
+
+
+class FrameDecoder(_StreamBuffer):
+    """
+    0x01-SOF 帧解码器 (零拷贝)
+
+    帧头不对或头校验失败时，用 bytearray.find 直接跳到下一个 0x01，
+    而不是每次只丢 1 个字节再重试。
+
+    用法:
+        decoder = FrameDecoder()
+        decoder.feed(ser.read(ser.in_waiting))
+        for frame in decoder.decoded():
+            if isinstance(frame, TargetFrame): ...
+
+    frames() 产出原始 (frame_type, payload)，payload 是指向内部缓冲区的 memoryview，
+    只在下一次 feed() 之前有效；decoded() 产出的帧对象不引用缓冲区，可以放心保留。
+
+    on_frame(frame_type, payload): 可选回调，每个校验通过的原始帧在产出前调用一次
+    (例如 radar_capture.CaptureWriter.write 录制原始帧)。
+    """
+    def __init__(self, capacity=1 << 17, on_frame=None):
+        super().__init__(capacity)
+        self.on_frame = on_frame
+
+    def frames(self):
+        """
+        逐个产出缓冲区中完整且校验通过的帧: (frame_type, payload)
+        数据不完整时停止，等待下一次 feed()
+        """
+        while self.write_pos - self.read_pos >= MIN_FRAME_LEN:
+            buf = self._buf
+            r = self.read_pos
+
+            # 寻找帧头 SOF (0x01)
+            if buf[r] != SOF:
+                self._resync(r, SOF)
+                continue
+
+            # 1. 校验头部 (失败说明这个 0x01 只是普通数据，跳到下一个)
+            #    每个候选帧头都要校验，7 个字节直接内联异或，比调用 calc_checksum 快
+            if (~(buf[r] ^ buf[r + 1] ^ buf[r + 2] ^ buf[r + 3] ^ buf[r + 4] ^ buf[r + 5] ^ buf[r + 6])) & 0xFF \
+                    != buf[r + HEADER_LEN]:
+                self._resync(r + 1, SOF)
+                continue
+
+            _, _, data_len, frame_type = HEADER_STRUCT.unpack_from(buf, r)
+            total_len = MIN_FRAME_LEN + data_len + 1  # 头(7+1) + 数据(N) + 数据校验(1)
+            if self.write_pos - r < total_len:
+                break  # 数据没收全，等待下一波串口数据
+
+            # 2. 校验数据体 (无论成功与否，这一帧都已被消费)
+            start = r + MIN_FRAME_LEN
+            payload = self._view[start:start + data_len]
+            self.read_pos = r + total_len
+            if calc_checksum(payload) != buf[start + data_len]:
+                self.frames_bad += 1
+                continue
+
+            self.frames_ok += 1
+            if self.on_frame is not None:
+                self.on_frame(frame_type, payload)
+            yield frame_type, payload
+
+        self._reset_if_empty()
+
+    def decoded(self):
+        """ 逐个产出解码后的帧对象 (见 FRAME_HANDLERS)，跳过内容不完整的帧 """
+        for frame_type, payload in self.frames():
+            frame = decode_frame(frame_type, payload)
+            if frame is not None:
+                yield frame
+
+
+class RemoteDecoder(_StreamBuffer):
+    """
+    蓝牙遥控器帧解码器: AA 55 + 数据 + 校验和 + FE，定长 21 字节
+
+    包头不对或包尾不对时，批量搜索下一个 AA 55。
+    产出的是帧头、帧尾都正确的 21 字节 memoryview，
+    校验和 (remote_checksum_ok) 与 ID 由调用方判断。
+    """
+    def __init__(self, capacity=4096):
+        super().__init__(capacity)
+
+    def frames(self):
+        while self.write_pos - self.read_pos >= REMOTE_FRAME_LEN:
+            buf = self._buf
+            r = self.read_pos
+
+            # 1. 检查包头 (AA 55)，不对则找下一个包头 (末尾单独的 AA 可能是半个包头，保留)
+            if buf[r] != REMOTE_HEADER[0] or buf[r + 1] != REMOTE_HEADER[1]:
+                self._resync(r + 1, REMOTE_HEADER, keep=1)
+                continue
+
+            # 2. 检查包尾 (FE)，不对说明中间有干扰，往后找下一个包头
+            if buf[r + REMOTE_FRAME_LEN - 1] != REMOTE_TAIL:
+                self._resync(r + 1, REMOTE_HEADER, keep=1)
+                continue
+
+            self.read_pos = r + REMOTE_FRAME_LEN
+            self.frames_ok += 1
+            yield self._view[r:r + REMOTE_FRAME_LEN]
+
+        self._reset_if_empty()
+
+
+def remote_checksum(frame):
+    """ 遥控器校验和: 从包头(0)到数据最后一个字节(18)求和，取低 8 位 """
+    return sum(frame[0:REMOTE_FRAME_LEN - 2]) & 0xFF
+
+
+def remote_checksum_ok(frame):
+    return remote_checksum(frame) == frame[REMOTE_FRAME_LEN - 2]
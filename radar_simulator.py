@@ -0,0 +1,318 @@
+"""
+LD6002 模拟雷达 (Linux 伪终端)
+
+在本机创建一个虚拟串口，像真实雷达一样:
+  - 响应初始化指令 (0x14 侧装 / 0x13 顶装 / 0x08 目标 / 0x06 点云 / 0x0C / 0x0F)，回一帧同类型应答
+  - 收到 0x08 / 0x06 后按设定频率输出 0x0A04 目标帧和 0x0A08 点云帧
+  - 可按比例注入损坏帧 (翻转字节 / 截断 / 垃圾字节)，用于压测解码器的重同步
+  - 数据来源: 合成姿态 (empty / stand / sit / fall / cycle) 或 radar_capture 录制文件回放
+
+没有雷达时，把脚本里的 SERIAL_PORT (或 config.SERIAL_PORT / RADAR_PORT) 改成打印出的路径即可，
+也可以用 --link 建一个固定的软链接。
+
+运行 (仓库根目录):
+    python3 radar_simulator.py --rate 10 --posture cycle --link /tmp/ttyRADAR
+    python3 radar_simulator.py --rate 0 --points 200 --corrupt 0.05      # 不限速压测
+    python3 radar_simulator.py --replay data/raw/raw_20250128_153000.cap --speed 2
+"""
+import argparse
+import errno
+import os
+import random
+import select
+import struct
+import threading
+import time
+import tty
+
+import numpy as np
+
+import radar_protocol
+
+POSTURES = ['empty', 'stand', 'sit', 'fall']
+POSTURE_LABELS = {'empty': 0, 'stand': 1, 'sit': 2, 'fall': 3}
+
+# 合成姿态参数 (参考 project_root/data 与 hardware_collection/data 中各标签的特征均值)
+# z / z_std: 目标高度, speed_std: 多普勒索引, spread: 点云 x/y 标准差, count: 平均点数
+POSTURE_PARAMS = {
+    'empty': {'z': 0.0,   'z_std': 0.02, 'speed_std': 0.2, 'spread': (0.8, 0.8),   'count': 2},
+    'stand': {'z': 0.10,  'z_std': 0.20, 'speed_std': 1.8, 'spread': (0.17, 0.21), 'count': 17},
+    'sit':   {'z': 0.07,  'z_std': 0.20, 'speed_std': 0.9, 'spread': (0.13, 0.15), 'count': 12},
+    'fall':  {'z': -0.30, 'z_std': 0.10, 'speed_std': 0.5, 'spread': (0.40, 0.10), 'count': 15},
+}
+CYCLE_SECONDS = 10.0  # cycle 模式下每个姿态持续的时间
+
+
+class SyntheticSource:
+    """ 合成姿态数据源: 目标在房间内随机游走，点云围绕目标按姿态分布 """
+    def __init__(self, posture='cycle', points=None, seed=None):
+        self.posture = posture
+        self.points = points  # 固定点数 (压测用)，None 表示按姿态随机
+        self.rng = np.random.default_rng(seed)
+        self.center = np.array([0.0, 2.0])
+        self._t0 = time.monotonic()
+
+    def current_posture(self):
+        if self.posture != 'cycle':
+            return self.posture
+        idx = int((time.monotonic() - self._t0) // CYCLE_SECONDS) % len(POSTURES)
+        return POSTURES[idx]
+
+    def next_frames(self):
+        """ 产出一组 (frame_type, payload)：目标帧 + 点云帧 """
+        rng = self.rng
+        p = POSTURE_PARAMS[self.current_posture()]
+        self.center = np.clip(self.center + rng.normal(0, 0.02, 2), [-2.0, 0.8], [2.0, 4.5])
+
+        n = self.points if self.points is not None else int(rng.poisson(p['count']))
+        pts = np.zeros(n, dtype=radar_protocol.POINT_DTYPE)
+        pts['x'] = self.center[0] + rng.normal(0, p['spread'][0], n)
+        pts['y'] = self.center[1] + rng.normal(0, p['spread'][1], n)
+        pts['z'] = p['z'] + rng.normal(0, 0.1, n)
+        pts['speed'] = rng.normal(0, 0.3, n)
+
+        if p['count'] <= 2 and self.points is None:
+            targets = np.zeros(0, dtype=radar_protocol.TARGET_DTYPE)  # 无人: 不报目标
+        else:
+            targets = np.zeros(1, dtype=radar_protocol.TARGET_DTYPE)
+            targets['x'], targets['y'] = self.center
+            targets['z'] = p['z'] + rng.normal(0, p['z_std'])
+            targets['dop_idx'] = int(round(rng.normal(0, p['speed_std'])))
+        return [
+            (radar_protocol.FRAME_TARGET, radar_protocol.encode_array(targets, radar_protocol.TARGET_DTYPE)),
+            (radar_protocol.FRAME_POINT_CLOUD, radar_protocol.encode_array(pts, radar_protocol.POINT_DTYPE)),
+        ]
+
+
+class SimulatedRadar:
+    """
+    模拟雷达设备
+
+    用法 (程序内):
+        sim = SimulatedRadar(rate=50, points=100)
+        sim.start()
+        ser = serial.Serial(sim.port, 115200)
+        ...
+        sim.stop()
+
+    rate: 每秒输出的 (目标 + 点云) 帧组数，0 表示不限速 (受读端消费速度限制)
+    replay: radar_capture 录制文件，按录制时的时间间隔 / speed 回放 (loop=True 时循环)
+    require_init: True 时需收到 0x08 / 0x06 指令才输出对应帧 (与真实雷达一致)
+    """
+    def __init__(self, rate=10.0, points=None, corrupt=0.0, posture='cycle',
+                 replay=None, speed=1.0, loop=True, require_init=True, seed=None):
+        self.rate = rate
+        self.corrupt = corrupt
+        self.replay = replay
+        self.speed = speed
+        self.loop = loop
+        self.source = SyntheticSource(posture, points, seed)
+        self.rng = random.Random(seed)
+
+        self.target_on = not require_init
+        self.cloud_on = not require_init
+        self.mount = None
+
+        self.master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # 关闭回显和换行转换，二进制数据原样传输
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self._slave)
+
+        self._decoder = radar_protocol.FrameDecoder(capacity=4096)
+        self._stop = threading.Event()
+        self._thread = None
+
+        # 统计计数
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_corrupted = 0
+        self.commands = 0
+        self._t_start = None
+
+    # --- 指令处理 ---
+    def _handle_input(self):
+        try:
+            data = os.read(self.master, 4096)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                return
+            raise
+        self._decoder.feed(data)
+        for frame_type, payload in self._decoder.frames():
+            if frame_type != radar_protocol.CMD_TYPE or len(payload) < 4:
+                continue
+            cmd = struct.unpack_from('<I', payload)[0]
+            self.commands += 1
+            if cmd == radar_protocol.CMD_TARGET_ON:
+                self.target_on = True
+            elif cmd == radar_protocol.CMD_POINT_CLOUD_ON:
+                self.cloud_on = True
+            elif cmd in (radar_protocol.CMD_SIDE_MOUNT, radar_protocol.CMD_TOP_MOUNT):
+                self.mount = cmd
+            # 应答: 原样回一帧同类型、同数据的确认帧
+            self._write(radar_protocol.build_frame(radar_protocol.CMD_TYPE, bytes(payload)))
+
+    def _write(self, data):
+        """ 写入虚拟串口；读端来不及消费时等待 (反压)，期间继续处理指令 """
+        view = memoryview(data)
+        while view and not self._stop.is_set():
+            readable, writable, _ = select.select([self.master], [self.master], [], 0.2)
+            if readable:
+                self._handle_input()
+            if writable:
+                try:
+                    n = os.write(self.master, view)
+                except BlockingIOError:
+                    continue
+                view = view[n:]
+                self.bytes_sent += n
+
+    # --- 帧输出 ---
+    def _corrupt(self, frame):
+        """ 按比例损坏一帧: 翻转一个字节 / 截断 / 前面插入垃圾字节 """
+        if self.corrupt <= 0 or self.rng.random() >= self.corrupt:
+            return frame
+        self.frames_corrupted += 1
+        kind = self.rng.randrange(3)
+        if kind == 0:
+            buf = bytearray(frame)
+            buf[self.rng.randrange(len(buf))] ^= 0xFF
+            return bytes(buf)
+        if kind == 1:
+            return frame[:self.rng.randrange(1, len(frame))]
+        return bytes(self.rng.randrange(256) for _ in range(self.rng.randrange(1, 64))) + frame
+
+    def _emit(self, frames):
+        for frame_type, payload in frames:
+            if frame_type == radar_protocol.FRAME_TARGET and not self.target_on:
+                continue
+            if frame_type == radar_protocol.FRAME_POINT_CLOUD and not self.cloud_on:
+                continue
+            self._write(self._corrupt(radar_protocol.build_frame(frame_type, payload)))
+            self.frames_sent += 1
+
+    def _wait_until(self, deadline):
+        """ 等到 deadline，期间处理上位机发来的指令 """
+        while not self._stop.is_set():
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                return
+            readable, _, _ = select.select([self.master], [], [], timeout)
+            if readable:
+                self._handle_input()
+
+    def _replay_frames(self):
+        """ 回放录制文件: 产出 (相对时间, [(frame_type, payload)]) """
+        import radar_capture
+        while True:
+            with radar_capture.CaptureReader(self.replay) as reader:
+                t0 = None
+                for rec in reader:
+                    if t0 is None:
+                        t0 = rec.timestamp
+                    yield rec.timestamp - t0, [(rec.frame_type, bytes(rec.payload))]
+            if not self.loop:
+                return
+
+    def run(self):
+        """ 阻塞运行，直到 stop() """
+        self._t_start = time.monotonic()
+        if self.replay:
+            base = time.monotonic()
+            offset = 0.0  # 循环回放时累加上一轮的时长
+            last = 0.0
+            for rel, frames in self._replay_frames():
+                if self._stop.is_set():
+                    break
+                if rel < last:
+                    offset += last
+                last = rel
+                if self.speed > 0:
+                    self._wait_until(base + (offset + rel) / self.speed)
+                self._emit(frames)
+        else:
+            period = 1.0 / self.rate if self.rate > 0 else 0.0
+            deadline = time.monotonic()
+            while not self._stop.is_set():
+                if period:
+                    self._wait_until(deadline)
+                    # 落后太多时不追赶，避免突发
+                    deadline = max(deadline + period, time.monotonic() - period)
+                else:
+                    readable, _, _ = select.select([self.master], [], [], 0)
+                    if readable:
+                        self._handle_input()
+                self._emit(self.source.next_frames())
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def close(self):
+        self.stop()
+        os.close(self.master)
+        os.close(self._slave)
+
+    def stats(self):
+        elapsed = time.monotonic() - self._t_start if self._t_start else 0.0
+        return {
+            'frames_sent': self.frames_sent,
+            'bytes_sent': self.bytes_sent,
+            'frames_corrupted': self.frames_corrupted,
+            'commands': self.commands,
+            'elapsed': elapsed,
+            'frames_per_sec': self.frames_sent / elapsed if elapsed else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LD6002 模拟雷达 (伪终端)")
+    parser.add_argument('--rate', type=float, default=10.0, help="每秒帧组数 (目标+点云)，0 为不限速")
+    parser.add_argument('--points', type=int, default=None, help="每帧固定点数 (默认按姿态随机)")
+    parser.add_argument('--corrupt', type=float, default=0.0, help="损坏帧比例 0~1")
+    parser.add_argument('--posture', choices=POSTURES + ['cycle'], default='cycle', help="合成姿态")
+    parser.add_argument('--replay', default=None, help="回放 radar_capture 录制文件 (.cap)")
+    parser.add_argument('--speed', type=float, default=1.0, help="回放倍速，0 为不限速")
+    parser.add_argument('--once', action='store_true', help="回放一遍后停止")
+    parser.add_argument('--no-init', action='store_true', help="不等初始化指令，直接输出数据")
+    parser.add_argument('--link', default=None, help="为虚拟串口创建软链接，例如 /tmp/ttyRADAR")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    sim = SimulatedRadar(rate=args.rate, points=args.points, corrupt=args.corrupt, posture=args.posture,
+                         replay=args.replay, speed=args.speed, loop=not args.once,
+                         require_init=not args.no_init, seed=args.seed)
+    port = sim.port
+    if args.link:
+        if os.path.islink(args.link):
+            os.remove(args.link)
+        os.symlink(sim.port, args.link)
+        port = f"{args.link} -> {sim.port}"
+
+    print(f"📡 模拟雷达已就绪: {port}")
+    print("   把脚本中的 SERIAL_PORT 改成上面的路径即可 (Ctrl+C 停止)")
+    sim.start()
+    try:
+        while sim._thread.is_alive():
+            time.sleep(1)
+            st = sim.stats()
+            state = f"目标{'开' if sim.target_on else '关'} / 点云{'开' if sim.cloud_on else '关'}"
+            print(f"\r[{state}] 已发送 {st['frames_sent']} 帧 ({st['frames_per_sec']:.0f} 帧/秒), "
+                  f"损坏 {st['frames_corrupted']}, 指令 {st['commands']}", end="", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.close()
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+        print("\n👋 模拟雷达已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+解析线程 -> 推理 / 采集线程 的帧通道
+
+解析线程每收齐一组 目标(0x0A04) + 点云(0x0A08) 帧就 publish 一次，
+消费者用 wait_next() 阻塞等待下一帧，每个新帧恰好处理一次，
+不再用 time.sleep(0.1) 轮询 (既可能重复处理旧帧，也可能漏帧，还白白多等最多 100ms)。
+
+快照是不可变的 (points 只读、target 不再修改)，发布就是一次引用赋值 (GIL 下原子)，
+消费者直接读 channel.latest 即可拿到一致的 目标 + 点云，不需要加锁，
+也就不会像 data_lock 那样在特征计算期间卡住解析线程。
+
+用法:
+    channel = FrameChannel()
+    # 解析线程
+    channel.publish(target, points)
+    # 推理线程: 阻塞等待新帧
+    snap = channel.wait_next(last_seq, timeout=0.5)
+    if snap is not None:
+        last_seq = snap.seq
+        feats = extract_features(snap.target, snap.points)
+    # 采集线程: 每个新帧记录一行 (可选限速)
+    sampler = FrameSampler(channel, max_hz=0)
+    snap = sampler.next(timeout=1.0)
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# 一组 目标 + 点云 帧: seq 从 1 开始递增，timestamp 为 publish 时的 time.monotonic()
+FrameSnapshot = namedtuple('FrameSnapshot', ['seq', 'timestamp', 'target', 'points'])
+
+EMPTY_SNAPSHOT = FrameSnapshot(0, 0.0, {'z': 0.0, 'speed': 0.0}, np.empty((0, 3)))
+
+
+class FrameChannel:
+    """
+    最新帧通道：只保留最新一帧，消费者跟不上时跳过中间的帧 (由 seq 的差值得知)
+    单生产者 (解析线程)，多消费者；读 latest 无锁，条件变量只用于唤醒等待者
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.latest = EMPTY_SNAPSHOT
+        self.closed = False
+
+    def publish(self, target, points):
+        """ 发布一组新帧并唤醒等待者 (target / points 发布后不应再修改) """
+        points.setflags(write=False)
+        # 先整体构造好新快照，再一次性替换引用：读者看到的要么是旧帧，要么是完整的新帧
+        self.latest = FrameSnapshot(self.latest.seq + 1, time.monotonic(), target, points)
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_next(self, last_seq, timeout=None):
+        """
+        等待 seq > last_seq 的帧，返回最新的 FrameSnapshot
+        超时或通道已关闭时返回 None
+        """
+        snap = self.latest
+        if snap.seq > last_seq:
+            return snap  # 已有新帧，不用碰锁
+        with self._cond:
+            self._cond.wait_for(lambda: self.latest.seq > last_seq or self.closed, timeout)
+        snap = self.latest
+        return snap if snap.seq > last_seq else None
+
+    def close(self):
+        """ 唤醒所有等待者并让 wait_next 立即返回 (程序退出时调用) """
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class RateLimiter:
+    """ 频率上限: max_hz <= 0 表示不限速 """
+    def __init__(self, max_hz=0):
+        self.interval = 1.0 / max_hz if max_hz and max_hz > 0 else 0.0
+        self._last = 0.0
+
+    def wait(self):
+        """ 距上一次放行不足一个周期时睡到周期结束 """
+        if self.interval:
+            delay = self._last + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._last = time.monotonic()
+
+
+class FrameSampler:
+    """
+    帧同步采样 (采集脚本用)：每个新帧恰好返回一次，可选频率上限
+    代替 time.sleep(COLLECT_DELAY) 定时读取 channel.latest —— 定时器与雷达出帧无关，
+    比出帧快时同一帧被重复写成多行 (数据膨胀、SVM 训练变慢)，比出帧慢时又漏帧
+    """
+    def __init__(self, channel, max_hz=0):
+        self.channel = channel
+        self.limiter = RateLimiter(max_hz)
+        self.reset()
+
+    def reset(self):
+        """ 开始新的一段录制：清零统计，只记录此后到达的新帧 """
+        self.last_seq = self.channel.latest.seq
+        self.first_seq = None
+        self.frames = 0
+        self.skipped = 0  # 因限速 / 处理不过来跳过的帧 (seq 不连续)
+        self.started = time.monotonic()
+
+    def next(self, timeout=None):
+        """ 返回下一个新帧 (seq 比上次大)，超时或通道关闭时返回 None """
+        self.limiter.wait()
+        snap = self.channel.wait_next(self.last_seq, timeout)
+        if snap is None:
+            return None
+        if self.first_seq is None:
+            self.first_seq = snap.seq
+        else:
+            self.skipped += snap.seq - self.last_seq - 1
+        self.last_seq = snap.seq
+        self.frames += 1
+        return snap
+
+    def duplicates_avoided(self, interval):
+        """ 估算：按旧的定时采样 (每 interval 秒读一次最新帧) 同样时长会写入的重复行数 """
+        if not interval or self.first_seq is None:
+            return 0
+        ticks = int((time.monotonic() - self.started) / interval)
+        return max(0, ticks - (self.last_seq - self.first_seq + 1))
+
+    def summary(self, interval=0):
+        """ 一行统计，采集脚本在每段录制结束时打印 """
+        text = f"帧同步采样: {self.frames} 帧 (seq {self.first_seq}-{self.last_seq})，跳过 {self.skipped} 帧"
+        if interval:
+            text += f"，避免重复行 {self.duplicates_avoided(interval)} (按 {interval}s 定时采样估算)"
+        return text
@@ -0,0 +1,353 @@
+"""
+采集 CSV 的后台批量写入
+
+采集循环原来每帧 writer.writerow() + f.flush()，每 50ms 一次系统调用，
+SD 卡上偶尔一次写入就卡几十毫秒，直接拖慢采样节奏。
+这里采集循环只把一行放进有界队列 (不碰文件)，后台线程攒够 batch_rows 行、
+或最早一行已等待 flush_interval 秒时，一次写入并 flush：
+  - 进程崩溃最多丢失最近 batch_rows 行 / flush_interval 秒的数据 (fsync=True 时断电同样)
+  - 队列满时 write() 阻塞等待 (不丢数据)，并计入 stats()['blocked']
+  - 写线程出错时，下一次 write() / flush() 在采集线程抛出同一个异常
+
+分段轮转与压缩 (rotate=True): 单个 CSV 会无限增长，边缘设备上占空间、拷出也慢。
+每次运行 (会话) 写到 CSV_PATH 同目录下的新分段 <名称>.<会话时间>.<序号>.csv，
+超过 max_bytes 时切换到下一个分段；关闭的分段由 SegmentCompressor 在后台线程压缩为
+.csv.gz / .csv.xz (先写临时文件再替换，完成后删除原文件)。上次运行崩溃遗留的未压缩分段在启动时补压缩。
+segment_paths(CSV_PATH) 按时间顺序列出原文件和全部分段 (含压缩分段)，训练 / 合并 / 缓存都用它读取。
+同一个 CSV_PATH 同时只应有一个采集进程在写。
+
+用法:
+    with BatchedCsvWriter(CSV_PATH, FEATURE_NAMES + ['label']) as writer:
+        writer.write(feats + [label])
+        writer.flush()          # 一段录制结束: 等待已提交的行全部落盘
+        print(writer.stats())   # 队列深度 / 批次写入耗时
+    BatchedCsvWriter(CSV_PATH, header, rotate=True, max_bytes=20 << 20, compress='gzip')
+"""
+import csv
+import gzip
+import io
+import lzma
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+_STOP = object()
+
+COMPRESSORS = {'gzip': '.gz', 'lzma': '.xz'}  # 压缩方式 -> 文件后缀
+COMPRESS_CHUNK = 1 << 20
+
+
+def segment_path(base_path, session, index):
+    """ data/a.csv -> data/a.20250128_153000.000.csv """
+    stem, ext = os.path.splitext(base_path)
+    return f"{stem}.{session}.{index:03d}{ext}"
+
+
+def segment_paths(base_path):
+    """
+    base_path (轮转前写入的原文件，若存在) + 它的全部分段，按时间顺序
+    同一分段压缩过程中会短暂同时存在 .csv 和 .csv.gz，此时只取未压缩的那个
+    """
+    stem, ext = os.path.splitext(base_path)
+    directory = os.path.dirname(base_path) or '.'
+    pattern = re.compile(re.escape(os.path.basename(stem)) + r'\.(\d{8}_\d{6})\.(\d{3,})'
+                         + re.escape(ext) + r'(\.gz|\.xz)?$')
+    found = {}
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            m = pattern.match(name)
+            if m is None:
+                continue
+            key = (m.group(1), int(m.group(2)))
+            if key not in found or m.group(3) is None:
+                found[key] = os.path.join(directory, name)
+    paths = [base_path] if os.path.exists(base_path) else []
+    return paths + [found[k] for k in sorted(found)]
+
+
+def is_compressed(path):
+    return path.endswith(tuple(COMPRESSORS.values()))
+
+
+def strip_compression(path):
+    """ a.000.csv.gz -> a.000.csv (压缩前后是同一个分段) """
+    for suffix in COMPRESSORS.values():
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def resolve_segment(path):
+    """ path 已被后台压缩 (原文件删除) 时返回压缩后的文件；都不存在时返回 None """
+    for candidate in (path,) + tuple(path + s for s in COMPRESSORS.values()):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def open_binary(path):
+    """ 以二进制流打开 CSV，.gz / .xz 透明解压 """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def compress_file(path, method='gzip'):
+    """ 压缩 path 为 path.gz / path.xz 并删除原文件，返回压缩后的路径 """
+    dst = path + COMPRESSORS[method]
+    tmp = dst + '.tmp'
+    if method == 'gzip':
+        out = gzip.open(tmp, 'wb', compresslevel=6)
+    else:
+        out = lzma.open(tmp, 'wb', preset=6)
+    with open(path, 'rb') as src, out:
+        shutil.copyfileobj(src, out, COMPRESS_CHUNK)
+    os.replace(tmp, dst)  # 压缩完整后才出现 .gz，中途中断只留下 .tmp
+    os.remove(path)
+    return dst
+
+
+class SegmentCompressor:
+    """ 后台线程依次压缩已关闭的分段；压缩失败时保留原文件 (仍可直接读取) """
+    def __init__(self, method='gzip'):
+        if method not in COMPRESSORS:
+            raise ValueError(f"不支持的压缩方式: {method} (可选 {list(COMPRESSORS)})")
+        self.method = method
+        self.files = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='segment-compressor', daemon=True)
+        self._thread.start()
+
+    def submit(self, path):
+        self._queue.put(path)
+
+    def close(self):
+        """ 等待已提交的分段全部压缩完成 """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def summary(self):
+        ratio = self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+        text = (f"压缩 {self.files} 个分段: {self.bytes_in / 1e6:.1f} MB -> {self.bytes_out / 1e6:.1f} MB "
+                f"({ratio:.1f} 倍，{self.seconds:.1f} 秒)")
+        return text + (f"，失败 {self.failed} 个" if self.failed else "")
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is _STOP:
+                break
+            t0 = time.perf_counter()
+            try:
+                size = os.path.getsize(path)
+                dst = compress_file(path, self.method)
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️ 压缩 {path} 失败: {e}")
+                continue
+            self.seconds += time.perf_counter() - t0
+            self.files += 1
+            self.bytes_in += size
+            self.bytes_out += os.path.getsize(dst)
+
+
+class BatchedCsvWriter:
+    """
+    追加写 CSV (文件不存在或为空时先写表头)，写入在后台线程批量完成
+    rotate=True 时写到 path 的分段 (每个分段都有表头)，超过 max_bytes (0 为不限) 切换分段，
+    compress 为 'gzip' / 'lzma' 时关闭的分段在后台压缩
+    """
+    def __init__(self, path, header=None, batch_rows=256, flush_interval=1.0,
+                 max_queue=10000, fsync=False, rotate=False, max_bytes=0, compress=None):
+        self.base_path = path
+        self.header = header
+        self.rotate = rotate
+        self.max_bytes = max_bytes
+        self.compressor = SegmentCompressor(compress) if compress and rotate else None
+        self.session = time.strftime('%Y%m%d_%H%M%S')
+        self.segments = []       # 本次运行写过的分段
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.error = None
+        self.rows_written = 0
+        self.batches = 0
+        self.blocked = 0         # 队列满、write() 需要等待的次数
+        self.max_depth = 0       # 观察到的最大队列深度
+        self.write_total = 0.0   # 批次写入 + flush 的累计 / 最大耗时 (秒)
+        self.write_max = 0.0
+        self._queue = queue.Queue(max_queue)
+        if self.rotate:
+            if self.compressor:
+                # 上次运行没来得及压缩的分段 (崩溃 / 断电)
+                for leftover in segment_paths(path):
+                    if leftover != path and not is_compressed(leftover):
+                        self.compressor.submit(leftover)
+            self._index = -1
+            self._open_next_segment()
+        else:
+            self._open(path)
+        self._thread = threading.Thread(target=self._run, name='csv-writer', daemon=True)
+        self._thread.start()
+
+    def _open(self, path):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.path = path
+        self._segment_rows = 0
+        self._f = open(path, 'a', newline='')
+        if self.header is not None and new_file:
+            csv.writer(self._f).writerow(self.header)
+            self._f.flush()
+
+    def _open_next_segment(self):
+        while True:
+            self._index += 1
+            path = segment_path(self.base_path, self.session, self._index)
+            if not any(os.path.exists(path + s) for s in ('',) + tuple(COMPRESSORS.values())):
+                break
+        self._open(path)
+        self.segments.append(path)
+
+    def _close_segment(self):
+        """ 关闭当前分段：没有数据行的分段直接删除，否则交给后台压缩 """
+        self._f.close()
+        if not self.rotate:
+            return
+        if self._segment_rows == 0:
+            os.remove(self.path)
+            self.segments.remove(self.path)
+        elif self.compressor:
+            self.compressor.submit(self.path)
+
+    def write(self, row):
+        """ 提交一行 (list / tuple)，只入队，不做文件 IO """
+        if self.error is not None:
+            raise self.error
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.blocked += 1
+            while True:
+                try:
+                    self._queue.put(row, timeout=0.5)
+                    break
+                except queue.Full:
+                    if self.error is not None:
+                        raise self.error
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def flush(self, timeout=None):
+        """ 等待此前提交的行全部写入文件 """
+        if self.error is not None:
+            raise self.error
+        if not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """ 写完队列中剩余的行并关闭文件 """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if not self._f.closed:
+            self._close_segment()
+        if self.compressor:
+            self.compressor.close()
+        if self.error is not None:
+            raise self.error
+
+    def stats(self):
+        return {
+            'rows': self.rows_written,
+            'batches': self.batches,
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'blocked': self.blocked,
+            'write_ms_avg': self.write_total / self.batches * 1000 if self.batches else 0.0,
+            'write_ms_max': self.write_max * 1000,
+        }
+
+    def summary(self):
+        """ 一行统计，采集脚本在每段录制结束时打印 """
+        st = self.stats()
+        text = (f"写入 {st['rows']} 行 / {st['batches']} 批 | 队列 {st['queue_depth']} (最大 {st['max_queue_depth']}, "
+                f"阻塞 {st['blocked']}) | 批次写入 {st['write_ms_avg']:.2f} ms (最大 {st['write_ms_max']:.2f} ms)")
+        if self.rotate:
+            text += f" | 分段 {len(self.segments)} 个，当前 {os.path.basename(self.path)}"
+        return text
+
+    def _write_batch(self, rows):
+        if not rows:
+            return
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        t0 = time.perf_counter()
+        self._f.write(buf.getvalue())
+        self._f.flush()
+        if self.fsync:
+            os.fsync(self._f.fileno())
+        dt = time.perf_counter() - t0
+        self.write_total += dt
+        self.write_max = max(self.write_max, dt)
+        self.rows_written += len(rows)
+        self._segment_rows += len(rows)
+        self.batches += 1
+        if self.rotate and self.max_bytes and self._f.tell() >= self.max_bytes:
+            self._close_segment()
+            self._open_next_segment()
+
+    def _run(self):
+        batch = []
+        deadline = None  # 当前批次最早一行的最晚落盘时间
+        while True:
+            timeout = None if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # 超时: 把攒着的行写出去
+            is_row = item is not None and item is not _STOP and not isinstance(item, threading.Event)
+            if is_row:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_rows and time.monotonic() < deadline:
+                    continue
+            try:
+                self._write_batch(batch)
+            except Exception as e:  # 磁盘满 / 拔卡等，交给采集线程处理
+                self.error = e
+            batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            if item is _STOP or self.error is not None:
+                break
+        # 出错退出时唤醒还在等待的 flush()
+        while self.error is not None:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
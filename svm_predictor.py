@@ -0,0 +1,302 @@
+"""
+推理热路径: 不经过 pandas 的 标准化 + SVM 预测
+
+推理脚本原来每帧都构造 pd.DataFrame([feats], columns=FEATURE_NAMES) 只为了喂给
+scaler.transform，单是这一步就要几百微秒，运行时还得带上 pandas。
+这里把训练好的 StandardScaler 的 mean_ / scale_ 取出来，直接在预分配的 (1, n) 缓冲上
+做 (x - mean) / scale，再交给 SVM 预测：
+运算顺序与 StandardScaler.transform 完全一致，标准化结果逐位相同，标签也就与原路径一致。
+
+单样本 SVC.predict 的大部分时间花在 sklearn 的参数检查和一对一 (OvO) 投票的调度上，
+真正的核函数计算反而不多。RbfSvm 把训练好的 RBF 核 SVC 展开成纯 NumPy 的参数：
+  - 支持向量矩阵 + 预先算好的平方范数:  ||x - sv||^2 = ||x||^2 + ||sv||^2 - 2 sv·x
+  - 每个类别对 (i, j) 一行的系数矩阵 (对偶系数按 libsvm 的规则摆好，其余为 0) + 截距
+一帧的决策值就是 1 次矩阵-向量乘 (核) + 1 次矩阵-向量乘 (系数)，再按 libsvm 的规则投票
+(决策值 > 0 投给 i，否则投给 j，票数相同取类别序号小的)。批量模式一次算多帧 / 多个雷达。
+核距离用展开式计算，决策值与 libsvm 相差在 1e-12 量级，标签与 sklearn 一致
+(benchmarks/bench_svm.py 会逐帧核对)。
+
+用法:
+    predictor = ScaledPredictor(clf, scaler)
+    label = predictor.predict(feats)      # feats: 长度 n 的 float 数组 (会被复制进内部缓冲)
+
+    svm = RbfSvm.from_sklearn(clf)        # 或 RbfSvm.load('weights/radar_svm_model.npz')
+    labels = svm.predict(X_scaled)        # (B, n) 批量
+
+核近似模型 (2_train_svm.py 里 KERNEL_APPROX 训练的 RBFSampler / Nystroem + 线性分类器)
+由 ApproxRbf 求值: 特征映射 + 线性打分都是固定大小的矩阵运算，耗时与支持向量数 / 训练数据量无关。
+
+导出 (部署到边缘设备时可只带 .npz，不依赖 sklearn / pickle 版本):
+    python3 svm_predictor.py weights/radar_svm_model.pkl [weights/radar_svm_model.npz]
+"""
+import sys
+
+import numpy as np
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC, NuSVC, LinearSVC
+
+# 打分为 X @ coef_.T + intercept_ 的线性分类器 (核近似模型的第二步)
+LINEAR_CLASSIFIERS = (LinearSVC, LogisticRegression, RidgeClassifier, SGDClassifier)
+BATCH_CHUNK = 16  # 批量模式每次计算的行数: 核矩阵块 (16 x 支持向量数) 留在缓存里时最快
+
+
+class RbfSvm:
+    """ RBF 核 SVC 的纯 NumPy 求值器 (一对一多分类，与 libsvm 的投票规则一致) """
+    def __init__(self, support_vectors, coef, intercept, gamma, classes, pairs):
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self.sv_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.gamma = float(gamma)
+        self.classes = np.asarray(classes)
+        self.pairs = np.asarray(pairs, dtype=np.intp)
+        # 单样本预测的预分配缓冲
+        self._k = np.empty(len(self.support_vectors))
+        self._dec = np.empty(len(self.intercept))
+
+    @staticmethod
+    def supports(clf):
+        """ 能否展开: 拟合好的 RBF 核 SVC / NuSVC，且不依赖 break_ties """
+        return (isinstance(clf, (SVC, NuSVC)) and clf.kernel == 'rbf'
+                and hasattr(clf, '_dual_coef_') and not clf.break_ties)
+
+    @classmethod
+    def from_sklearn(cls, clf):
+        if not cls.supports(clf):
+            raise ValueError(f"不支持的模型: {clf!r} (需要 kernel='rbf' 且 break_ties=False)")
+        # _dual_coef_ / _intercept_ 为 libsvm 原始符号 (二分类时 sklearn 公开的属性取了反)
+        dual = np.asarray(clf._dual_coef_)
+        intercept = np.asarray(clf._intercept_)
+        n_class = len(clf.classes_)
+        start = np.concatenate([[0], np.cumsum(clf.n_support_)])
+        pairs = [(i, j) for i in range(n_class) for j in range(i + 1, n_class)]
+        coef = np.zeros((len(pairs), dual.shape[1]))
+        for p, (i, j) in enumerate(pairs):
+            # libsvm: 类别 i 的支持向量用第 j-1 行系数，类别 j 的支持向量用第 i 行系数
+            coef[p, start[i]:start[i + 1]] = dual[j - 1, start[i]:start[i + 1]]
+            coef[p, start[j]:start[j + 1]] = dual[i, start[j]:start[j + 1]]
+        return cls(clf.support_vectors_, coef, intercept, clf._gamma, clf.classes_, pairs)
+
+    # --- 保存 / 加载 ---
+    def save(self, path):
+        np.savez(path, support_vectors=self.support_vectors, coef=self.coef, intercept=self.intercept,
+                 gamma=self.gamma, classes=self.classes, pairs=self.pairs)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z['support_vectors'], z['coef'], z['intercept'], z['gamma'], z['classes'], z['pairs'])
+
+    @property
+    def n_features_in_(self):
+        return self.support_vectors.shape[1]
+
+    # --- 求值 ---
+    def _vote(self, dec):
+        winners = np.where(dec > 0, self.pairs[:, 0], self.pairs[:, 1])
+        votes = np.bincount(winners, minlength=len(self.classes))
+        return votes.argmax()  # 票数相同取序号小的 (与 libsvm 一致)
+
+    def decision_one(self, x):
+        """ 单样本各类别对的决策值 (返回内部缓冲，下一次调用会覆盖) """
+        k = self._k
+        np.dot(self.support_vectors, x, out=k)
+        k *= -2.0
+        k += self.sv_norms
+        k += np.dot(x, x)
+        np.maximum(k, 0.0, out=k)
+        k *= -self.gamma
+        np.exp(k, out=k)
+        np.dot(self.coef, k, out=self._dec)
+        self._dec += self.intercept
+        return self._dec
+
+    def predict_one(self, x):
+        return self.classes[self._vote(self.decision_one(x))]
+
+    def decision(self, X):
+        """ 批量决策值 (B, 类别对数)，按 BATCH_CHUNK 行分块计算核矩阵 """
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty((len(X), len(self.intercept)))
+        for s in range(0, len(X), BATCH_CHUNK):
+            xb = X[s:s + BATCH_CHUNK]
+            k = xb @ self.support_vectors.T
+            k *= -2.0
+            k += self.sv_norms
+            k += np.einsum('ij,ij->i', xb, xb)[:, None]
+            np.maximum(k, 0.0, out=k)
+            k *= -self.gamma
+            np.exp(k, out=k)
+            np.dot(k, self.coef.T, out=out[s:s + BATCH_CHUNK])
+        out += self.intercept
+        return out
+
+    def predict(self, X):
+        """ 批量预测: X 为 (B, n) 已标准化的特征 """
+        dec = self.decision(X)
+        winners = np.where(dec > 0, self.pairs[:, 0], self.pairs[:, 1])
+        votes = np.zeros((len(X), len(self.classes)), dtype=np.intp)
+        rows = np.arange(len(X))
+        for p in range(len(self.pairs)):
+            votes[rows, winners[:, p]] += 1
+        return self.classes[votes.argmax(axis=1)]
+
+
+class ApproxRbf:
+    """
+    核近似模型 Pipeline([(特征映射, RBFSampler 或 rbf 核 Nystroem), (线性分类器, ...)]) 的 NumPy 求值器
+    运算与 sklearn 的 transform / decision_function 相同，只是省掉每次调用的参数检查
+    (Nystroem 的归一化矩阵已合并进线性系数，决策值与 sklearn 只差舍入误差)
+    """
+    def __init__(self, clf):
+        fmap, lin = clf.steps[0][1], clf.steps[-1][1]
+        if isinstance(fmap, RBFSampler):
+            self.weights = fmap.random_weights_               # (n, m)
+            self.offset = fmap.random_offset_
+            self.factor = (2.0 / fmap.n_components) ** 0.5
+            self.components = None
+        else:
+            self.components = fmap.components_               # (m, n)
+            self.comp_norms = np.einsum('ij,ij->i', self.components, self.components)
+            self.gamma = fmap.gamma if fmap.gamma is not None else 1.0 / self.components.shape[1]
+        self.coef = lin.coef_
+        if self.components is not None:
+            # Nystroem 的 (m, m) 归一化矩阵预先乘进线性系数: 每帧少一次 m x m 的矩阵-向量乘
+            self.coef = np.ascontiguousarray(self.coef @ fmap.normalization_)
+        self.intercept = lin.intercept_
+        self.classes = lin.classes_
+        m = len(self.offset) if self.components is None else len(self.components)
+        self._z = np.empty(m)
+        self._k = np.empty(m)
+        self._dec = np.empty(len(self.coef))
+
+    @staticmethod
+    def supports(clf):
+        if not isinstance(clf, Pipeline) or len(clf.steps) != 2:
+            return False
+        fmap, lin = clf.steps[0][1], clf.steps[1][1]
+        return ((isinstance(fmap, RBFSampler) or (isinstance(fmap, Nystroem) and fmap.kernel == 'rbf'
+                                                   and not fmap.kernel_params))
+                and isinstance(lin, LINEAR_CLASSIFIERS) and hasattr(lin, 'coef_'))
+
+    def _map_one(self, x):
+        """ 特征映射 (Nystroem 时为核向量，归一化已合并进 coef) """
+        z = self._z
+        if self.components is None:
+            np.dot(x, self.weights, out=z)
+            z += self.offset
+            np.cos(z, out=z)
+            z *= self.factor
+            return z
+        k = self._k
+        np.dot(self.components, x, out=k)
+        k *= -2.0
+        k += self.comp_norms
+        k += np.dot(x, x)
+        np.maximum(k, 0.0, out=k)
+        k *= -self.gamma
+        np.exp(k, out=k)
+        return k
+
+    def _map(self, X):
+        if self.components is None:
+            Z = X @ self.weights
+            Z += self.offset
+            np.cos(Z, out=Z)
+            Z *= self.factor
+            return Z
+        K = X @ self.components.T
+        K *= -2.0
+        K += self.comp_norms
+        K += np.einsum('ij,ij->i', X, X)[:, None]
+        np.maximum(K, 0.0, out=K)
+        K *= -self.gamma
+        np.exp(K, out=K)
+        return K
+
+    def _label(self, dec):
+        # 与 LinearClassifierMixin.predict 相同: 二分类看符号，多分类取最大
+        if len(dec) == 1:
+            return self.classes[int(dec[0] > 0)]
+        return self.classes[dec.argmax()]
+
+    def predict_one(self, x):
+        np.dot(self.coef, self._map_one(x), out=self._dec)
+        self._dec += self.intercept
+        return self._label(self._dec)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty(len(X), dtype=self.classes.dtype)
+        for s in range(0, len(X), BATCH_CHUNK):
+            dec = self._map(X[s:s + BATCH_CHUNK]) @ self.coef.T + self.intercept
+            if dec.shape[1] == 1:
+                out[s:s + BATCH_CHUNK] = self.classes[(dec[:, 0] > 0).astype(int)]
+            else:
+                out[s:s + BATCH_CHUNK] = self.classes[dec.argmax(axis=1)]
+        return out
+
+
+def compile_model(clf):
+    """ 把 sklearn 模型展开成 NumPy 求值器 (RbfSvm / ApproxRbf)，不支持时返回 None """
+    if isinstance(clf, (RbfSvm, ApproxRbf)):
+        return clf
+    if RbfSvm.supports(clf):
+        return RbfSvm.from_sklearn(clf)
+    if ApproxRbf.supports(clf):
+        return ApproxRbf(clf)
+    return None
+
+
+class ScaledPredictor:
+    """
+    标准化 + 预测；非 StandardScaler 的标准化器退回 scaler.transform (仍不经过 pandas)
+    RBF 核 SVC / 核近似模型默认展开成 NumPy 求值器 (fast_svm=False 或模型不支持时调用 clf.predict)
+    """
+    def __init__(self, clf, scaler, fast_svm=True):
+        self.clf = clf
+        self.scaler = scaler
+        n = scaler.n_features_in_
+        self.buf = np.zeros((1, n))
+        self.row = self.buf[0]
+        if isinstance(scaler, StandardScaler):
+            self.mean = scaler.mean_ if scaler.with_mean else None
+            self.scale = scaler.scale_ if scaler.with_std else None
+            self._fast = True
+        else:
+            self._fast = False
+        self.svm = compile_model(clf) if fast_svm or isinstance(clf, RbfSvm) else None
+
+    def transform(self, feats):
+        """ 标准化到内部缓冲并返回 (1, n) 数组 (下一次调用会覆盖) """
+        row = self.row
+        row[:] = feats
+        if not self._fast:
+            return self.scaler.transform(self.buf)
+        if self.mean is not None:
+            np.subtract(row, self.mean, out=row)
+        if self.scale is not None:
+            np.divide(row, self.scale, out=row)
+        return self.buf
+
+    def predict(self, feats):
+        """ 单帧预测，返回标签 """
+        scaled = self.transform(feats)
+        if self.svm is not None:
+            return self.svm.predict_one(scaled[0])
+        return self.clf.predict(scaled)[0]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python3 svm_predictor.py model.pkl [out.npz]")
+        sys.exit(1)
+    import joblib
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else src.rsplit('.', 1)[0] + '.npz'
+    svm = RbfSvm.from_sklearn(joblib.load(src))
+    svm.save(dst)
+    print(f"✅ 已导出 {dst}: {len(svm.support_vectors)} 个支持向量, {len(svm.classes)} 类, gamma={svm.gamma:g}")
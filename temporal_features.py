@@ -0,0 +1,146 @@
+"""
+时序特征：在 feature_extractor 的 10 维单帧特征之上，
+对若干列做滑动窗口统计 (均值 / 标准差 / 一阶差分 / 斜率)
+
+- TemporalFeatureExtractor: 实时推理用，维护环形缓冲 + 累加和，每帧 O(1) 更新
+- extract_temporal_batch:   离线训练 / 回放用，对整段 CSV 一次性计算，结果与逐帧更新一致
+
+窗口按"样本数"计，采集与推理的采样率需要一致，时序特征才有相同的物理含义。
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from feature_extractor import FEATURE_NAMES
+
+# 参与时序统计的单帧特征
+TEMPORAL_SOURCES = ["target_z", "cloud_area", "cloud_ratio", "cloud_count"]
+TEMPORAL_STATS = ["mean", "std", "diff", "slope"]
+TEMPORAL_WINDOW = 10  # 默认窗口 (10Hz 下约 1 秒)
+
+# 时序特征列名，例如 target_z_mean / target_z_slope
+TEMPORAL_FEATURE_NAMES = [f"{src}_{stat}" for src in TEMPORAL_SOURCES for stat in TEMPORAL_STATS]
+ALL_FEATURE_NAMES = FEATURE_NAMES + TEMPORAL_FEATURE_NAMES
+
+_SOURCE_IDX = [FEATURE_NAMES.index(name) for name in TEMPORAL_SOURCES]
+_REFRESH_EVERY = 1000  # 每隔多少帧按缓冲区重算一次累加和，消除浮点累积误差
+
+
+def uses_temporal(scaler):
+    """ 根据标准化器的输入维度判断模型是否使用了时序特征 (兼容旧的 10 维模型) """
+    return getattr(scaler, "n_features_in_", len(FEATURE_NAMES)) == len(ALL_FEATURE_NAMES)
+
+
+def _slope_consts(window):
+    # 窗口内下标 i = 0 (最旧) ... window-1 (最新) 的最小二乘斜率常数
+    idx = np.arange(window, dtype=np.float64)
+    sum_i = idx.sum()
+    denom = window * (idx * idx).sum() - sum_i * sum_i
+    return idx, sum_i, denom
+
+
+def _combine(x, diff, s, q, t, window, sum_i, denom, out):
+    """ 由累加和得到 [mean, std, diff, slope]，按 TEMPORAL_FEATURE_NAMES 顺序交错写入 out """
+    mean = s / window
+    var = np.maximum(q / window - mean * mean, 0.0)
+    out[..., 0::4] = mean
+    out[..., 1::4] = np.sqrt(var)
+    out[..., 2::4] = diff
+    out[..., 3::4] = (window * t - sum_i * s) / denom if denom else 0.0
+    return out
+
+
+class TemporalFeatureExtractor:
+    """
+    逐帧增量计算时序特征
+    窗口未满时用第一帧数据填充 (与 extract_temporal_batch 一致)，
+    因此从第一帧起就能输出固定维度的特征
+    """
+    def __init__(self, window=TEMPORAL_WINDOW):
+        self.window = window
+        self._idx, self._sum_i, self._denom = _slope_consts(window)
+        self._buf = np.zeros((window, len(TEMPORAL_SOURCES)))
+        self._out = np.zeros(len(TEMPORAL_FEATURE_NAMES))
+        self.reset()
+
+    def reset(self):
+        """ 清空窗口 (切换会话 / 目标丢失后重新开始) """
+        self._pos = 0          # 环形缓冲中最旧样本的位置
+        self._count = 0
+        self._s = None         # 窗口内 sum(x)
+        self._q = None         # 窗口内 sum(x^2)
+        self._t = None         # 窗口内 sum(i * x)，i 为样本在窗口中的序号
+
+    def _refresh(self):
+        ordered = np.roll(self._buf, -self._pos, axis=0)
+        self._s = ordered.sum(axis=0)
+        self._q = (ordered * ordered).sum(axis=0)
+        self._t = self._idx @ ordered
+
+    def update(self, feats, out=None):
+        """
+        输入一帧 10 维特征 (extract_features 的输出)，返回时序特征
+        out 可传入预分配的数组 (长度 len(TEMPORAL_FEATURE_NAMES))，否则复用内部缓冲
+        """
+        if out is None:
+            out = self._out
+        x = np.asarray(feats, dtype=np.float64)[_SOURCE_IDX]
+        w = self.window
+
+        if self._count == 0:
+            # 第一帧: 用当前值填满窗口
+            self._buf[:] = x
+            self._pos = 0
+            self._refresh()
+            diff = 0.0
+        else:
+            diff = x - self._buf[self._pos - 1]
+            oldest = self._buf[self._pos]
+            # 最旧样本出窗，其余样本序号整体减 1，新样本序号为 w-1
+            self._t += (w - 1) * x - (self._s - oldest)
+            self._s += x - oldest
+            self._q += x * x - oldest * oldest
+            self._buf[self._pos] = x
+            self._pos = (self._pos + 1) % w
+            if self._count % _REFRESH_EVERY == 0:
+                self._refresh()
+        self._count += 1
+
+        return _combine(x, diff, self._s, self._q, self._t, w, self._sum_i, self._denom, out)
+
+
+def extract_temporal_batch(base_feats, window=TEMPORAL_WINDOW, segment_ids=None):
+    """
+    批量计算时序特征 (训练 / 回放)
+    输入:
+      base_feats: (N, 10) 数组，按 FEATURE_NAMES 排列、按时间顺序
+      segment_ids: 可选，长度 N；值变化处重新开始窗口 (相当于调用 reset)
+    输出:
+      (N, len(TEMPORAL_FEATURE_NAMES)) 数组
+    """
+    base_feats = np.asarray(base_feats, dtype=np.float64)
+    n = len(base_feats)
+    out = np.zeros((n, len(TEMPORAL_FEATURE_NAMES)))
+    if n == 0:
+        return out
+
+    if segment_ids is None:
+        starts = np.array([0])
+    else:
+        segment_ids = np.asarray(segment_ids)
+        starts = np.flatnonzero(np.r_[True, segment_ids[1:] != segment_ids[:-1]])
+    bounds = np.r_[starts, n]
+
+    idx, sum_i, denom = _slope_consts(window)
+    x_all = base_feats[:, _SOURCE_IDX]
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        x = x_all[a:b]
+        # 与增量版相同：段首用第一帧填满窗口
+        padded = np.concatenate([np.repeat(x[:1], window - 1, axis=0), x])
+        win = sliding_window_view(padded, window, axis=0)  # (n, k, window)
+        s = win.sum(axis=-1)
+        q = (win * win).sum(axis=-1)
+        t = win @ idx
+        diff = np.zeros_like(x)
+        diff[1:] = x[1:] - x[:-1]
+        _combine(x, diff, s, q, t, window, sum_i, denom, out[a:b])
+    return out
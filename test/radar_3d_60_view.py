@@ -1,11 +1,16 @@
+import os
+import sys
 import serial
-import struct
 import threading
 import time
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from collections import deque
 
+# 共享的协议解析模块位于仓库根目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_protocol
+
 # ---------------- 配置区域 ----------------
 SERIAL_PORT = '/dev/ttyACM0' # 串口设备路径
 BAUD_RATE = 115200 # 波特率，若无数据请尝试 1382400
@@ -21,39 +26,19 @@ global_point_buffer = deque(maxlen=5)
 data_lock = threading.Lock()
 stop_flag = False
 
-def calc_checksum(data_bytes):
-    checksum = 0
-    for b in data_bytes:
-        checksum ^= b
-    return (~checksum) & 0xFF
-
-def send_command_int32(ser, cmd_value):
-    """ 发送带有 int32 参数的控制指令 (0x0201) """
-    # Header: SOF(1)+ID(2)+LEN(2)+TYPE(2)
-    # [cite_start]TYPE=0x0201 (控制指令) [cite: 1371]
-    header = b'\x01\x00\x01\x00\x04\x02\x01'
-    h_cs = calc_checksum(header)
-    
-    # Payload: int32 小端序
-    payload = struct.pack('<I', cmd_value)
-    d_cs = calc_checksum(payload)
-    
-    frame = header + bytes([h_cs]) + payload + bytes([d_cs])
-    return frame
-
 def init_radar_config(ser):
     """ 初始化雷达配置：开启点云 + 设置安装方式 """
     print("\n[配置] 正在初始化雷达...")
     
     # [cite_start]1. 发送开启点云指令 (Command: 0x06) [cite: 1378]
-    cmd_cloud = send_command_int32(ser, 0x06)
+    cmd_cloud = radar_protocol.build_command(0x06)
     ser.write(cmd_cloud)
     print(f"  -> 发送: 开启点云 (0x06)")
     time.sleep(0.2)
     
     # [cite_start]2. 发送安装方式指令 (Command: 0x13 顶装 / 0x14 侧装) [cite: 1395, 1396]
     # 这一步非常关键！如果不设置，Z轴可能一直是0
-    cmd_install = send_command_int32(ser, INSTALL_MODE)
+    cmd_install = radar_protocol.build_command(INSTALL_MODE)
     ser.write(cmd_install)
     mode_str = "顶装 (Top)" if INSTALL_MODE == 0x13 else "侧装 (Side)"
     print(f"  -> 发送: 设置为{mode_str}模式 (0x{INSTALL_MODE:02X})")
@@ -69,58 +54,29 @@ def serial_thread_task():
         time.sleep(1)
         init_radar_config(ser)
         
-        buffer = b""
+        decoder = radar_protocol.FrameDecoder()
         while not stop_flag:
             if ser.in_waiting:
-                buffer += ser.read(ser.in_waiting)
+                decoder.feed(ser.read(ser.in_waiting))
 
-            while len(buffer) >= 8:
-                if buffer[0] != 0x01:
-                    buffer = buffer[1:]
-                    continue
-                try:
-                    header = buffer[0:7]
-                    if calc_checksum(header) != buffer[7]:
-                        buffer = buffer[1:]
-                        continue
-                    
-                    _, _, data_len, frame_type = struct.unpack('>BHHH', header)
-                    total_len = 8 + data_len + 1
+            for frame in decoder.decoded():
+                # [cite_start]解析点云 (0x0A08) [cite: 1475]
+                if isinstance(frame, radar_protocol.PointCloudFrame):
+                    points = radar_protocol.to_xyzv(frame.points)
+                    num = len(points)
                     
-                    if len(buffer) < total_len: break 
-                    
-                    payload = buffer[8 : 8+data_len]
-                    if calc_checksum(payload) == buffer[8+data_len]:
+                    # 终端输出头部
+                    if num > 0:
+                        print(f"\n 收到帧: {num} 个点")
+                        
+                    # --- 终端输出点信息 (前5个点) ---
+                    for i, (x, y, z, speed) in enumerate(points[:5]):
+                        print(f"   Ref[{i}]: X={x:5.2f}m, Y={y:5.2f}m, Z={z:5.2f}m, V={speed:5.2f}m/s")
                         
-                        # [cite_start]解析点云 (0x0A08) [cite: 1475]
-                        if frame_type == 0x0A08 and len(payload) >= 4:
-                            num = struct.unpack('<i', payload[0:4])[0]
-                            points = []
-                            offset = 4
-                            
-                            # 终端输出头部
-                            if num > 0:
-                                print(f"\n 收到帧: {num} 个点")
-                                
-                            for i in range(num):
-                                if offset + 20 > len(payload): break
-                                # 解析: cluster(4), x(4), y(4), z(4), speed(4)
-                                clus, x, y, z, speed = struct.unpack('<iffff', payload[offset:offset+20])
-                                points.append((x, y, z, speed))
-                                
-                                # --- 终端输出点信息 (前5个点) ---
-                                if i < 5: 
-                                    print(f"   Ref[{i}]: X={x:5.2f}m, Y={y:5.2f}m, Z={z:5.2f}m, V={speed:5.2f}m/s")
-                                offset += 20
-                                
-                            if num > 5: print(f"   ... (剩余 {num-5} 个点隐藏)")
+                    if num > 5: print(f"   ... (剩余 {num-5} 个点隐藏)")
 
-                            with data_lock:
-                                if points: global_point_buffer.append(points)
-                                    
-                    buffer = buffer[total_len:]
-                except:
-                    buffer = buffer[1:]
+                    with data_lock:
+                        if num: global_point_buffer.append(points)
     except Exception as e:
         print(f"❌ 串口错误: {e}")
 
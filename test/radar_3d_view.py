@@ -1,11 +1,16 @@
+import os
+import sys
 import serial
-import struct
 import threading
 import time
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from collections import deque  # 引入双端队列用于做数据缓冲
 
+# 共享的协议解析模块位于仓库根目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import radar_protocol
+
 # ---------------- 配置区域 ----------------
 SERIAL_PORT = '/dev/ttyACM0'
 BAUD_RATE = 115200 
@@ -18,19 +23,9 @@ global_point_buffer = deque(maxlen=8)
 data_lock = threading.Lock()
 stop_flag = False
 
-def calc_checksum(data_bytes):
-    checksum = 0
-    for b in data_bytes:
-        checksum ^= b
-    return (~checksum) & 0xFF
-
 def send_enable_point_cloud(ser):
     """ 发送开启点云指令 """
-    header = b'\x01\x00\x01\x00\x04\x02\x01'
-    h_cs = calc_checksum(header)
-    payload = b'\x06\x00\x00\x00'
-    d_cs = calc_checksum(payload)
-    frame = header + bytes([h_cs]) + payload + bytes([d_cs])
+    frame = radar_protocol.build_command(radar_protocol.CMD_POINT_CLOUD_ON)
     print(f"[TX] 发送开启点云指令: {frame.hex().upper()}")
     ser.write(frame)
 
@@ -45,54 +40,21 @@ def serial_thread_task():
         time.sleep(1)
         send_enable_point_cloud(ser)
         
-        buffer = b""
+        decoder = radar_protocol.FrameDecoder()
         while not stop_flag:
             if ser.in_waiting:
-                buffer += ser.read(ser.in_waiting)
+                decoder.feed(ser.read(ser.in_waiting))
 
-            while len(buffer) >= 8:
-                if buffer[0] != 0x01:
-                    buffer = buffer[1:]
-                    continue
-                try:
-                    header = buffer[0:7]
-                    h_cksum_recv = buffer[7]
-                    if calc_checksum(header) != h_cksum_recv:
-                        buffer = buffer[1:]
-                        continue
-                    
-                    _, _, data_len, frame_type = struct.unpack('>BHHH', header)
-                    total_len = 8 + data_len + 1
-                    
-                    if len(buffer) < total_len:
-                        break 
-                    
-                    payload = buffer[8 : 8+data_len]
-                    d_cksum_recv = buffer[8+data_len]
-                    
-                    if calc_checksum(payload) == d_cksum_recv:
-                        # 0x0A08 点云数据
-                        if frame_type == 0x0A08:
-                            if len(payload) >= 4:
-                                num = struct.unpack('<i', payload[0:4])[0]
-                                current_frame_points = []
-                                offset = 4
-                                for _ in range(num):
-                                    if offset + 20 > len(payload): break
-                                    _, x, y, z, speed = struct.unpack('<iffff', payload[offset:offset+20])
-                                    # 这里可以过滤掉一些明显错误的噪点，例如 z > 3.0 或 z < -3.0
-                                    current_frame_points.append((x, y, z, speed))
-                                    offset += 20
-                                
-                                # 将当前帧数据加入缓冲区（自动挤掉最老的一帧）
-                                with data_lock:
-                                    if current_frame_points: # 只有非空才添加，防止空帧闪烁
-                                        global_point_buffer.append(current_frame_points)
-                                    
-                    buffer = buffer[total_len:]
+            for frame in decoder.decoded():
+                # 0x0A08 点云数据
+                if isinstance(frame, radar_protocol.PointCloudFrame):
+                    # 这里可以过滤掉一些明显错误的噪点，例如 z > 3.0 或 z < -3.0
+                    current_frame_points = radar_protocol.to_xyzv(frame.points)
                     
-                except Exception:
-                    buffer = buffer[1:]
+                    # 将当前帧数据加入缓冲区（自动挤掉最老的一帧）
+                    with data_lock:
+                        if len(current_frame_points): # 只有非空才添加，防止空帧闪烁
+                            global_point_buffer.append(current_frame_points)
                     
     except Exception as e:
         print(f"❌ 串口错误: {e}")